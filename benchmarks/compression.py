@@ -0,0 +1,86 @@
+"""
+Size & speed of Database-files with every Codec & compression.
+
+Usage, from the root of the repository: python -m benchmarks.compression [--documents 20000] [--repeat 3]
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+import uuid
+
+from filexdb.fileio import BinaryFileIO
+from filexdb.codec import CODECS
+from filexdb.compression import COMPRESSIONS
+
+
+def sample_database(documents: int) -> dict:
+    """
+    Documents of students, the same keys in every Document & ``uuid1`` ids like ``Collection.insert``.
+    """
+
+    _random = random.Random(0)
+    _depts = ["CSE", "ECE", "EE", "ME", "CE"]
+    _skills = ["Python", "C++", "Java", "Go", "Rust", "SQL"]
+
+    return {
+        "student_info": [
+            {
+                "_id_": uuid.uuid1().hex,
+                "name": f"Student {i}",
+                "roll": i,
+                "dept": _random.choice(_depts),
+                "cgpa": round(_random.uniform(5, 10), 2),
+                "skills": _random.sample(_skills, 2),
+                "address": {"PO": "Bongaon", "PS": "Kolkata", "PIN": 743235 + i % 50},
+            }
+            for i in range(documents)
+        ]
+    }
+
+
+def measure(database: dict, data_dir: str, codec: str, compression: str | None, repeat: int) -> tuple:
+    _file_handler = BinaryFileIO("bench", data_dir, codec=codec, compression=compression)
+
+    _write = _read = float("inf")
+
+    for _ in range(repeat):
+        _start = time.perf_counter()
+        _file_handler.write(database)
+        _write = min(_write, time.perf_counter() - _start)
+
+        _start = time.perf_counter()
+        _file_handler.read()
+        _read = min(_read, time.perf_counter() - _start)
+
+    return os.path.getsize(_file_handler.get_export_path()), _write, _read
+
+
+def main() -> None:
+    _parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    _parser.add_argument("--documents", type=int, default=20000)
+    _parser.add_argument("--repeat", type=int, default=3)
+    _args = _parser.parse_args()
+
+    _database = sample_database(_args.documents)
+
+    print(f"{'codec':<14}{'compression':<13}{'size KiB':>10}{'ratio':>8}{'write MB/s':>12}{'read MB/s':>11}")
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        for codec in sorted(CODECS):
+            _plain_size = None
+
+            for compression in [None, *sorted(COMPRESSIONS)]:
+                _size, _write, _read = measure(_database, data_dir, codec, compression, _args.repeat)
+
+                # Throughput of the uncompressed data, so the rows of a Codec compare.
+                _plain_size = _plain_size or _size
+
+                print(f"{codec:<14}{compression or '-':<13}{_size / 1024:>10.0f}{_plain_size / _size:>8.2f}"
+                      f"{_plain_size / _write / 1e6:>12.1f}{_plain_size / _read / 1e6:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
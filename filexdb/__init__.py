@@ -1,5 +1,6 @@
 from pkg_resources import get_distribution, DistributionNotFound
 from .database import FileXdb
+from .aio import AsyncFileXdb
 
 
 __version__ = "1.0.2"
@@ -0,0 +1,535 @@
+from __future__ import annotations
+
+import itertools
+from typing import Any, Callable, Dict, Hashable, Iterable, Iterator, List, Mapping, Sequence, Tuple
+
+from .cursor import sort_key, _projector, _sort_spec
+from .document import Document
+from .query import MISSING, Query, compile_query, get_path
+
+__all__ = ("Pipeline", "compile_pipeline", "STAGES", "ACCUMULATORS")
+
+
+# Stages of ``Collection.aggregate``.
+STAGES = ("$match", "$group", "$sort", "$skip", "$limit", "$project", "$count")
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+class _Accumulator:
+    """
+    Reduces the values of a field of the Documents of a group.
+    """
+
+    def add(self, value: Any) -> None:
+        raise NotImplementedError('To be overridden!')
+
+    def add_many(self, values: Sequence[Any], numbers: bool = False) -> None:
+        """
+        Add many values at once.
+
+        :param values: Values, ``MISSING`` where a Document doesn't have the field.
+        :param numbers: Every value is a number, e.g. a typed column.
+        """
+
+        for value in values:
+            self.add(value)
+
+    def result(self) -> Any:
+        raise NotImplementedError('To be overridden!')
+
+
+class _Sum(_Accumulator):
+    # Values which are not numbers are skipped.
+    def __init__(self) -> None:
+        self._total = 0
+
+    def add(self, value: Any) -> None:
+        if _is_number(value):
+            self._total += value
+
+    def add_many(self, values: Sequence[Any], numbers: bool = False) -> None:
+        self._total += sum(values) if numbers else sum(value for value in values if _is_number(value))
+
+    def result(self) -> Any:
+        return self._total
+
+
+class _Avg(_Sum):
+    def __init__(self) -> None:
+        super().__init__()
+        self._count = 0
+
+    def add(self, value: Any) -> None:
+        if _is_number(value):
+            self._total += value
+            self._count += 1
+
+    def add_many(self, values: Sequence[Any], numbers: bool = False) -> None:
+        if not numbers:
+            values = [value for value in values if _is_number(value)]
+
+        self._total += sum(values)
+        self._count += len(values)
+
+    def result(self) -> Any:
+        return self._total / self._count if self._count else None
+
+
+class _Min(_Accumulator):
+    # Missing values & None are skipped, other values are ordered like ``Cursor.sort``.
+    _reverse = False
+
+    def __init__(self) -> None:
+        self._value: Any = MISSING
+        self._key: tuple = ()
+
+    def add(self, value: Any) -> None:
+        if value is MISSING or value is None:
+            return
+
+        _key = sort_key(value)
+
+        if self._value is MISSING or (_key > self._key if self._reverse else _key < self._key):
+            self._value, self._key = value, _key
+
+    def add_many(self, values: Sequence[Any], numbers: bool = False) -> None:
+        if numbers:
+            if len(values):
+                self.add(max(values) if self._reverse else min(values))
+            return
+
+        super().add_many(values)
+
+    def result(self) -> Any:
+        return None if self._value is MISSING else self._value
+
+
+class _Max(_Min):
+    _reverse = True
+
+
+class _Count(_Accumulator):
+    def __init__(self) -> None:
+        self._count = 0
+
+    def add(self, value: Any) -> None:
+        self._count += 1
+
+    def add_many(self, values: Sequence[Any], numbers: bool = False) -> None:
+        self._count += len(values)
+
+    def result(self) -> Any:
+        return self._count
+
+
+class _First(_Accumulator):
+    def __init__(self) -> None:
+        self._value: Any = MISSING
+
+    def add(self, value: Any) -> None:
+        if self._value is MISSING:
+            self._value = None if value is MISSING else value
+
+    def result(self) -> Any:
+        return self._value if self._value is not MISSING else None
+
+
+class _Last(_First):
+    def add(self, value: Any) -> None:
+        self._value = None if value is MISSING else value
+
+
+class _Push(_Accumulator):
+    # Missing values are skipped.
+    def __init__(self) -> None:
+        self._values: List[Any] = []
+
+    def add(self, value: Any) -> None:
+        if value is not MISSING:
+            self._values.append(value)
+
+    def result(self) -> Any:
+        return self._values
+
+
+# Accumulators of ``$group``.
+ACCUMULATORS: Dict[str, type] = {
+    "$sum": _Sum,
+    "$avg": _Avg,
+    "$min": _Min,
+    "$max": _Max,
+    "$count": _Count,
+    "$first": _First,
+    "$last": _Last,
+    "$push": _Push,
+}
+
+
+def _field_of(expression: Any) -> str | None:
+    """
+    Field referenced by an expression, e.g. ``address.PO`` of ``"$address.PO"``.
+    """
+
+    if isinstance(expression, str) and expression.startswith("$"):
+        return expression[1:]
+
+    return None
+
+
+def _compile_value(expression: Any) -> Callable[[Mapping], Any]:
+    """
+    Create a function computing an expression of ``$group`` for a Document.
+
+    ``"$field"`` is the value of a field, an object is an object of expressions & anything else is a constant.
+
+    :param expression: Expression.
+    :return: Function of Document.
+    """
+
+    _field = _field_of(expression)
+
+    if _field is not None:
+        return lambda doc: get_path(doc, _field)
+
+    if isinstance(expression, Mapping):
+        _values = {key: _compile_value(value) for key, value in expression.items()}
+
+        def build(doc: Mapping) -> dict:
+            _built = {key: value(doc) for key, value in _values.items()}
+            return {key: value for key, value in _built.items() if value is not MISSING}
+
+        return build
+
+    return lambda doc: expression
+
+
+def _hashable(value: Any) -> Hashable:
+    """
+    Key of a group in a ``dict``, equal values give equal keys.
+    """
+
+    if isinstance(value, (list, tuple)):
+        return tuple(_hashable(item) for item in value)
+
+    if isinstance(value, Mapping):
+        return tuple((key, _hashable(item)) for key, item in value.items())
+
+    return value
+
+
+class _Group:
+    """
+    ``$group`` stage: ``{"_id_": <key expression>, "<field>": {"<accumulator>": <expression>}, ...}``.
+    """
+
+    def __init__(self, spec: Mapping) -> None:
+        if not isinstance(spec, Mapping) or "_id_" not in spec:
+            raise ValueError("`$group` needs an `_id_` expression")
+
+        self.key = spec["_id_"]
+        self._key = _compile_value(self.key)
+
+        # (output field, accumulator, expression) of every output field.
+        self.fields: List[Tuple[str, type, Any]] = []
+
+        for field, accumulator in spec.items():
+            if field == "_id_":
+                continue
+
+            if not isinstance(accumulator, Mapping) or len(accumulator) != 1:
+                raise ValueError(f"`{field}` of `$group` needs a single accumulator, e.g. {{'$sum': '$amount'}}")
+
+            (_name, _expression), = accumulator.items()
+
+            if _name not in ACCUMULATORS:
+                raise ValueError(f"`{_name}` is not a valid accumulator, use one of {list(ACCUMULATORS)}")
+
+            # ``$count`` counts Documents, its expression is not used.
+            self.fields.append((field, ACCUMULATORS[_name], None if _name == "$count" else _expression))
+
+        self._values = [_compile_value(expression) for _, _, expression in self.fields]
+
+    def _new_group(self, key: Any) -> Tuple[Any, List[_Accumulator]]:
+        return key, [accumulator() for _, accumulator, _ in self.fields]
+
+    def _output(self, groups: Iterable[Tuple[Any, List[_Accumulator]]]) -> Iterator[Document]:
+        for key, accumulators in groups:
+            _document = {"_id_": key}
+
+            for (field, _, _), accumulator in zip(self.fields, accumulators):
+                _document[field] = accumulator.result()
+
+            yield Document(_document, False)
+
+    def run(self, documents: Iterable[Mapping]) -> Iterator[Document]:
+        # Hash-based grouping, groups come out in the order they were first seen.
+        _groups: Dict[Hashable, Tuple[Any, List[_Accumulator]]] = {}
+
+        for doc in documents:
+            _key = self._key(doc)
+
+            # Documents without the key are grouped with the ones having None.
+            if _key is MISSING:
+                _key = None
+
+            _hash = _hashable(_key)
+
+            if _hash not in _groups:
+                _groups[_hash] = self._new_group(_key)
+
+            for accumulator, value in zip(_groups[_hash][1], self._values):
+                accumulator.add(value(doc))
+
+        return self._output(_groups.values())
+
+    def columns(self) -> List[str] | None:
+        """
+        Fields read by the stage, if all of them are top-level fields or constants, see ``run_columns``.
+
+        :return: List of fields, or None.
+        """
+
+        _fields = []
+
+        for expression in [self.key] + [expression for _, _, expression in self.fields]:
+            _field = _field_of(expression)
+
+            if _field is not None:
+                if "." in _field:
+                    return None
+
+                _fields.append(_field)
+
+            elif isinstance(expression, Mapping):
+                return None
+
+        return _fields
+
+    def run_columns(self, collection: Any, positions: Sequence[int] | None) -> Iterator[Document]:
+        """
+        Group the Documents of a ``ColumnarCollection`` by reducing its columns, without building Documents.
+
+        :param collection: ``ColumnarCollection``.
+        :param positions: Positions of the Documents to group, all Documents if None.
+        :return: Documents of groups.
+        """
+
+        _length = len(collection) if positions is None else len(positions)
+
+        def column(expression: Any) -> Tuple[Sequence[Any], bool]:
+            _field = _field_of(expression)
+
+            if _field is None:
+                return [expression] * _length, False
+
+            # Full typed columns are reduced as they are.
+            _numbers = collection.numbers(_field) if positions is None else None
+
+            if _numbers is not None:
+                return _numbers, True
+
+            _values = collection.values(_field)
+
+            return (_values if positions is None else [_values[position] for position in positions]), False
+
+        _columns = [column(expression) for _, _, expression in self.fields]
+
+        if _field_of(self.key) is None:
+            _group = self._new_group(self._key({}))
+
+            for accumulator, (values, numbers) in zip(_group[1], _columns):
+                accumulator.add_many(values, numbers)
+
+            return self._output([_group] if _length else [])
+
+        _keys, _ = column(self.key)
+
+        # Positions in ``_columns`` of every group.
+        _members: Dict[Hashable, Tuple[Any, List[int]]] = {}
+
+        for position, key in enumerate(_keys):
+            if key is MISSING:
+                key = None
+
+            _hash = _hashable(key)
+
+            if _hash not in _members:
+                _members[_hash] = (key, [])
+
+            _members[_hash][1].append(position)
+
+        _groups = []
+
+        for key, members in _members.values():
+            _group = self._new_group(key)
+
+            for accumulator, (values, numbers) in zip(_group[1], _columns):
+                accumulator.add_many([values[position] for position in members], numbers)
+
+            _groups.append(_group)
+
+        return self._output(_groups)
+
+
+class Pipeline:
+    """
+    A pipeline of ``Collection.aggregate``, compiled once.
+
+    Every stage is a generator over the Documents of the previous stage, so only ``$group``,
+    ``$sort`` & ``$count`` hold more than a Document at a time.
+
+    Stages:
+
+    - ``{"$match": query}``: Documents matching a query, see ``filexdb.query``.
+    - ``{"$group": {"_id_": "$dept", "total": {"$sum": "$amount"}}}``: a Document per distinct key,
+      with accumulators ``$sum``, ``$avg``, ``$min``, ``$max``, ``$count``, ``$first``, ``$last`` & ``$push``.
+    - ``{"$sort": {"total": -1}}``, ``{"$skip": n}``, ``{"$limit": n}``.
+    - ``{"$project": ["dept", "total"]}``: fields to keep, like ``Cursor.project``.
+    - ``{"$count": "name"}``: a single Document with the amount of Documents.
+    """
+
+    def __init__(self, pipeline: List[Mapping]) -> None:
+        if not isinstance(pipeline, (list, tuple)):
+            raise ValueError('Pipeline is not a List of stages')
+
+        self.stages: List[Tuple[str, Any]] = [self._compile_stage(stage) for stage in pipeline]
+
+    @staticmethod
+    def _compile_stage(stage: Mapping) -> Tuple[str, Any]:
+        if not isinstance(stage, Mapping) or len(stage) != 1:
+            raise ValueError(f"A stage is a Dictionary of one stage, `{stage}` is given")
+
+        (_name, _spec), = stage.items()
+
+        if _name == "$match":
+            return _name, compile_query(_spec)
+
+        if _name == "$group":
+            return _name, _Group(_spec)
+
+        if _name == "$sort":
+            if not isinstance(_spec, Mapping) or not _spec:
+                raise ValueError("`$sort` needs a Dictionary of field & direction")
+
+            return _name, _sort_spec(list(_spec.items()))
+
+        if _name in ("$skip", "$limit"):
+            if isinstance(_spec, bool) or not isinstance(_spec, int) or _spec < 0:
+                raise ValueError(f"`{_name}` needs a positive integer")
+
+            return _name, _spec
+
+        if _name == "$project":
+            return _name, _projector(_spec)
+
+        if _name == "$count":
+            if not isinstance(_spec, str) or not _spec:
+                raise ValueError("`$count` needs the name of the field to count into")
+
+            return _name, _spec
+
+        raise ValueError(f"`{_name}` is not a valid stage, use one of {list(STAGES)}")
+
+    @property
+    def first_match(self) -> Query | None:
+        """
+        Query of the first stage, if it is ``$match``, so the Documents can be found by an Index.
+        """
+
+        if self.stages and self.stages[0][0] == "$match":
+            return self.stages[0][1]
+
+        return None
+
+    def run(self, documents: Iterable[Mapping], start: int = 0) -> Iterator[Mapping]:
+        """
+        Run the stages, from ``start`` on.
+
+        :param documents: Documents entering the pipeline.
+        :param start: Index of first stage to run.
+        :return: Iterator of resulting Documents.
+        """
+
+        _documents: Iterable[Mapping] = documents
+
+        for name, stage in self.stages[start:]:
+            if name == "$match":
+                _documents = filter(stage.match, _documents)
+
+            elif name == "$group":
+                _documents = stage.run(_documents)
+
+            elif name == "$sort":
+                _documents = self._sorted(_documents, stage)
+
+            elif name == "$skip":
+                _documents = itertools.islice(_documents, stage, None)
+
+            elif name == "$limit":
+                _documents = itertools.islice(_documents, stage)
+
+            elif name == "$project":
+                _documents = map(stage, _documents)
+
+            elif name == "$count":
+                _documents = iter([Document({stage: sum(1 for _ in _documents)}, False)])
+
+        return iter(_documents)
+
+    def run_columns(self, collection: Any) -> Iterator[Mapping] | None:
+        """
+        Run the pipeline on the columns of a ``ColumnarCollection``, if it starts with ``$group``
+        or ``$match`` & ``$group`` reading top-level fields only.
+
+        :param collection: ``ColumnarCollection``.
+        :return: Iterator of resulting Documents, None if the pipeline can't run on columns.
+        """
+
+        _query = self.first_match
+        _start = 0 if _query is None else 1
+
+        if len(self.stages) <= _start or self.stages[_start][0] != "$group":
+            return None
+
+        _group: _Group = self.stages[_start][1]
+
+        if _group.columns() is None:
+            return None
+
+        _positions = None
+
+        if _query is not None:
+            # Only a query of column tests is answered by the columns alone.
+            if any(key.startswith("$") or "." in key for key in _query.query):
+                return None
+
+            _positions = collection.positions(_query)
+
+        return self.run(_group.run_columns(collection, _positions), _start + 1)
+
+    @staticmethod
+    def _sorted(documents: Iterable[Mapping], spec: List[Tuple[str, int]]) -> List[Mapping]:
+        _documents = list(documents)
+
+        # Sort by the least significant key first, ``list.sort`` is stable.
+        for field, direction in reversed(spec):
+            _documents.sort(key=lambda doc: sort_key(get_path(doc, field)), reverse=direction == -1)
+
+        return _documents
+
+
+def compile_pipeline(pipeline: List[Mapping] | Pipeline) -> Pipeline:
+    """
+    Compile a pipeline once, to run it on any Documents.
+
+    :param pipeline: List of stages, see ``Pipeline``.
+    :return: Compiled Pipeline.
+    """
+
+    if isinstance(pipeline, Pipeline):
+        return pipeline
+
+    return Pipeline(pipeline)
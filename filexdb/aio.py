@@ -0,0 +1,373 @@
+from __future__ import annotations
+
+import asyncio
+import itertools
+import threading
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Mapping, Tuple
+
+from .database import FileXdb
+from .collection import Collection
+from .document import Document, JsonArray
+
+__all__ = ("AsyncFileXdb", "AsyncCollection", "AsyncCursor")
+
+
+class AsyncFileXdb:
+    """
+    ``FileXdb`` for ``asyncio``, every method is a coroutine.
+
+    The Database-files are read & written by an executor, so the event loop never waits for the disk.
+    With ``sync="always"`` (default) a change is written before its coroutine returns, but changes
+    made at the same time are written together by a single flush.
+    """
+
+    def __init__(self, db_name: str, data_dir=None, executor: Executor | None = None, workers: int = 4, **options):
+        """
+        Creates a Databased in ``data_dir`` Directory named ``db_name``, on first use.
+
+        :param db_name: Name of Database without file extension.
+        :param data_dir: Where the Database will be stored.
+        :param executor: Executor doing the storage work, a new one of ``workers`` threads by default.
+        :param workers: Amount of threads of the default executor.
+        :param options: Options of ``FileXdb``, e.g. ``mode`` & ``sync``.
+        """
+
+        self._db_name = db_name
+        self._data_dir = data_dir
+
+        # Changes are written by ``_commit`` in ``always`` mode, many at once.
+        self._sync = options.get("sync", "always")
+
+        if self._sync == "always":
+            options["sync"] = "never"
+
+        self._options = options
+
+        self._executor = executor or ThreadPoolExecutor(workers, thread_name_prefix="filexdb")
+        self._own_executor = executor is None
+
+        # Opened in the executor on first use.
+        self._database: FileXdb | None = None
+        self._open_lock = threading.Lock()
+
+        # Flush every change made until it starts, shared by the changes waiting for it.
+        self._flush_task: asyncio.Task | None = None
+
+    def collection(self, col_name: str) -> "AsyncCollection":
+        """
+        Creates a brand-new Collection if the Collection is not exists.
+
+        :param col_name: Collection name to interact with.
+        :return: An instance of AsyncCollection.
+        """
+
+        return AsyncCollection(self, col_name)
+
+    async def show_collections(self) -> JsonArray:
+        """
+        Shows all collections of database.
+
+        :return: List Collections.
+        """
+
+        return await self._run(FileXdb.show_collections)
+
+    async def export(self, _file_name, _file_dir=None, _mode="json", _compression=None) -> None:
+        """
+        Export data in to readable file, see ``FileXdb.export``.
+        """
+
+        await self._run(FileXdb.export, _file_name, _file_dir, _mode, _compression)
+
+    async def import_(self, file_path: str, collection: str | None = None, format: str | None = None,
+                      batch_size: int = 10000, progress: Callable[[dict], Any] | None = None) -> Dict[str, int]:
+        """
+        Inserts the Documents of a JSON, NDJSON or CSV file, see ``FileXdb.import_``.
+        """
+
+        try:
+            return await self._run(FileXdb.import_, file_path, collection, format, batch_size, progress)
+        finally:
+            await self._commit()
+
+    async def flush(self) -> None:
+        """
+        Write all waiting changes to the Database-file.
+
+        :return: None.
+        """
+
+        await self._run(FileXdb.flush)
+
+    async def close(self) -> None:
+        """
+        Write all waiting changes & release the Database & the default executor.
+
+        :return: None.
+        """
+
+        if self._flush_task is not None:
+            await asyncio.shield(self._flush_task)
+
+        if self._database is not None:
+            await self._run(FileXdb.close)
+
+        if self._own_executor:
+            self._executor.shutdown(wait=False)
+
+    async def __aenter__(self) -> "AsyncFileXdb":
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.close()
+
+    async def _run(self, function: Callable, *args, **kwargs) -> Any:
+        """
+        Call ``function`` with the ``FileXdb`` in the executor.
+
+        :param function: Function taking ``FileXdb`` as first argument.
+        :return: Result of ``function``.
+        """
+
+        _loop = asyncio.get_running_loop()
+
+        return await _loop.run_in_executor(self._executor, lambda: function(self._open(), *args, **kwargs))
+
+    async def _commit(self) -> None:
+        """
+        Wait until the changes made so far are written, in ``always`` mode.
+
+        Changes made while a flush is waiting to start are written by the same flush.
+
+        :return: None.
+        """
+
+        if self._sync != "always":
+            return
+
+        if self._flush_task is None:
+            self._flush_task = asyncio.get_running_loop().create_task(self._flush_soon())
+
+        await asyncio.shield(self._flush_task)
+
+    async def _flush_soon(self) -> None:
+        # Let the other waiting changes join this flush.
+        await asyncio.sleep(0)
+
+        # Changes made from now on need another flush.
+        self._flush_task = None
+
+        await self._run(FileXdb.flush)
+
+    def _open(self) -> FileXdb:
+        with self._open_lock:
+            if self._database is None:
+                self._database = FileXdb(self._db_name, self._data_dir, **self._options)
+
+        return self._database
+
+
+class AsyncCollection:
+    """
+    ``Collection`` for ``asyncio``, see ``AsyncFileXdb``.
+    """
+
+    def __init__(self, database: AsyncFileXdb, col_name: str) -> None:
+        self._database = database
+        self._col_name = col_name
+
+    async def insert(self, document: Mapping) -> str:
+        return await self._write(Collection.insert, document)
+
+    async def insert_all(self, document_list: List[Mapping]) -> JsonArray:
+        return await self._write(Collection.insert_all, document_list)
+
+    async def insert_many(self, documents: Iterable[Mapping], batch_size: int = 1000) -> JsonArray:
+        return await self._write(Collection.insert_many, documents, batch_size)
+
+    def find(self, query=None, limit=None, sort=None, after: Mapping | None = None) -> "AsyncCursor":
+        """
+        Finds the Documents of Collection, see ``Collection.find``.
+
+        Await the result for a List of Document, or iterate it with ``async for``.
+
+        :param query: Condition to search Document
+        :param limit: Amount of Document to fetch
+        :param sort: Field name, or a list of ``(field, direction)``.
+        :param after: Last Document of previous page.
+        :return: AsyncCursor
+        """
+
+        return AsyncCursor(self, query, limit, sort=sort, after=after)
+
+    async def export(self, _file_name, _file_dir=None, _mode="json", query=None, _compression=None,
+                     _fields: List[str] | None = None) -> None:
+        return await self._read(Collection.export, _file_name, _file_dir, _mode, query, _compression, _fields)
+
+    async def load(self, file_path: str, format: str | None = None, batch_size: int = 10000,
+                   progress: Callable[[dict], Any] | None = None) -> int:
+        return await self._write(Collection.load, file_path, format, batch_size, progress)
+
+    async def get(self, doc_id: str) -> Document | None:
+        return await self._read(Collection.get, doc_id)
+
+    async def aggregate(self, pipeline: List[Mapping]) -> JsonArray:
+        return await self._read(Collection.aggregate, pipeline)
+
+    async def count(self, query=None) -> int:
+        return await self._read(Collection.count, query)
+
+    async def update(self, document: Mapping, query=None) -> JsonArray:
+        return await self._write(Collection.update, document, query)
+
+    async def update_one(self, document: Mapping, query=None) -> JsonArray:
+        return await self._write(Collection.update_one, document, query)
+
+    async def update_by_id(self, doc_id: str, document: Mapping) -> JsonArray:
+        return await self._write(Collection.update_by_id, doc_id, document)
+
+    async def delete(self, query=None) -> JsonArray:
+        return await self._write(Collection.delete, query)
+
+    async def delete_one(self, query=None) -> JsonArray:
+        return await self._write(Collection.delete_one, query)
+
+    async def delete_by_id(self, doc_id: str) -> JsonArray:
+        return await self._write(Collection.delete_by_id, doc_id)
+
+    async def create_index(self, field: str, kind: str = "hash") -> int:
+        return await self._read(Collection.create_index, field, kind)
+
+    async def drop_index(self, field: str) -> int:
+        return await self._read(Collection.drop_index, field)
+
+    async def list_indexes(self) -> JsonArray:
+        return await self._read(Collection.list_indexes)
+
+    async def set_layout(self, layout: str) -> None:
+        return await self._read(Collection.set_layout, layout)
+
+    async def rename(self, new_name: str) -> int:
+        return await self._write(Collection.rename, new_name)
+
+    async def drop(self) -> int:
+        return await self._write(Collection.drop)
+
+    async def _read(self, method: Callable, *args, **kwargs) -> Any:
+        """
+        Call a method of ``Collection`` in the executor.
+        """
+
+        return await self._database._run(lambda db: method(db.collection(self._col_name), *args, **kwargs))
+
+    async def _write(self, method: Callable, *args, **kwargs) -> Any:
+        """
+        Call a method of ``Collection`` changing it & wait until the change is written.
+        """
+
+        try:
+            return await self._read(method, *args, **kwargs)
+        finally:
+            await self._database._commit()
+
+
+class AsyncCursor:
+    """
+    A result of ``AsyncCollection.find``.
+
+    ``await`` it for a List of Document or iterate it with ``async for``, which fetches
+    ``batch_size`` Documents at once from the executor. Options are chained like the
+    ones of ``Cursor``, e.g. ``await coll.find(query).sort("age").limit(5)``.
+    """
+
+    def __init__(self, collection: AsyncCollection, query=None, limit=None, batch_size: int = 100,
+                 sort=None, after: Mapping | None = None) -> None:
+        self._collection = collection
+        self._query = query
+        self._limit = limit
+        self._batch_size = batch_size
+
+        # Order of ``Collection.find``.
+        self._order = {"sort": sort, "after": after}
+
+        # Chained options, applied to the ``Cursor`` in the executor.
+        self._options: List[Tuple[str, tuple]] = []
+
+    def skip(self, count: int) -> "AsyncCursor":
+        return self._chain("skip", count)
+
+    def limit(self, count: int | None) -> "AsyncCursor":
+        return self._chain("limit", count)
+
+    def sort(self, key, direction: int = 1) -> "AsyncCursor":
+        return self._chain("sort", key, direction)
+
+    def project(self, fields) -> "AsyncCursor":
+        return self._chain("project", fields)
+
+    def batch_size(self, size: int) -> "AsyncCursor":
+        """
+        Amount of Documents fetched at once by ``async for``.
+
+        :param size: Amount of Documents.
+        :return: The AsyncCursor itself.
+        """
+
+        if size < 1:
+            raise ValueError("batch size must be greater than 0.")
+
+        self._batch_size = size
+
+        return self
+
+    async def to_array(self) -> JsonArray:
+        """
+        Fetch all the Documents of AsyncCursor.
+
+        :return: List of Document
+        """
+
+        # Without options it is a plain ``find``, with the same checks of ``limit``.
+        if not self._options:
+            return await self._collection._read(Collection.find, self._query, self._limit, **self._order)
+
+        return await self._collection._read(lambda collection: self._cursor(collection).to_array())
+
+    async def first(self) -> Document | None:
+        return await self._collection._read(lambda collection: self._cursor(collection).first())
+
+    async def count(self) -> int:
+        return await self._collection._read(lambda collection: self._cursor(collection).count())
+
+    def __await__(self):
+        return self.to_array().__await__()
+
+    def __aiter__(self) -> AsyncIterator[Document]:
+        return self._iterate()
+
+    async def _iterate(self) -> AsyncIterator[Document]:
+        _iterator = await self._collection._read(lambda collection: iter(self._cursor(collection)))
+
+        while True:
+            _batch = await self._collection._database._run(
+                lambda db: list(itertools.islice(_iterator, self._batch_size))
+            )
+
+            if not _batch:
+                return
+
+            for document in _batch:
+                yield document
+
+    def _chain(self, option: str, *args) -> "AsyncCursor":
+        self._options.append((option, args))
+        return self
+
+    def _cursor(self, collection: Collection):
+        _cursor = collection.find(self._query, self._limit, lazy=True, **self._order)
+
+        for option, args in self._options:
+            getattr(_cursor, option)(*args)
+
+        return _cursor
@@ -0,0 +1,451 @@
+from __future__ import annotations
+
+import json
+import marshal
+import pickle
+import struct
+from abc import ABC, abstractmethod
+from collections.abc import Mapping, Sequence
+from typing import Any, Callable, Dict, List, Tuple
+
+from .compression import compress, decompress
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore[assignment]
+
+__all__ = ("Codec", "CompressedCodec", "CODECS", "register_codec", "get_codec", "dumps", "loads")
+
+
+# Every encoded Database-file starts with the line ``FXDB<version> <codec name>``.
+_MAGIC = b"FXDB"
+_FORMAT_VERSION = b"1"
+
+
+def _plain(value: Any) -> Any:
+    """
+    Convert ``Document``, ``JsonArray`` & lazy Collections into plain ``dict`` & ``list``.
+    """
+
+    if isinstance(value, Mapping):
+        return {key: _plain(item) for key, item in value.items()}
+
+    if isinstance(value, (list, tuple)) or (isinstance(value, Sequence) and not isinstance(value, (str, bytes))):
+        return [_plain(item) for item in value]
+
+    return value
+
+
+def _plain_outer(value: Any, depth: int = 3) -> Any:
+    """
+    Convert only the outer ``depth`` levels into plain ``dict`` & ``list``, i.e. Database, Collections & Documents.
+
+    Copies every Document once, its values are not visited.
+    """
+
+    if isinstance(value, Mapping):
+        return dict(value) if depth == 1 else {key: _plain_outer(item, depth - 1) for key, item in value.items()}
+
+    if isinstance(value, (list, tuple)) or (isinstance(value, Sequence) and not isinstance(value, (str, bytes))):
+        return list(value) if depth == 1 else [_plain_outer(item, depth - 1) for item in value]
+
+    return value
+
+
+def json_default(value: Any) -> Any:
+    """
+    Dump lazy Collections (e.g. ``PagedCollection``) as lists & their Documents as objects, nothing else.
+    """
+
+    if isinstance(value, Mapping):
+        return dict(value)
+
+    if isinstance(value, Sequence):
+        return list(value)
+
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class Codec(ABC):
+    """
+    The abstract base class for all Codecs.
+
+    A Codec converts the database, or a single Document, into bytes & back.
+    """
+
+    # Name of Codec, stored in the header of Database-file.
+    name: str
+
+    # Whether the encoded bytes are UTF-8 text.
+    text: bool = False
+
+    @abstractmethod
+    def encode(self, data: Any) -> bytes:
+        raise NotImplementedError('To be overridden!')
+
+    @abstractmethod
+    def decode(self, data: bytes) -> Any:
+        raise NotImplementedError('To be overridden!')
+
+
+class JsonCodec(Codec):
+    """
+    JSON, compact unless ``indent`` is given.
+    """
+
+    text = True
+
+    def __init__(self, name: str = "json", indent: int | None = None) -> None:
+        self.name = name
+        self._indent = indent
+        self._separators = None if indent else (",", ":")
+
+    def encode(self, data: Any) -> bytes:
+        return json.dumps(data, indent=self._indent, separators=self._separators,
+                          ensure_ascii=False, default=json_default).encode()
+
+    def decode(self, data: bytes) -> Any:
+        return json.loads(data)
+
+
+class OrjsonCodec(Codec):
+    """
+    JSON by ``orjson``, only available if ``orjson`` is installed.
+    """
+
+    name = "orjson"
+    text = True
+
+    def encode(self, data: Any) -> bytes:
+        return orjson.dumps(data, default=json_default)
+
+    def decode(self, data: bytes) -> Any:
+        return orjson.loads(data)
+
+
+class PickleCodec(Codec):
+    """
+    Pickle protocol 5, large binary values are stored as out-of-band buffers & loaded without a copy.
+
+    Encoded as ``<buffer count>`` & ``<length><buffer>`` of every buffer, then the pickle.
+    Python 3.7 has no protocol 5, it writes the highest protocol it has & no buffers.
+    """
+
+    name = "pickle"
+
+    # Out-of-band buffers need protocol 5, Python 3.8+.
+    _OUT_OF_BAND = pickle.HIGHEST_PROTOCOL >= 5
+
+    def encode(self, data: Any) -> bytes:
+        _buffers: List[Any] = []
+
+        if self._OUT_OF_BAND:
+            _pickle = pickle.dumps(data, protocol=5, buffer_callback=_buffers.append)
+        else:
+            _pickle = pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+
+        _encoded = bytearray(struct.pack(">I", len(_buffers)))
+
+        for buffer in _buffers:
+            _raw = buffer.raw()
+            _encoded += struct.pack(">Q", _raw.nbytes)
+            _encoded += _raw
+
+        _encoded += _pickle
+
+        return bytes(_encoded)
+
+    def decode(self, data: bytes) -> Any:
+        _data = memoryview(data)
+        _count, = struct.unpack_from(">I", _data, 0)
+        _offset = 4
+
+        _buffers = []
+
+        for _ in range(_count):
+            _length, = struct.unpack_from(">Q", _data, _offset)
+            _offset += 8
+            _buffers.append(_data[_offset: _offset + _length])
+            _offset += _length
+
+        if not self._OUT_OF_BAND:
+            return pickle.loads(_data[_offset:])
+
+        return pickle.loads(_data[_offset:], buffers=_buffers)
+
+
+class MarshalCodec(Codec):
+    """
+    ``marshal`` of plain python values.
+
+    ``marshal`` refuses subclasses like ``Document``, so Documents are copied into ``dict`` first.
+    """
+
+    name = "marshal"
+
+    def encode(self, data: Any) -> bytes:
+        try:
+            return marshal.dumps(_plain_outer(data))
+
+        except ValueError:
+            # A Document or lazy Collection nested inside a value.
+            return marshal.dumps(_plain(data))
+
+    def decode(self, data: bytes) -> Any:
+        return marshal.loads(data)
+
+
+class BinaryCodec(Codec):
+    """
+    A portable binary format of JSON values & bytes, e.g. to read the Database-file without python.
+
+    Written in pure python, it is slower than ``pickle`` & ``marshal`` & not smaller than ``pickle``.
+    Every value is a type tag followed by its content. Integers are zigzag varints,
+    strings, bytes, lists & objects are prefixed by their varint length.
+    """
+
+    name = "binary"
+
+    _NONE, _FALSE, _TRUE, _INT, _FLOAT, _STR, _BYTES, _LIST, _DICT = range(9)
+
+    _FLOAT_STRUCT = struct.Struct(">d")
+
+    def encode(self, data: Any) -> bytes:
+        _buffer = bytearray()
+        self._encode(data, _buffer)
+        return bytes(_buffer)
+
+    def decode(self, data: bytes) -> Any:
+        _value, _ = self._decode(memoryview(data), 0)
+        return _value
+
+    def _encode(self, value: Any, buffer: bytearray) -> None:
+        if value is None:
+            buffer.append(self._NONE)
+
+        elif value is True or value is False:
+            buffer.append(self._TRUE if value else self._FALSE)
+
+        elif isinstance(value, int):
+            buffer.append(self._INT)
+            self._varint((value << 1) if value >= 0 else ((-value << 1) - 1), buffer)
+
+        elif isinstance(value, float):
+            buffer.append(self._FLOAT)
+            buffer += self._FLOAT_STRUCT.pack(value)
+
+        elif isinstance(value, str):
+            _encoded = value.encode()
+            buffer.append(self._STR)
+            self._varint(len(_encoded), buffer)
+            buffer += _encoded
+
+        elif isinstance(value, (bytes, bytearray, memoryview)):
+            buffer.append(self._BYTES)
+            self._varint(len(value), buffer)
+            buffer += value
+
+        elif isinstance(value, Mapping):
+            buffer.append(self._DICT)
+            self._varint(len(value), buffer)
+
+            for key, item in value.items():
+                self._encode(key, buffer)
+                self._encode(item, buffer)
+
+        elif isinstance(value, (list, tuple, Sequence)):
+            buffer.append(self._LIST)
+            self._varint(len(value), buffer)
+
+            for item in value:
+                self._encode(item, buffer)
+
+        else:
+            raise TypeError(f"Object of type {type(value).__name__} is not supported by `{self.name}` codec")
+
+    def _decode(self, data: memoryview, offset: int) -> Tuple[Any, int]:
+        _tag = data[offset]
+        offset += 1
+
+        if _tag == self._NONE:
+            return None, offset
+
+        if _tag == self._FALSE:
+            return False, offset
+
+        if _tag == self._TRUE:
+            return True, offset
+
+        if _tag == self._INT:
+            _zigzag, offset = self._read_varint(data, offset)
+            return (_zigzag >> 1) if not _zigzag & 1 else -((_zigzag + 1) >> 1), offset
+
+        if _tag == self._FLOAT:
+            return self._FLOAT_STRUCT.unpack_from(data, offset)[0], offset + 8
+
+        if _tag == self._STR:
+            _length, offset = self._read_varint(data, offset)
+            return str(data[offset: offset + _length], "utf-8"), offset + _length
+
+        if _tag == self._BYTES:
+            _length, offset = self._read_varint(data, offset)
+            return bytes(data[offset: offset + _length]), offset + _length
+
+        if _tag == self._LIST:
+            _length, offset = self._read_varint(data, offset)
+            _list = []
+
+            for _ in range(_length):
+                _item, offset = self._decode(data, offset)
+                _list.append(_item)
+
+            return _list, offset
+
+        if _tag == self._DICT:
+            _length, offset = self._read_varint(data, offset)
+            _dict = {}
+
+            for _ in range(_length):
+                _key, offset = self._decode(data, offset)
+                _dict[_key], offset = self._decode(data, offset)
+
+            return _dict, offset
+
+        raise ValueError(f"Invalid type tag {_tag} in `{self.name}` data")
+
+    @staticmethod
+    def _varint(value: int, buffer: bytearray) -> None:
+        while value > 0x7F:
+            buffer.append((value & 0x7F) | 0x80)
+            value >>= 7
+
+        buffer.append(value)
+
+    @staticmethod
+    def _read_varint(data: memoryview, offset: int) -> Tuple[int, int]:
+        _value = _shift = 0
+
+        while True:
+            _byte = data[offset]
+            offset += 1
+            _value |= (_byte & 0x7F) << _shift
+
+            if not _byte & 0x80:
+                return _value, offset
+
+            _shift += 7
+
+
+class CompressedCodec(Codec):
+    """
+    Another Codec, compressed in blocks, see ``filexdb.compression``.
+
+    Named ``<codec>+<compression>``, e.g. ``pickle+zlib``.
+    """
+
+    def __init__(self, codec: Codec, compression: str) -> None:
+        self.codec = codec
+        self.compression = compression
+        self.name = f"{codec.name}+{compression}"
+
+        # Fail early on an unknown compression.
+        decompress(b"", compression)
+
+    def encode(self, data: Any) -> bytes:
+        return compress(self.codec.encode(data), self.compression)
+
+    def decode(self, data: bytes) -> Any:
+        return self.codec.decode(decompress(data, self.compression))
+
+
+# Available Codecs by name.
+CODECS: Dict[str, Codec] = {}
+
+
+def register_codec(codec: Codec) -> None:
+    """
+    Make a Codec available by its name.
+
+    :param codec: Codec to register.
+    :return: None
+    """
+
+    CODECS[codec.name] = codec
+
+
+def get_codec(name: str | Codec, compression: str | None = None) -> Codec:
+    """
+    Find a registered Codec.
+
+    Names like ``pickle+zlib`` are the compressed variants of registered Codecs.
+
+    :param name: Name of Codec, or a Codec itself.
+    :param compression: Compression applied on top of the Codec, ``zlib``, ``lzma`` or ``bz2``.
+    :return: Codec
+    """
+
+    if isinstance(name, Codec):
+        _codec = name
+
+    elif name in CODECS:
+        _codec = CODECS[name]
+
+    elif "+" in name:
+        _name, _compression = name.rsplit("+", 1)
+        _codec = get_codec(_name, _compression)
+
+    else:
+        raise ValueError(f"`{name}` is not a valid codec, use one of {list(CODECS)}")
+
+    if compression is None:
+        return _codec
+
+    return CompressedCodec(_codec, compression)
+
+
+def dumps(data: Any, codec: str | Codec) -> bytes:
+    """
+    Encode ``data`` with a header naming the Codec.
+
+    :param data: Data to encode.
+    :param codec: Codec or its name.
+    :return: Encoded data.
+    """
+
+    _codec = get_codec(codec)
+
+    return _MAGIC + _FORMAT_VERSION + b" " + _codec.name.encode() + b"\n" + _codec.encode(data)
+
+
+def loads(data: bytes, legacy: Callable[[bytes], Any]) -> Any:
+    """
+    Decode data encoded by ``dumps``, with the Codec named in its header.
+
+    Data without a header was written before Codecs existed, it is decoded by ``legacy``.
+
+    :param data: Encoded data.
+    :param legacy: Decoder of data without a header, e.g. ``pickle.loads``.
+    :return: Decoded data.
+    """
+
+    if not data.startswith(_MAGIC):
+        return legacy(data)
+
+    _end = data.index(b"\n")
+    _version, _name = bytes(data[len(_MAGIC): _end]).split(b" ", 1)
+
+    if _version != _FORMAT_VERSION:
+        raise ValueError(f"Unsupported format version `{_version.decode()}`")
+
+    return get_codec(_name.decode()).decode(data[_end + 1:])
+
+
+register_codec(JsonCodec())
+register_codec(JsonCodec("json-pretty", indent=4))
+register_codec(PickleCodec())
+register_codec(MarshalCodec())
+register_codec(BinaryCodec())
+
+if orjson is not None:
+    register_codec(OrjsonCodec())
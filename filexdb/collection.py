@@ -1,8 +1,25 @@
+from __future__ import annotations
+
 import json
-from typing import Mapping, List
+import itertools
+import functools
+import contextlib
+import heapq
+from concurrent.futures import Executor
+from typing import Any, Callable, Mapping, MutableSequence, List, Iterable, Iterator, Dict, Sequence
 
 from .document import Document, JsonArray
-from .fileio import FileIO
+from .columnar import ColumnarCollection, LAYOUTS
+from .ids import get_id_factory
+from .fileio import FileIO, Export
+from .loader import Loader, Progress
+from .index import Index, SortedIndex, create_index, _sort_key as _index_key
+from .query import Query, compile_query, get_path, MISSING
+from .aggregate import compile_pipeline
+from .update import Update, compile_update, is_operator_update, apply_delta
+from .cursor import Cursor, order_key, _sort_spec
+from .lock import ReadWriteLock
+from .parallel import parallel_filter
 
 
 #            ^__^
@@ -13,19 +30,70 @@ from .fileio import FileIO
 #           ~~~~~~~~~~~~~~~~~~~~
 
 
+def _locked(method):
+    """
+    Run a method of Collection as the only writer of Collection, while holding the lock
+    of its FileIO too, so the Database is never written in the middle of a change.
+
+    The lock of Collection is always taken first, so writers of different Collections never deadlock.
+    """
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock.write(), self._file_handler.lock:
+            return method(self, *args, **kwargs)
+
+    return wrapper
+
+
+def _reading(method):
+    """
+    Run a method of Collection as a reader, along with other readers but never along with a writer.
+    """
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock.read():
+            return method(self, *args, **kwargs)
+
+    return wrapper
+
+
 class Collection:
-    def __init__(self, col_name: str, file_handler: FileIO) -> None:
+    def __init__(self, col_name: str, file_handler: FileIO, executor: Executor | None = None,
+                 id_factory: str | Callable[[], Any] = "uuid") -> None:
         self._col_name = col_name
         self._file_handler = file_handler
 
+        # Runs the workers of ``find(parallel=True)``, a new process pool per call if None.
+        self._executor = executor
+
+        # Creates ``_id_`` of new Documents, see ``set_id_factory``.
+        self._new_id = get_id_factory(id_factory)
+
+        # Held by readers & writers of Collection, see ``_locked`` & ``_reading``.
+        self._lock = ReadWriteLock()
+
         # Get the data of existing Database or empty database.
+        # It is shared by all Collections of the same FileIO.
         self._database = self._get_database()
 
+        # How Documents are stored in memory, see ``set_layout``.
+        self._layout = self._load_layout()
+
         # Initiating Collecting
-        self._collection: JsonArray = self._get_collection()
+        self._collection: MutableSequence = self._get_collection()
+
+        # ``_id_`` -> Document map of Collection
+        self._index: Dict[str, Document] = self._build_index()
+
+        # Secondary Indexes of Collection, field -> Index
+        self._indexes: Dict[str, Index] = self._load_indexes()
+
+        # ``generation`` of FileIO, the state above was built from.
+        self._generation = self._file_handler.generation
 
-        # Cursor
-        self._cursor: int = 0
+        self._seed_ids()
 
     def insert(self, document: Mapping) -> str:
         """
@@ -37,85 +105,139 @@ class Collection:
         :return: Document ID.
         """
 
-        # Make sure the document implements the ``Mapping`` interface
-        if not isinstance(document, Mapping):
-            raise ValueError('Document is not a Dictionary')
-
-        # Check if user trying to modify "_id_"
-        if "_id_" in document.keys():
-            raise KeyError(f"You are not allowed to modify key `_id_`")
-
-        # getting Database
-        _database = self._get_database()
-
-        # Create a Document
-        _document = Document(document)
+        # Insert as a batch of one Document.
+        _doc_id = self._insert_documents([document])
 
-        # ID of Document
-        _doc_id: str = str(_document.id)
-
-        # check Document is already exist or not
-        if not self._doc_is_exists(str(_document.id)):
-
-            # Append the document into the Collection
-            self._collection.append(_document)
-
-            # Add modified Collection to Database
-            _database[self._col_name] = self._collection
-
-            # print(self._database)
-            # Write current state of Database into the Database-file
-            self._file_handler.write(_database)
-
-            return _doc_id
-        else:
-            raise ValueError(f"Document id `{_document.id}` is already exists")
+        return _doc_id[0]
 
     def insert_all(self, document_list: List[Mapping]) -> JsonArray:
         """
-        Inserts a single ``Document`` into the ``Database``.
+        Inserts multiple ``Document`` into the ``Database``.
 
         Document should be a ``List`` of ``JSON Object``.
+        Whole ``List`` is validated first & then written to Database at once.
 
         :param document_list: List of Documents to insert into Database
-        :return: Inserted row(s) count
+        :return: List of Document ID.
         """
 
         # Make sure the document_list implements the ``List`` interface.
         if not isinstance(document_list, List):
             raise ValueError('Document is not a List of Dictionary')
 
+        return JsonArray(self._insert_documents(document_list))
+
+    def insert_many(self, documents: Iterable[Mapping], batch_size: int = 1000) -> JsonArray:
+        """
+        Inserts Documents of any iterable into the ``Database``, ``batch_size`` Documents at once.
+
+        Every batch is validated & written to Database separately, so a large stream
+        of Documents never has to be in memory as a whole.
+
+        :param documents: Iterable of Documents to insert into Database.
+        :param batch_size: Amount of Documents written at once.
+        :return: List of Document ID.
+        """
+
+        if batch_size < 1:
+            raise ValueError("batch_size must be greater than 0.")
+
         # id of Document
         _doc_id: List[str] = []
 
-        # Iterate over all Documents of document_list & Insert one by one.
-        for document in document_list:
-            # insert every single document in Database & increment ``doc_count``.
-            _doc_id.append(self.insert(document))
+        _iterator = iter(documents)
+
+        # Slice the stream into batches & insert batch by batch.
+        _batch = list(itertools.islice(_iterator, batch_size))
+
+        while _batch:
+            _doc_id += self._insert_documents(_batch)
+            _batch = list(itertools.islice(_iterator, batch_size))
 
         return JsonArray(_doc_id)
 
-    def find(self, query=None, limit=None) -> JsonArray:
+    def load(self, file_path: str, format: str | None = None, batch_size: int = 10000,
+             progress: Callable[[dict], Any] | None = None, parallel: bool = False,
+             workers: int | None = None) -> int:
+        """
+        Inserts the Documents of a JSON, NDJSON or CSV file, e.g. a file written by ``export``.
+
+        The file is streamed ``batch_size`` Documents at a time. ``_id_`` of Documents is kept,
+        new ids are created for Documents without one. Secondary Indexes are built once, after the
+        last batch. Batches written before an invalid batch stay inserted.
+
+        :param file_path: Path of file, compressed if it ends with ``.gz``, ``.xz`` or ``.bz2``.
+        :param format: ``json``, ``ndjson`` or ``csv``, detected from the extension of file if None.
+            Of a JSON object of arrays, like an export of Database, the array named after Collection is loaded.
+        :param batch_size: Amount of Documents inserted at once.
+        :param progress: Called after every batch with ``documents``, ``bytes``, ``total_bytes``,
+            ``seconds`` & ``documents_per_second`` of the load so far.
+        :param parallel: Parse NDJSON & CSV in worker processes, see ``Loader.batches``.
+        :param workers: Amount of worker processes, the amount of CPUs by default.
+        :return: Amount of Documents inserted.
+        """
+
+        with Loader(file_path, format) as _loader, self._bulk():
+            _progress = Progress(_loader, progress)
+
+            for col_name, documents in _loader.batches(batch_size, parallel, workers, self._executor):
+                if col_name is None or col_name == self._col_name:
+                    self._insert_documents(documents, restore=True)
+                    _progress.update(len(documents))
+
+        return _progress.documents
+
+    @_reading
+    def find(self, query=None, limit=None, lazy: bool = False, parallel: bool = False,
+             workers: int | None = None, sort=None, after: Mapping | None = None) -> JsonArray | Cursor:
         """
         Finds all ``Document`` of ``Collection``.
 
         If ``query`` is None then returns all the ``Documents`` of ``Collection``.
 
         If ``query`` is not None then find returns all the occurrences.
+        Besides exact values, ``query`` supports operators like ``$gt``, ``$in``, ``$regex``
+        & nested fields like ``address.PO``, see ``filexdb.query.compile_query``.
+
+        If ``lazy`` is True, returns a ``Cursor`` which finds the Documents only while
+        it is iterated & supports ``skip``, ``limit``, ``sort`` & ``project``.
+
+        If ``parallel`` is True, a full scan is split into chunks which are matched by
+        ``workers`` processes, the result is the same. It pays off for large Collections
+        & complex queries only.
 
-        :param limit: Amount of Document to fetch
+        If ``sort`` is given, Documents are ordered by its fields & then by ``_id_``. Only the first
+        ``limit`` Documents are kept while the Collection is scanned, or they are read in order
+        from a sorted Index of the first field, see ``_ordered``. ``after`` continues from the
+        last Document of a previous page, without reading the pages before it again.
+
+        :param limit: Amount of Document to fetch, or a tuple of (start, end).
         :param query: Condition to search Document
+        :param lazy: Return a ``Cursor`` instead of a List of Document.
+        :param parallel: Match Documents in worker processes.
+        :param workers: Amount of worker processes, the amount of CPUs by default.
+        :param sort: Field name, or a list of ``(field, direction)`` with 1 for ascending & -1 for descending order.
+        :param after: Last Document of previous page, ordered by ``_id_`` if ``sort`` is None.
         :return: List of Document
         """
 
+        self._sync()
+
         # Default result
-        _result = []
+        _result: Sequence[Document] = []
 
         # Make sure the query implements the ``Mapping`` interface.
         if query:
             if not isinstance(query, Mapping):
                 raise ValueError('Document is not a Dictionary')
 
+        # A single amount is the first ``limit`` Documents.
+        if isinstance(limit, int) and not isinstance(limit, bool):
+            if limit < 0:
+                raise ValueError("limit must not be negative.")
+
+            limit = (0, limit)
+
         # Make sure the query implements the ``Tuple`` interface.
         if limit:
             if not isinstance(limit, tuple):
@@ -136,6 +258,52 @@ class Collection:
             else:
                 raise ValueError(f"limit is a tuple of 2 values, {len(limit)} is given.")
 
+        if sort is not None or after is not None:
+            _spec = [] if sort is None else _sort_spec(sort)
+            _query = compile_query(query)
+            _count = _limit_end if limit else None
+
+            if after is not None and (not isinstance(after, Mapping) or "_id_" not in after):
+                raise ValueError("`after` is the last Document of previous page, with its `_id_`")
+
+            if lazy:
+                def ordered() -> Iterable[Document]:
+                    with self._lock.read():
+                        self._sync()
+                        return list(self._ordered(_query, _spec, after, _count, parallel, workers))
+
+                _cursor = Cursor(ordered, _query)
+
+                if limit:
+                    _cursor.skip(_limit_start).limit(_limit_end - _limit_start)
+
+                return _cursor
+
+            _result = list(self._ordered(_query, _spec, after, _count, parallel, workers))
+
+            return JsonArray(_result[_limit_start:])
+
+        if lazy:
+            # Compile the query once for every iteration of Cursor.
+            _query = compile_query(query)
+
+            def source() -> Iterable[Document]:
+                # Iterate a snapshot, changes made meanwhile don't disturb the Cursor.
+                with self._lock.read():
+                    self._sync()
+
+                    if parallel:
+                        return self._find_parallel(_query, workers)
+
+                    return self._snapshot(self._candidates(_query))
+
+            _cursor = Cursor(source, _query)
+
+            if limit:
+                _cursor.skip(_limit_start).limit(_limit_end - _limit_start)
+
+            return _cursor
+
         # Check if ``query`` is None or not None.
         if query is None:
             # Check if it has a limit or not. If it has a limit do limit specific tasks.
@@ -155,21 +323,19 @@ class Collection:
 
             return JsonArray(_result)
 
-        elif query is not None and type(query) == type({}):
-            if limit:
-                for i in self._collection:
-                    _doc = self._find_document_by_query(query)
-
-                    # Append Document to the result if found
-                    if _doc:
-                        _result += _doc
+        elif query is not None and isinstance(query, Mapping):
+            # Compile the query once for all the Documents.
+            _query = compile_query(query)
 
-                        # Check the result reached to the limit or not
-                        if len(_result) >= _limit_end:
-                            break
+            if parallel:
+                _documents = iter(self._find_parallel(_query, workers))
+            else:
+                _match = _query.match
+                _documents = (_doc for _doc in self._candidates(_query) if _match(_doc))
 
-                # Reset the cursor
-                self._reset_cursor()
+            if limit:
+                # Stop once the result reached to the limit.
+                _result = list(itertools.islice(_documents, _limit_end))
 
                 # check if lower limit is valid or not
                 if _limit_start >= len(_result) and _limit_start != 0:
@@ -179,79 +345,336 @@ class Collection:
                     _result = _result[_limit_start: _limit_end]
 
             else:
-                for i in self._collection:
-                    _doc = self._find_document_by_query(query)
+                _result = list(_documents)
+
+        return JsonArray(_result)
 
-                    if _doc:
-                        _result += _doc
-                    else:
-                        _result = _result
+    def export(self, _file_name, _file_dir=None, _mode="json", query=None, _compression=None,
+               _fields: List[str] | None = None) -> None:
+        """
+        Export the Documents matching ``query`` in to readable file.
 
-                self._reset_cursor()
+        Documents are streamed by a lazy Cursor, see ``Export``.
 
-        return JsonArray(_result)
+        :param _file_name: File name in which data will be exported.
+        :param _file_dir: Parent directory of export file.
+        :param _mode: In which file mode you want to export data, ``json``, ``ndjson`` or ``csv``.
+        :param query: Condition to search Document, all Documents by default.
+        :param _compression: Compression of export file, ``zlib`` (``.gz``), ``lzma`` (``.xz``) or ``bz2``.
+        :param _fields: Columns of ``csv``, the fields of first Documents by default.
+        :return: None
+        """
+
+        Export(self.find(query, lazy=True), _file_name, _file_dir, _mode, _compression, _fields=_fields)
+
+    @_reading
+    def aggregate(self, pipeline: List[Mapping]) -> JsonArray:
+        """
+        Run an aggregation pipeline over the Documents of ``Collection``.
+
+        Documents stream through the stages one by one, see ``filexdb.aggregate.Pipeline``.
+        A first ``$match`` stage finds its Documents by an Index if possible. Columnar Collections
+        group their columns directly, without building Documents.
+
+        :param pipeline: List of stages, e.g. ``[{"$match": {...}}, {"$group": {"_id_": "$dept", ...}}]``.
+        :return: List of resulting Document.
+        """
+
+        _pipeline = compile_pipeline(pipeline)
+
+        self._sync()
+
+        _result = None
+
+        if hasattr(self._collection, "positions"):
+            _result = _pipeline.run_columns(self._collection)
+
+        if _result is None:
+            _query = _pipeline.first_match
+
+            # The ``$match`` stage still tests the candidates.
+            _result = _pipeline.run(self._collection if _query is None else self._candidates(_query))
+
+        return JsonArray(list(_result))
+
+    @_reading
+    def count(self, query=None) -> int:
+        """
+        Count the Documents matching ``query``, all Documents if ``query`` is None.
+
+        A query of a single indexed field is counted by its Index & a query of top-level fields of
+        a Columnar Collection by its columns, without building any Document.
+
+        :param query: Condition to search Document.
+        :return: Amount of Document.
+        """
+
+        self._sync()
+
+        if not query:
+            return len(self._collection)
+
+        _query = compile_query(query)
+
+        if _query.exact:
+            _doc_id = self._ids_by_index(_query)
+
+            if _doc_id is not None:
+                return len(_doc_id)
+
+        _positions = getattr(self._collection, "positions", None)
 
+        if _positions is not None and not any(key.startswith("$") or "." in key for key in _query.query):
+            return len(_positions(_query))
+
+        _match = _query.match
+
+        return sum(1 for _doc in self._candidates(_query) if _match(_doc))
+
+    @_locked
     def delete(self, query=None) -> JsonArray:
         """
         Delete single or multiple Document when meet the Conditions or ``query``.
 
+        Matching Documents are removed in a single pass & written at once.
+
         [Recommended]
         Use unique identifier as ``query``.
 
         :param query: Condition to search Document
-        :return: int - amount of effected Document
+        :return: List of document ID.
         """
-        # IDs of Effected Documents
-        _doc_id: List[str] = []
 
-        # Fetching a Documents meet the query
-        _documents = self.find(query, None)
+        return self._delete_documents(self.find(query))
 
-        # Fetch every Document & remove from Collection
-        for _doc in _documents:
-            self._collection.remove(_doc)
-            _doc_id.append(_doc["_id_"])
+    @_locked
+    def delete_one(self, query=None) -> JsonArray:
+        """
+        Delete the first Document meets the ``query``.
 
-        self._file_handler.write(self._database)
+        :param query: Condition to search Document
+        :return: List of document ID, empty if no Document matched.
+        """
 
-        return JsonArray(_doc_id)
+        return self._delete_documents(self._find_first(query))
 
+    @_locked
     def update(self, document: Mapping, query=None) -> JsonArray:
         """
         Fetch all the Documents mathc the conditions and update them.
 
+        ``document`` is either new key values, or update operators applied to every Document
+        in place, e.g. ``{"$inc": {"visits": 1}, "$push": {"log": "visit"}}``, see ``filexdb.update``.
+        All matching Documents are updated first & then written at once.
+
         [Recommended]
         Use a unique identifier as ``query``.
 
-        :param document: New key values to update
+        :param document: New key values or update operators.
         :param query: Condition to search Document.
         :return: List of document ID.
         """
-        _documents = self.find(query)
-        _new_doc = document
 
-        # IDs of Effected Documents
-        _doc_id: List[str] = []
+        _update = self._compile_update(document)
 
-        # Fetch all Documents to update if got multiple.
-        for _doc in _documents:
-            for key, value in _new_doc.items():
+        return self._update_documents(self.find(query), document, _update)
 
-                # Check if user trying to modify "_id_"
-                if key == "_id_":
-                    raise KeyError(f"You are not allowed to modify key `{key}`")
+    @_locked
+    def update_one(self, document: Mapping, query=None) -> JsonArray:
+        """
+        Update the first Document meets the ``query``.
 
-                # Update Document
-                # Create new field if needed.
-                _doc[key] = value
+        :param document: New key values or update operators, see ``update``.
+        :param query: Condition to search Document.
+        :return: List of document ID, empty if no Document matched.
+        """
 
-            _doc_id.append(_doc["_id_"])
+        _update = self._compile_update(document)
 
-            # Write current state of Database
-            self._file_handler.write(self._database)
+        return self._update_documents(self._find_first(query), document, _update)
 
-        return JsonArray(_doc_id)
+    @_reading
+    def get(self, doc_id: str) -> Document | None:
+        """
+        Fetch a single ``Document`` by its ``_id_``.
+
+        Returns None if no Document has the ``_id_``.
+
+        :param doc_id: ID of Document.
+        :return: Document
+        """
+
+        self._sync()
+
+        return self._index.get(doc_id)
+
+    @_locked
+    def update_by_id(self, doc_id: str, document: Mapping) -> JsonArray:
+        """
+        Update a single ``Document`` by its ``_id_``.
+
+        :param doc_id: ID of Document.
+        :param document: New key values or update operators, see ``update``.
+        :return: List of document ID.
+        """
+
+        _update = self._compile_update(document)
+
+        self._sync()
+
+        _doc = self._index.get(doc_id)
+
+        return self._update_documents([] if _doc is None else [_doc], document, _update)
+
+    @_locked
+    def delete_by_id(self, doc_id: str) -> JsonArray:
+        """
+        Delete a single ``Document`` by its ``_id_``.
+
+        The Document is found without a scan, but the rest of Collection is shifted to keep
+        their order, so it is O(n) in the size of Collection. Delete many Documents by a single
+        ``delete`` rather than one by one.
+
+        :param doc_id: ID of Document.
+        :return: List of document ID.
+        """
+
+        self._sync()
+
+        _doc = self._index.get(doc_id)
+
+        return self._delete_documents([] if _doc is None else [_doc])
+
+    @_locked
+    def create_index(self, field: str, kind: str = "hash") -> int:
+        """
+        Index a field of all Documents, to find Documents by that field without a full scan.
+
+        ``hash`` Indexes serve equality lookups, ``sorted`` Indexes serve range lookups
+        & ordered scans too. Index is kept up to date on every change of Collection.
+
+        :param field: Field to index.
+        :param kind: ``hash`` or ``sorted``.
+        :return: Amount of created Index.
+        """
+
+        self._sync()
+
+        # Check the field is already indexed or not
+        if field in self._indexes:
+            if self._indexes[field].kind != kind:
+                raise ValueError(f"`{field}` is already indexed as `{self._indexes[field].kind}`")
+
+            return 0
+
+        _index = create_index(field, kind)
+        _index.build(self._collection)
+
+        self._indexes[field] = _index
+        self._save_indexes()
 
+        return 1
+
+    @_locked
+    def drop_index(self, field: str) -> int:
+        """
+        Deletes the Index of a field.
+
+        :param field: Indexed field.
+        :return: Amount of affected Index.
+        """
+
+        self._sync()
+
+        if field not in self._indexes:
+            return 0
+
+        del self._indexes[field]
+        self._save_indexes()
+
+        return 1
+
+    @_reading
+    def list_indexes(self) -> JsonArray:
+        """
+        Shows all Indexes of Collection.
+
+        :return: List of Index as ``{"field": ..., "kind": ...}``.
+        """
+
+        self._sync()
+
+        return JsonArray([{"field": field, "kind": index.kind} for field, index in self._indexes.items()])
+
+    @_locked
+    def set_id_factory(self, id_factory: str | Callable[[], Any]) -> None:
+        """
+        Change how ``_id_`` of new Documents is created.
+
+        - ``uuid``: ``uuid1`` as 32 hex characters (default).
+        - ``ulid``: 26 characters, sorted by creation time.
+        - ``objectid``: 24 hex characters like MongoDB, sorted by creation time in seconds.
+        - ``int``: 1, 2, 3... after the largest integer ``_id_`` of Collection.
+        - A function returning a new unique id.
+
+        Ids sorted by creation time make a ``sorted`` Index of ``_id_`` an Index of insertion
+        order too, see ``filexdb.ids.UlidIds.lower_bound``.
+
+        :param id_factory: Name of id factory or a function.
+        :return: None
+        """
+
+        self._sync()
+
+        self._new_id = get_id_factory(id_factory)
+        self._seed_ids()
+
+    @_locked
+    def set_layout(self, layout: str) -> None:
+        """
+        Change how the Documents of Collection are stored in memory.
+
+        - ``rows``: every Document is a ``Document`` (``dict``).
+        - ``columnar``: every field is stored as a column of values, numbers in an ``array``,
+          see ``ColumnarCollection``. It takes far less memory for many similar Documents &
+          queries read only the columns of their fields. Documents are views of their values.
+
+        Layout is stored in the metadata of Database, the Database-file is the same in both layouts.
+
+        :param layout: ``rows`` or ``columnar``.
+        :return: None
+        """
+
+        if layout not in LAYOUTS:
+            raise ValueError(f"`{layout}` is not a valid layout, use one of {list(LAYOUTS)}")
+
+        # Collections read lazily by FileIO have a layout of their own, see ``PagedCollection``.
+        if layout == "columnar" and not isinstance(self._file_handler.new_collection(), list):
+            raise ValueError(f"`{type(self._file_handler).__name__}` doesn't support `columnar` layout")
+
+        self._sync()
+
+        if layout == self._layout:
+            return
+
+        self._layout = layout
+
+        _meta = self._file_handler.read_meta()
+        _layout_meta = _meta.setdefault("layouts", {})
+
+        if layout == "columnar":
+            _layout_meta[self._col_name] = layout
+        else:
+            _layout_meta.pop(self._col_name, None)
+
+        self._file_handler.write_meta(_meta)
+
+        # Same Documents, stored the other way.
+        self._collection = self._get_collection()
+        self._index = self._build_index()
+        self._indexes = self._load_indexes()
+
+    @_locked
     def rename(self, new_name: str) -> int:
         """
         This method used to change the name of collection.
@@ -261,6 +684,8 @@ class Collection:
         :return: Amount of affected collection.
         """
 
+        self._sync()
+
         # Initiating counter
         count = 0
 
@@ -270,17 +695,42 @@ class Collection:
             # Putting old data into new collection
             self._database[new_name] = self._collection
 
+            # Remove old collection
+            self._database.pop(self._col_name, None)
+
             # Writing Current database status into the file
-            self._file_handler.write(self._database)
+            self._file_handler.apply(self._database, [
+                {"op": "rename", "collection": self._col_name, "name": new_name}
+            ])
 
-            # Remove old collection
-            self.drop()
+            # Indexes belong to the new collection now.
+            _meta = self._file_handler.read_meta()
+            _index_meta = _meta.get("indexes", {})
+
+            _layout_meta = _meta.get("layouts", {})
+
+            if self._col_name in _index_meta or self._col_name in _layout_meta:
+                if self._col_name in _index_meta:
+                    _index_meta[new_name] = _index_meta.pop(self._col_name)
+
+                if self._col_name in _layout_meta:
+                    _layout_meta[new_name] = _layout_meta.pop(self._col_name)
+
+                self._file_handler.write_meta(_meta)
+
+            # This Collection is empty now, like a dropped one.
+            self._layout = "rows"
+            self._collection = self._file_handler.new_collection()
+            self._index = self._build_index()
+            self._indexes = {}
+            self._seed_ids()
 
             # Increasing counter
             count += 1
 
         return count
 
+    @_locked
     def drop(self) -> int:
         """
         Deletes the selected collection from the database
@@ -291,8 +741,14 @@ class Collection:
         # Initiating counter
         count = 0
 
+        self._sync()
+
         # Getting database
-        _database = self._file_handler.read()
+        _database = self._database
+
+        # Forget the Documents of dropped collection.
+        self._collection.clear()
+        self._index.clear()
 
         # Check database has the collection or not
         if self._col_name in _database.keys():
@@ -300,29 +756,39 @@ class Collection:
             _database.pop(self._col_name)
 
             # Writing current status of database into the file system.
-            self._file_handler.write(_database)
+            self._file_handler.apply(_database, [{"op": "drop", "collection": self._col_name}])
 
             # Increasing counter
             count += 1
 
+        # Forget the Indexes of dropped collection.
+
+        if self._indexes:
+            self._indexes.clear()
+            self._save_indexes()
+
+        self._seed_ids()
+
         return count
 
     # ----------------------------------------------------------------#
-    def _get_database(self) -> Document:
+    def _get_database(self) -> dict:
         """
         Getting Database
 
         :return: Database
         """
         # Get the data of existing Database or empty database.
-        database = Document(self._file_handler.read(), False)
+        database = self._file_handler.load()
 
         return database
 
-    def _get_collection(self) -> JsonArray:
+    def _get_collection(self) -> MutableSequence:
         """
         Getting Collection
 
+        A new Collection is added to Database only when a Document is inserted.
+
         :return: Collection
         """
         # Initiate a default Collection.
@@ -330,92 +796,551 @@ class Collection:
         if self._col_name in self._database.keys():
 
             # Get the existing Collection
-            _collection: JsonArray = self._database[self._col_name]
-
-        else:
-            # Create new Collection
-            self._database[self._col_name] = JsonArray([])
             _collection = self._database[self._col_name]
 
-        return JsonArray(_collection)
+            # Database-file stores Documents, they are put into the layout of Collection.
+            if self._layout == "columnar" and not isinstance(_collection, ColumnarCollection):
+                _collection = self._database[self._col_name] = ColumnarCollection(_collection)
+
+            elif self._layout == "rows" and isinstance(_collection, ColumnarCollection):
+                _collection = self._database[self._col_name] = [Document(doc) for doc in _collection]
 
-    def _reset_cursor(self) -> None:
+            return _collection
+
+        if self._layout == "columnar":
+            return ColumnarCollection()
+
+        return self._file_handler.new_collection()
+
+    def _sync(self) -> None:
         """
-        Reset Cursor Pointer to 0th index
+        Rebuild the state of Collection if the Database has been reloaded from the Database-file.
+
         :return: None
         """
-        self._cursor = 0
 
-    def _find_document_by_query(self, query: Mapping) -> JsonArray | None:
+        # Readers may sync at the same time, only one of them rebuilds.
+        with self._file_handler.lock:
+            self._database = self._get_database()
+
+            if self._generation == self._file_handler.generation:
+                return
+
+            self._layout = self._load_layout()
+            self._collection = self._get_collection()
+            self._index = self._build_index()
+            self._indexes = self._load_indexes()
+            self._generation = self._file_handler.generation
+
+            self._seed_ids()
+
+    @contextlib.contextmanager
+    def _bulk(self) -> Iterator[None]:
+        """
+        Insert many batches, e.g. by ``load``, with the Indexes built once at the end.
+
+        Secondary Indexes are not used while the block runs. Changes to FileIOs which write
+        the whole Database are written once, when the block ends.
+
+        :return: None.
+        """
+
+        with self._lock.write():
+            self._sync()
+            self._indexes = {}
+
+        try:
+            if self._file_handler.incremental:
+                yield
+            else:
+                with self._file_handler.deferred():
+                    yield
+
+        finally:
+            with self._lock.write(), self._file_handler.lock:
+                self._sync()
+                self._indexes = self._load_indexes()
+                self._seed_ids()
+
+    @_locked
+    def _insert_documents(self, documents: List[Mapping], restore: bool = False) -> List[str]:
+        """
+        Validates a batch of Documents & inserts them with a single write.
+
+        Nothing is inserted if any Document of the batch is invalid.
+
+        :param documents: Documents to insert.
+        :param restore: Keep ``_id_`` of Documents, as exported.
+        :return: List of Document ID.
         """
-        Finds a single ``Document`` of ``Collection``.
 
-        Returns None if ``query`` is None of any Document not found.
+        self._sync()
+
+        # IDs of Documents in this batch.
+        _batch_id = set()
+
+        _documents: List[Document] = []
+
+        for document in documents:
+            # Make sure the document implements the ``Mapping`` interface
+            if not isinstance(document, Mapping):
+                raise ValueError('Document is not a Dictionary')
+
+            # Check if user trying to modify "_id_"
+            if "_id_" in document.keys() and not restore:
+                raise KeyError("You are not allowed to modify key `_id_`")
+
+            # Create a Document
+            _document = Document(document, id_factory=self._new_id)
+
+            # check Document is already exist or not
+            if self._doc_is_exists(_document.id) or _document.id in _batch_id:
+                raise ValueError(f"Document id `{_document.id}` is already exists")
+
+            _batch_id.add(_document.id)
+            _documents.append(_document)
+
+        if not _documents:
+            return []
+
+        # getting Database
+        _database = self._database
+
+        # Append the documents into the Collection
+        self._collection.extend(_documents)
+
+        for _document in _documents:
+            self._index[_document.id] = _document
+
+        self._index_documents(_documents)
+
+        # Add modified Collection to Database
+        _database[self._col_name] = self._collection
+
+        # Write current state of Database into the Database-file, once for whole batch.
+        self._file_handler.apply(_database, [
+            {"op": "insert", "collection": self._col_name, "documents": _documents}
+        ])
+
+        return [_document.id for _document in _documents]
+
+    def _find_first(self, query=None) -> List[Document]:
+        """
+        The first Document meets the ``query``, without matching the rest of Collection.
 
         :param query: Condition to search Document
-        :return: Document
+        :return: List of at most one Document.
         """
-        result = []
+
+        self._sync()
 
         # Make sure the query implements the ``Mapping`` interface.
-        if not isinstance(query, Mapping):
+        if query and not isinstance(query, Mapping):
+            raise ValueError('Document is not a Dictionary')
+
+        _query = compile_query(query)
+
+        return list(itertools.islice((_doc for _doc in self._candidates(_query) if _query.match(_doc)), 1))
+
+    def _compile_update(self, document: Mapping) -> Update | None:
+        """
+        Make sure ``document`` can update Documents & compile its update operators.
+
+        :param document: New key values or update operators.
+        :return: Compiled Update, None for new key values.
+        """
+
+        # Make sure the document implements the ``Mapping`` interface
+        if not isinstance(document, Mapping):
             raise ValueError('Document is not a Dictionary')
 
-        # Get the length on Collection
-        _collection_length = len(self._collection)
+        if is_operator_update(document):
+            return compile_update(document)
 
-        # Iterate all the Documents of Collection
-        for doc_index in range(self._cursor, _collection_length):
+        # Check if user trying to modify "_id_"
+        if "_id_" in document.keys():
+            raise KeyError("You are not allowed to modify key `_id_`")
 
-            # Update ``self._doc_index`` with ``doc_index``, to iterate next Document.
-            self._cursor = doc_index + 1
+        return None
 
-            # Get the length on ``query`` to iterate all attributes
-            _query_length = len(query)
+    def _update_documents(self, documents: List[Document], document: Mapping,
+                          update: Update | None = None) -> JsonArray:
+        """
+        Update Documents of Collection & write them with a single change.
 
-            # Typecast ``query`` in to a ``list`` to iterate it.
-            _query_list = list(query.items())
+        :param documents: Documents to update.
+        :param document: New key values to update
+        :param update: Compiled update operators of ``document``, if it has.
+        :return: List of document ID.
+        """
 
-            # ``_bag_of_query`` indicates the Document is desired or not.
-            _bag_of_query = [0] * _query_length
+        if not documents:
+            return JsonArray([])
 
-            for i in range(_query_length):
+        # Every delta is computed before any Document changes, a failing update changes nothing.
+        _deltas = None if update is None else [update.delta(_doc) for _doc in documents]
 
-                # Check the ``key`` is belongs to the Documents or not.
-                if _query_list[i][0] in self._collection[doc_index]:
+        # Take the Documents out of Indexes while they change.
+        self._unindex_documents(documents)
 
-                    # Check the ``value`` of ``query`` is same to the Document's or not.
-                    if self._collection[doc_index][_query_list[i][0]] == _query_list[i][1]:
+        if _deltas is None:
+            # Create new field if needed.
+            for _doc in documents:
+                _doc.update(document)
 
-                        # If both values are same, then update ``_bag_of_query[i]`` as 1.
-                        _bag_of_query[i] = 1
+            # ``set`` lets a Log store the key values once, instead of every updated Document.
+            _change = {"op": "update", "collection": self._col_name, "documents": list(documents),
+                       "set": dict(document)}
 
-                    else:
-                        continue
-                else:
-                    continue
-                    # Check if ``_bag_of_query`` contains any `0` or not.
-                    # If it has any value then this is the desired Document.
-                    # Else such Document in Collection.
+        else:
+            for _doc, delta in zip(documents, _deltas):
+                apply_delta(_doc, delta)
+
+            # ``deltas`` let a Log store only the changed fields of every Document.
+            _change = {"op": "update", "collection": self._col_name, "documents": list(documents),
+                       "deltas": [(_doc["_id_"], delta) for _doc, delta in zip(documents, _deltas)]}
+
+        self._index_documents(documents)
+
+        self._file_handler.apply(self._database, [_change])
+
+        return JsonArray([_doc["_id_"] for _doc in documents])
+
+    def _delete_documents(self, documents: List[Document]) -> JsonArray:
+        """
+        Remove Documents from Collection in a single pass & write it with a single change.
+
+        :param documents: Documents to remove.
+        :return: List of document ID.
+        """
+
+        if not documents:
+            return JsonArray([])
+
+        _doc_id = [_doc["_id_"] for _doc in documents]
+
+        self._remove_documents(_doc_id)
 
-            if 0 not in _bag_of_query:
+        self._file_handler.apply(self._database, [
+            {"op": "delete", "collection": self._col_name, "ids": _doc_id}
+        ])
+
+        return JsonArray(_doc_id)
+
+    def _snapshot(self, documents: Iterable[Document]) -> Iterable[Document]:
+        """
+        A copy of ``documents`` which is not changed by later changes of Collection.
+
+        :param documents: Documents of Collection.
+        :return: Snapshot of Documents.
+        """
+
+        # Lazy Collections (e.g. ``PagedCollection``) iterate a snapshot of their own.
+        return documents.copy() if isinstance(documents, list) else documents
+
+    def _build_index(self) -> Dict[str, Document]:
+        """
+        Map ``_id_`` of every Document of Collection to the Document.
+
+        :return: ``_id_`` -> Document map.
+        """
+
+        # Collections which read Documents lazily provide a view instead, see ``PagedCollection``.
+        _id_index = getattr(self._collection, "id_index", None)
+
+        if _id_index is not None:
+            return _id_index()
+
+        return {doc["_id_"]: doc for doc in self._collection}
+
+    def _remove_documents(self, doc_id: List[str]) -> None:
+        """
+        Removes Documents from Collection in a single pass, keeping the order of rest.
+
+        :param doc_id: IDs of Documents to remove.
+        :return: None
+        """
+
+        _doc_id = set(doc_id)
+
+        # Take the Documents out of Indexes while they can still be read.
+        _documents = [self._index[_id] for _id in _doc_id if _id in self._index]
+        self._unindex_documents(_documents)
+
+        _remove_ids = getattr(self._collection, "remove_ids", None)
+
+        if _remove_ids is not None:
+            _remove_ids(_doc_id)
+
+        elif len(_documents) == 1:
+            # Documents are never equal to each other, so only the Document itself matches.
+            del self._collection[self._collection.index(_documents[0])]
+
+        else:
+            self._collection[:] = [doc for doc in self._collection if doc["_id_"] not in _doc_id]
 
-                # return the Document
-                result.append(self._collection[doc_index])
+        for _id in _doc_id:
+            self._index.pop(_id, None)
 
-            elif doc_index <= _collection_length:
-                # self._doc_index = doc_index
+    def _seed_ids(self) -> None:
+        """
+        Let an id factory counting up (e.g. ``int``) continue after the ids of Collection.
+
+        :return: None
+        """
+
+        _seed = getattr(self._new_id, "seed", None)
+
+        if _seed is not None:
+            _seed(self._index)
+
+    def _load_layout(self) -> str:
+        """
+        Layout of Collection, as stored in the metadata of Database.
+
+        :return: ``rows`` or ``columnar``.
+        """
+
+        return self._file_handler.read_meta().get("layouts", {}).get(self._col_name, "rows")
+
+    def _load_indexes(self) -> Dict[str, Index]:
+        """
+        Build the Indexes of Collection, as stored in the metadata of Database.
+
+        :return: field -> Index map.
+        """
+
+        _indexes: Dict[str, Index] = {}
+
+        _index_meta = self._file_handler.read_meta().get("indexes", {})
+
+        for field, kind in _index_meta.get(self._col_name, {}).items():
+            _indexes[field] = create_index(field, kind)
+            _indexes[field].build(self._collection)
+
+        return _indexes
+
+    def _save_indexes(self) -> None:
+        """
+        Store the Index definitions of Collection in the metadata of Database.
+
+        :return: None
+        """
+
+        _meta = self._file_handler.read_meta()
+        _index_meta = _meta.setdefault("indexes", {})
+
+        if self._indexes:
+            _index_meta[self._col_name] = {field: index.kind for field, index in self._indexes.items()}
+        else:
+            _index_meta.pop(self._col_name, None)
+
+        self._file_handler.write_meta(_meta)
+
+    def _index_documents(self, documents: Iterable[Mapping]) -> None:
+        for _index in self._indexes.values():
+            for document in documents:
+                _index.add(document)
+
+    def _unindex_documents(self, documents: Iterable[Mapping]) -> None:
+        for _index in self._indexes.values():
+            for document in documents:
+                _index.remove(document)
+
+    def _candidates(self, query: Query) -> Sequence[Document]:
+        """
+        Documents which may match ``query``, found by an Index if possible.
+
+        :param query: Compiled query.
+        :return: List of Document
+        """
+
+        _indexed = self._find_by_index(query)
+
+        if _indexed is not None:
+            return _indexed
+
+        # Columnar Collections test whole columns instead, see ``ColumnarCollection.scan``.
+        _scan = getattr(self._collection, "scan", None)
+
+        if _scan is not None:
+            return _scan(query)
+
+        return self._collection
+
+    def _find_by_index(self, query: Query) -> List[Document] | None:
+        """
+        Finds the candidate Documents of ``query`` with the help of Indexes, see ``_ids_by_index``.
+
+        Candidates still have to be matched against ``query``.
+
+        Returns None if no Index can answer ``query``.
+
+        :param query: Compiled query.
+        :return: List of Document
+        """
+
+        _candidates = self._ids_by_index(query)
+
+        if _candidates is None:
+            return None
+
+        return [self._index[_id] for _id in _candidates]
+
+    def _ids_by_index(self, query: Query) -> List[str] | None:
+        """
+        Finds ``_id_`` of the candidate Documents of ``query`` with the help of Indexes.
+
+        Among the conditions of ``query`` an Index can answer, the one giving
+        the fewest candidates is used.
+
+        Returns None if no Index can answer ``query``.
+
+        :param query: Compiled query.
+        :return: List of Document ID.
+        """
+
+        _candidates = None
+
+        for field, (operator, operand) in query.plan.items():
+            if field not in self._indexes:
                 continue
 
+            _index = self._indexes[field]
+
+            if operator == "$eq":
+                _doc_id = _index.find(operand)
+
+            elif operator == "$in":
+                _doc_id = []
+
+                for value in operand:
+                    _value_id = _index.find(value)
+
+                    if _value_id is None:
+                        _doc_id = None
+                        break
+
+                    _doc_id += _value_id
+
+                # A Document may have matched multiple values.
+                if _doc_id is not None:
+                    _doc_id = list(dict.fromkeys(_doc_id))
+
+            elif operator == "range" and isinstance(_index, SortedIndex):
+                _doc_id = _index.range(*operand)
+
             else:
-                return None
+                _doc_id = None
 
-        return JsonArray(result)
+            if _doc_id is not None and (_candidates is None or len(_doc_id) < len(_candidates)):
+                _candidates = _doc_id
 
-    def _doc_is_exists(self, doc_id: str) -> bool:
-        # Iterate over all Documents of Collection
-        for doc in self._collection:
-            if doc["_id_"] == doc_id:
-                return True
+        return _candidates
+
+    def _ordered(self, query: Query, spec: List[tuple], after: Mapping | None, count: int | None,
+                 parallel: bool = False, workers: int | None = None) -> Iterable[Document]:
+        """
+        Documents matching ``query`` ordered by ``spec`` & ``_id_``, see ``order_key``.
+
+        Candidates found by an Index of ``query`` are few, they are ordered as they are. Else
+        Documents are read in order from a sorted Index of the first field of ``spec``, so
+        reading stops after ``count`` Documents. Else the first ``count`` Documents are kept
+        in a heap while the Collection is scanned.
+
+        :param query: Compiled query.
+        :param spec: List of ``(field, direction)``.
+        :param after: Only Documents ordered after this Document.
+        :param count: Amount of Document to return, all if None.
+        :param parallel: Match Documents in worker processes.
+        :param workers: Amount of worker processes.
+        :return: Iterable of Document
+        """
+
+        _key = order_key(spec)
+        _after = None if after is None else _key(after)
+        _match = query.match
+
+        _stream = None
+        _documents: Iterator[Document]
+
+        if not parallel and self._ids_by_index(query) is None:
+            _stream = self._stream_by_index(spec, _key, after)
+
+        if _stream is not None:
+            _documents = (_doc for _doc in _stream if _match(_doc))
+        elif parallel:
+            _documents = iter(self._find_parallel(query, workers))
+        else:
+            _documents = (_doc for _doc in self._candidates(query) if _match(_doc))
+
+        if _after is not None:
+            _documents = (_doc for _doc in _documents if _key(_doc) > _after)
+
+        if _stream is not None:
+            return _documents if count is None else itertools.islice(_documents, count)
+
+        if count is None:
+            return sorted(_documents, key=_key)
 
-        return False
+        # A heap of ``count`` Documents, O(n log count).
+        return heapq.nsmallest(count, _documents, key=_key)
+
+    def _stream_by_index(self, spec: List[tuple], key: Callable[[Mapping], tuple],
+                         after: Mapping | None) -> Iterator[Document] | None:
+        """
+        All Documents ordered by ``key``, read in order from a sorted Index of the first field of ``spec``.
+
+        Documents of equal value are ordered among themselves. Documents the Index doesn't hold
+        (missing fields, lists & objects) are merged in.
+
+        Returns None if there is no such Index.
+
+        :param spec: List of ``(field, direction)``.
+        :param key: Key function of ``spec``, see ``order_key``.
+        :param after: Start at the value of this Document.
+        :return: Iterator of Document
+        """
+
+        if not spec:
+            return None
+
+        _field, _direction = spec[0]
+        _index = self._indexes.get(_field)
+
+        if not isinstance(_index, SortedIndex):
+            return None
+
+        _start = MISSING if after is None else get_path(after, _field)
+
+        def indexed() -> Iterator[Document]:
+            for doc_id in _index.groups(_direction == -1, _start):
+                yield from sorted((self._index[_id] for _id in doc_id), key=key)
+
+        if len(_index) == len(self._collection):
+            return indexed()
+
+        _others = [_doc for _doc in self._collection if _index_key(get_path(_doc, _field)) is None]
+
+        return heapq.merge(indexed(), sorted(_others, key=key), key=key)
+
+    def _find_parallel(self, query: Query, workers: int | None) -> List[Document]:
+        """
+        Finds the Documents matching ``query`` in worker processes, see ``filexdb.parallel``.
+
+        Candidates found by an Index are few, they are matched here.
+
+        :param query: Compiled query.
+        :param workers: Amount of worker processes.
+        :return: List of Document
+        """
+
+        _indexed = self._find_by_index(query)
+
+        if _indexed is not None:
+            return [_doc for _doc in _indexed if query.match(_doc)]
+
+        return parallel_filter(query, self._collection, workers, self._executor)
+
+    def _doc_is_exists(self, doc_id: str) -> bool:
+        return doc_id in self._index
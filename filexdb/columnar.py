@@ -0,0 +1,529 @@
+from __future__ import annotations
+
+import json
+from array import array
+from collections.abc import MutableMapping, MutableSequence
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Sequence, Set, Tuple
+
+from .codec import json_default
+from .query import Query, MISSING
+
+__all__ = ("ColumnarCollection", "LAYOUTS")
+
+
+# Layouts of Collection, see ``Collection.set_layout``.
+LAYOUTS = ("rows", "columnar")
+
+# Range of integers stored in an ``array`` of ``q``.
+_INT_MIN, _INT_MAX = -2 ** 63, 2 ** 63 - 1
+
+
+def _typed(values: List[Any]) -> Tuple[array | List[Any], Set[int]]:
+    """
+    Store a column of numbers of a single type in an ``array``, other columns as they are.
+
+    Positions of ``MISSING`` values of an ``array`` are returned separately, they hold ``0``.
+
+    :param values: Values of a column.
+    :return: ``array`` of ``q`` or ``d``, or ``values`` itself & positions of ``MISSING`` values.
+    """
+
+    _present = [value for value in values if value is not MISSING]
+
+    # ``bool`` is an ``int`` but must come back as ``bool``, so check the exact type.
+    if _present and all(type(value) is int for value in _present):
+        if _INT_MIN <= min(_present) and max(_present) <= _INT_MAX:
+            _typecode = "q"
+        else:
+            return values, set()
+
+    elif _present and all(type(value) is float for value in _present):
+        _typecode = "d"
+
+    else:
+        return values, set()
+
+    _absent = {position for position, value in enumerate(values) if value is MISSING}
+
+    return array(_typecode, [0 if value is MISSING else value for value in values]), _absent
+
+
+def _fits(column: array, value: Any) -> bool:
+    """
+    Check ``value`` can be stored in a typed column.
+    """
+
+    if value is MISSING:
+        return True
+
+    if column.typecode == "q":
+        return type(value) is int and _INT_MIN <= value <= _INT_MAX
+
+    return type(value) is float
+
+
+class ColumnarCollection(MutableSequence):
+    """
+    Documents of a Collection, stored as one column per field.
+
+    The names of fields are stored once for all Documents, numbers of a field having a
+    single type are stored in an ``array``. Documents are views (``Row``) of their values
+    in the columns, created on access, so scanning a few fields of many Documents
+    (see ``scan``) never builds the Documents.
+    """
+
+    def __init__(self, documents: Iterable[Mapping] = ()) -> None:
+        # field -> values of Documents in order, ``MISSING`` where a Document doesn't have the field.
+        self._columns: Dict[str, array | List[Any]] = {"_id_": []}
+
+        # field -> positions of ``MISSING`` values, for columns which are an ``array``.
+        self._absent: Dict[str, Set[int]] = {}
+
+        # ``_id_`` -> position of Document.
+        self._positions: Dict[str, int] = {}
+
+        self.extend(documents)
+
+    def get_document(self, doc_id: str) -> "Row | None":
+        if doc_id not in self._positions:
+            return None
+
+        return Row(self, doc_id)
+
+    def id_index(self) -> "_ColumnarIdIndex":
+        """
+        ``_id_`` -> Document view, used by ``Collection`` instead of a ``dict``.
+        """
+
+        return _ColumnarIdIndex(self)
+
+    def remove_ids(self, doc_id: Iterable[str]) -> None:
+        """
+        Removes Documents from Collection in a single pass.
+
+        :param doc_id: IDs of Documents to remove.
+        :return: None
+        """
+
+        _doc_id = set(doc_id) & self._positions.keys()
+
+        if not _doc_id:
+            return
+
+        _keep = [position for position, _id in enumerate(self._columns["_id_"]) if _id not in _doc_id]
+
+        for field, column in self._columns.items():
+            _values = [column[position] for position in _keep]
+
+            if isinstance(column, array):
+                _absent = self._absent[field]
+
+                self._columns[field] = array(column.typecode, _values)
+                self._absent[field] = {new for new, old in enumerate(_keep) if old in _absent}
+
+            else:
+                self._columns[field] = _values
+
+        self._drop_empty_columns()
+        self._index_positions()
+
+    def scan(self, query: Query) -> List["Row"]:
+        """
+        Documents which may match ``query``, found by testing whole columns.
+
+        Only the fields of ``query`` are read, Documents are built for the result only.
+
+        :param query: Compiled query.
+        :return: List of Document
+        """
+
+        _ids = self._columns["_id_"]
+
+        return [Row(self, _ids[position]) for position in self.positions(query)]
+
+    def positions(self, query: Query) -> Sequence[int]:
+        """
+        Positions of Documents passing the tests of top-level fields of ``query``, see ``Query.tests``.
+
+        Other conditions of ``query`` (e.g. ``$or`` or nested fields) are not tested.
+
+        :param query: Compiled query.
+        :return: Positions of Documents.
+        """
+
+        _positions: Sequence[int] | None = None
+
+        for field, test in query.tests.items():
+            if "." in field:
+                continue
+
+            _column = self._columns.get(field)
+
+            if _column is None:
+                # No Document has the field.
+                if not test(MISSING):
+                    return []
+                continue
+
+            _absent = self._absent.get(field)
+
+            if _absent:
+                # Test the missing values as such.
+                _column = self.values(field)
+
+            if _positions is None:
+                _positions = [position for position, value in enumerate(_column) if test(value)]
+            else:
+                _positions = [position for position in _positions if test(_column[position])]
+
+        if _positions is None:
+            return range(len(self))
+
+        return _positions
+
+    def column(self, field: str) -> List[Any]:
+        """
+        Values of a field, of every Document having it, in order.
+
+        :param field: Name of field.
+        :return: List of values.
+        """
+
+        _column = self._columns.get(field)
+
+        if _column is None:
+            return []
+
+        if isinstance(_column, array) and not self._absent.get(field):
+            return _column.tolist()
+
+        return [value for value in self.values(field) if value is not MISSING]
+
+    def numbers(self, field: str) -> array | None:
+        """
+        Values of a field stored in an ``array`` that every Document has, for reductions like ``sum``.
+
+        :param field: Name of field.
+        :return: The ``array`` itself, None if the field is stored otherwise.
+        """
+
+        _column = self._columns.get(field)
+
+        if isinstance(_column, array) and not self._absent.get(field):
+            return _column
+
+        return None
+
+    def values(self, field: str) -> List[Any]:
+        """
+        Values of a field of every Document, ``MISSING`` where a Document doesn't have it.
+
+        :param field: Name of field.
+        :return: List of values.
+        """
+
+        _column = self._columns.get(field)
+
+        if _column is None:
+            return [MISSING] * len(self)
+
+        if not isinstance(_column, array):
+            return list(_column)
+
+        _values = _column.tolist()
+
+        for position in self._absent[field]:
+            _values[position] = MISSING
+
+        return _values
+
+    def fields(self) -> List[str]:
+        """
+        Names of fields, shared by all Documents.
+        """
+
+        return list(self._columns)
+
+    def get_value(self, doc_id: str, field: str) -> Any:
+        _position = self._positions.get(doc_id)
+        _column = self._columns.get(field)
+
+        if _position is None or _column is None:
+            return MISSING
+
+        if isinstance(_column, array) and _position in self._absent[field]:
+            return MISSING
+
+        return _column[_position]
+
+    def set_value(self, doc_id: str, field: str, value: Any) -> None:
+        _position = self._positions.get(doc_id)
+
+        if _position is None:
+            raise KeyError(doc_id)
+
+        if field not in self._columns:
+            self._columns[field] = [MISSING] * len(self)
+
+        _column = self._columns[field]
+
+        if not isinstance(_column, array):
+            _column[_position] = value
+
+        elif not _fits(_column, value):
+            # The column has values of different types now.
+            _column = self._columns[field] = self.values(field)
+            del self._absent[field]
+
+            _column[_position] = value
+
+        elif value is MISSING:
+            _column[_position] = 0
+            self._absent[field].add(_position)
+
+        else:
+            _column[_position] = value
+            self._absent[field].discard(_position)
+
+    def __len__(self) -> int:
+        return len(self._columns["_id_"])
+
+    def __iter__(self) -> Iterator["Row"]:
+        # Iterate the Documents of this moment, changes made meanwhile don't disturb it.
+        for doc_id in list(self._columns["_id_"]):
+            yield Row(self, doc_id)
+
+    def __getitem__(self, index: int | slice) -> Any:
+        _ids = self._columns["_id_"]
+
+        if isinstance(index, slice):
+            return [Row(self, doc_id) for doc_id in _ids[index]]
+
+        return Row(self, _ids[index])
+
+    def __setitem__(self, index: Any, document: Any) -> None:
+        if isinstance(index, slice):
+            # Replace the Documents of slice, e.g. ``collection[:] = documents``.
+            _documents = [dict(doc) for doc in self]
+            _documents[index] = [dict(doc) for doc in document]
+
+            self.clear()
+            self.extend(_documents)
+            return
+
+        _doc_id = self._columns["_id_"][index]
+
+        if document["_id_"] != _doc_id:
+            raise KeyError("You are not allowed to modify key `_id_`")
+
+        _values = dict(document)
+
+        for field in self._columns:
+            self.set_value(_doc_id, field, _values.pop(field, MISSING))
+
+        for field, value in _values.items():
+            self.set_value(_doc_id, field, value)
+
+    def __delitem__(self, index: int | slice) -> None:
+        _ids = self._columns["_id_"]
+        self.remove_ids(_ids[index] if isinstance(index, slice) else [_ids[index]])
+
+    def insert(self, index: int, document: Mapping) -> None:
+        if index < len(self):
+            # Inserting in the middle moves the Documents after it.
+            _documents: List[Mapping] = [dict(doc) for doc in self]
+            _documents.insert(index, document)
+
+            self.clear()
+            self.extend(_documents)
+            return
+
+        self.extend([document])
+
+    def extend(self, documents: Iterable[Mapping]) -> None:
+        """
+        Append Documents, the columns are built once for all of them.
+
+        :param documents: Documents to append.
+        :return: None
+        """
+
+        _documents = [dict(doc) for doc in documents]
+
+        if not _documents:
+            return
+
+        for document in _documents:
+            if "_id_" not in document:
+                raise KeyError("Document has no `_id_`")
+
+            if document["_id_"] in self._positions:
+                raise ValueError(f"Document id `{document['_id_']}` is already exists")
+
+        _length = len(self)
+        _fields = list(dict.fromkeys(field for document in _documents for field in document))
+
+        for field in dict.fromkeys([*self._columns, *_fields]):
+            _values = [document.get(field, MISSING) for document in _documents]
+            _column = self._columns.get(field)
+
+            if _column is None:
+                self._set_column(field, [MISSING] * _length + _values)
+
+            elif not isinstance(_column, array):
+                _column.extend(_values)
+
+            elif all(_fits(_column, value) for value in _values):
+                _absent = self._absent[field]
+
+                for position, value in enumerate(_values, _length):
+                    if value is MISSING:
+                        _absent.add(position)
+
+                _column.extend([0 if value is MISSING else value for value in _values])
+
+            else:
+                # Values of a different type turn the column into a plain list.
+                self._columns[field] = self.values(field) + _values
+                del self._absent[field]
+
+        for position, document in enumerate(_documents, _length):
+            self._positions[document["_id_"]] = position
+
+    def clear(self) -> None:
+        self._columns = {"_id_": []}
+        self._absent = {}
+        self._positions = {}
+
+    def copy(self) -> List["Row"]:
+        return list(self)
+
+    def _index_positions(self) -> None:
+        self._positions = {doc_id: position for position, doc_id in enumerate(self._columns["_id_"])}
+
+    def _set_column(self, field: str, values: List[Any]) -> None:
+        self._columns[field], _absent = _typed(values)
+
+        if isinstance(self._columns[field], array):
+            self._absent[field] = _absent
+        else:
+            self._absent.pop(field, None)
+
+    def _drop_empty_columns(self) -> None:
+        for field in [field for field in self._columns if field != "_id_"]:
+            _column = self._columns[field]
+
+            if isinstance(_column, array):
+                _empty = len(self._absent[field]) == len(_column)
+            else:
+                _empty = all(value is MISSING for value in _column)
+
+            if _empty:
+                del self._columns[field]
+                self._absent.pop(field, None)
+
+    def __reduce__(self):
+        # Pickled as a plain list of Documents, the Database-file is the same as of ``rows`` layout.
+        return list, ([dict(row) for row in self],)
+
+    def __repr__(self) -> str:
+        return f"ColumnarCollection({len(self)} documents, fields={self.fields()})"
+
+
+class Row(MutableMapping):
+    """
+    A Document of ``ColumnarCollection``, a view of its values in the columns.
+
+    Changes of Row are stored in the columns. A Row of a removed Document is empty.
+    """
+
+    __slots__ = ("_collection", "_id")
+
+    def __init__(self, collection: ColumnarCollection, doc_id: str) -> None:
+        self._collection = collection
+        self._id = doc_id
+
+    @property
+    def id(self) -> str:
+        return self._id
+
+    def __getitem__(self, field: str) -> Any:
+        _value = self._collection.get_value(self._id, field)
+
+        if _value is MISSING:
+            raise KeyError(field)
+
+        return _value
+
+    def __setitem__(self, field: str, value: Any) -> None:
+        if field == "_id_":
+            raise KeyError("You are not allowed to modify key `_id_`")
+
+        self._collection.set_value(self._id, field, value)
+
+    def __delitem__(self, field: str) -> None:
+        if field == "_id_" or field not in self:
+            raise KeyError(field)
+
+        self._collection.set_value(self._id, field, MISSING)
+
+    def __iter__(self) -> Iterator[str]:
+        for field in self._collection.fields():
+            if self._collection.get_value(self._id, field) is not MISSING:
+                yield field
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def prettify(self) -> str:
+        """
+        Beautify the ``JSON Object`` with new lines & proper indentation.
+
+        :return: JSON Object
+        """
+
+        return json.dumps(dict(self), indent=4, default=json_default)
+
+    def __reduce__(self):
+        # Pickled as a plain Document.
+        return dict, (dict(self),)
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+
+class _ColumnarIdIndex(Mapping):
+    """
+    ``_id_`` -> Document view of ``ColumnarCollection``.
+
+    The Collection maintains its own positions, so writes to the view are ignored.
+    """
+
+    def __init__(self, collection: ColumnarCollection) -> None:
+        self._collection = collection
+
+    def __getitem__(self, doc_id: str) -> Row:
+        _row = self._collection.get_document(doc_id)
+
+        if _row is None:
+            raise KeyError(doc_id)
+
+        return _row
+
+    def __contains__(self, doc_id: object) -> bool:
+        return doc_id in self._collection._positions
+
+    def __setitem__(self, doc_id: str, document: Mapping) -> None:
+        pass
+
+    def pop(self, doc_id: str, default: Any = None) -> Any:
+        return self.get(doc_id, default)
+
+    def clear(self) -> None:
+        pass
+
+    def __len__(self) -> int:
+        return len(self._collection)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._collection._positions))
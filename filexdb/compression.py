@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import bz2
+import gzip
+import lzma
+import struct
+import zlib
+from typing import IO, Callable, Dict, Iterator, Tuple
+
+__all__ = ("COMPRESSIONS", "BLOCK_SIZE", "compress", "decompress", "iter_blocks", "container_extension",
+           "open_compressed")
+
+
+# Compressor & decompressor of every supported compression, all in the standard library.
+COMPRESSIONS: Dict[str, Tuple[Callable[..., bytes], Callable[..., bytes]]] = {
+    "zlib": (zlib.compress, zlib.decompress),
+    "lzma": (lzma.compress, lzma.decompress),
+    "bz2": (bz2.compress, bz2.decompress),
+}
+
+# File extensions & openers of exported files, in the usual container of every compression.
+_CONTAINERS: Dict[str, Tuple[str, Callable[..., IO]]] = {
+    "zlib": ("gz", gzip.open),
+    "lzma": ("xz", lzma.open),
+    "bz2": ("bz2", bz2.open),
+}
+
+# Size of uncompressed blocks, every block is compressed on its own.
+BLOCK_SIZE = 256 * 1024
+
+# Every block is framed as ``<uncompressed size><compressed size><compressed block>``.
+_BLOCK_HEADER = struct.Struct(">II")
+
+
+def _check(compression: str) -> None:
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"`{compression}` is not a valid compression, use one of {list(COMPRESSIONS)}")
+
+
+def compress(data: bytes, compression: str, block_size: int = BLOCK_SIZE) -> bytes:
+    """
+    Compress ``data`` in independent blocks.
+
+    The size of every block is stored in front of it, so a reader can skip blocks
+    or decompress them one by one, see ``iter_blocks``.
+
+    :param data: Data to compress.
+    :param compression: Name of compression, ``zlib``, ``lzma`` or ``bz2``.
+    :param block_size: Size of uncompressed blocks.
+    :return: Compressed data.
+    """
+
+    _check(compression)
+    _compress, _ = COMPRESSIONS[compression]
+
+    _data = memoryview(data)
+    _buffer = bytearray()
+
+    for start in range(0, len(_data), block_size):
+        _block = _data[start: start + block_size]
+        _compressed = _compress(_block)
+
+        _buffer += _BLOCK_HEADER.pack(len(_block), len(_compressed))
+        _buffer += _compressed
+
+    return bytes(_buffer)
+
+
+def iter_blocks(data: bytes, compression: str) -> Iterator[bytes]:
+    """
+    Decompress the blocks of data compressed by ``compress``, one at a time.
+
+    :param data: Compressed data.
+    :param compression: Name of compression.
+    :return: Uncompressed blocks, in order.
+    """
+
+    _check(compression)
+    _, _decompress = COMPRESSIONS[compression]
+
+    _data = memoryview(data)
+    _offset = 0
+
+    while _offset < len(_data):
+        _size, _compressed_size = _BLOCK_HEADER.unpack_from(_data, _offset)
+        _offset += _BLOCK_HEADER.size
+
+        _block = _decompress(_data[_offset: _offset + _compressed_size])
+        _offset += _compressed_size
+
+        if len(_block) != _size:
+            raise ValueError(f"Corrupted `{compression}` block at offset {_offset - _compressed_size}")
+
+        yield _block
+
+
+def decompress(data: bytes, compression: str) -> bytes:
+    """
+    Decompress data compressed by ``compress``.
+
+    :param data: Compressed data.
+    :param compression: Name of compression.
+    :return: Uncompressed data.
+    """
+
+    return b"".join(iter_blocks(data, compression))
+
+
+def container_extension(compression: str) -> str:
+    """
+    File extension of the standard container of a compression, e.g. ``gz`` for ``zlib``.
+
+    :param compression: Name of compression.
+    :return: File extension without dot.
+    """
+
+    _check(compression)
+
+    return _CONTAINERS[compression][0]
+
+
+def open_compressed(file_path: str | IO[bytes], compression: str, mode: str = "wt",
+                    newline: str | None = None) -> IO:
+    """
+    Open a file in the standard container of a compression, readable by the usual tools.
+
+    Text is encoded as UTF-8.
+
+    :param file_path: Path of file, or a file opened in binary mode.
+    :param compression: Name of compression.
+    :param mode: Mode of file.
+    :param newline: ``newline`` of text mode.
+    :return: The opened file.
+    """
+
+    _check(compression)
+
+    if "b" in mode:
+        return _CONTAINERS[compression][1](file_path, mode)
+
+    return _CONTAINERS[compression][1](file_path, mode, encoding="utf-8", newline=newline)
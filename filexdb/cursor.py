@@ -0,0 +1,305 @@
+from __future__ import annotations
+
+import itertools
+from typing import Any, Callable, Iterable, Iterator, List, Mapping, Tuple
+
+from .document import Document, JsonArray
+from .query import Query, compile_query, get_path, MISSING, _getter
+
+__all__ = ("Cursor", "sort_key", "order_key")
+
+
+def sort_key(value: Any) -> tuple:
+    """
+    Convert a value into a key which can be ordered against any other key.
+
+    Missing fields come first, then ``None``, numbers, strings & other values.
+
+    :param value: Value of a field.
+    :return: Sort key.
+    """
+
+    if value is MISSING:
+        return -1,
+
+    if value is None:
+        return 0,
+
+    if isinstance(value, (int, float)) and value == value:
+        return 1, value
+
+    if isinstance(value, str):
+        return 2, value
+
+    return 3, repr(value)
+
+
+def _sort_spec(key: str | List[Tuple[str, int]], direction: int = 1) -> List[Tuple[str, int]]:
+    """
+    Normalize the arguments of ``Cursor.sort`` into a list of ``(field, direction)``.
+    """
+
+    _spec = [(key, direction)] if isinstance(key, str) else list(key)
+
+    for field, _direction in _spec:
+        if _direction not in (1, -1):
+            raise ValueError(f"Sort direction of `{field}` must be 1 or -1, {_direction} is given.")
+
+    return _spec
+
+
+class _Descending:
+    """
+    A sort key in reverse order, for descending fields among ascending ones.
+    """
+
+    __slots__ = ("key",)
+
+    def __init__(self, key: tuple) -> None:
+        self.key = key
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, _Descending) and self.key == other.key
+
+    def __lt__(self, other: "_Descending") -> bool:
+        return other.key < self.key
+
+    def __gt__(self, other: "_Descending") -> bool:
+        return other.key > self.key
+
+
+def order_key(spec: List[Tuple[str, int]]) -> Callable[[Mapping], tuple]:
+    """
+    Create a function ordering Documents by ``(field, direction)`` of ``spec``, see ``sort_key``.
+
+    Documents with equal fields are ordered by ``_id_``, so no two Documents are equal
+    & a Document tells exactly where a page of results ends.
+
+    :param spec: List of ``(field, direction)``.
+    :return: Key function of Document.
+    """
+
+    _getters = [(_getter(field), direction == -1) for field, direction in spec]
+
+    def key(doc: Mapping) -> tuple:
+        _key = []
+
+        for get, descending in _getters:
+            _value = sort_key(get(doc))
+            _key.append(_Descending(_value) if descending else _value)
+
+        _key.append(sort_key(doc.get("_id_", MISSING)))
+
+        return tuple(_key)
+
+    return key
+
+
+def _projector(fields: Mapping | List[str]) -> Callable[[Mapping], Document]:
+    """
+    Create a function building the projected copy of a Document.
+
+    ``fields`` either lists the fields to include, or maps fields to 1 (include) or 0 (exclude).
+    ``_id_`` is always included unless it is excluded explicitly.
+
+    :param fields: Projection.
+    :return: Projector function.
+    """
+
+    if not isinstance(fields, Mapping):
+        fields = {field: 1 for field in fields}
+
+    _include_id = bool(fields.get("_id_", 1))
+    _fields = {field: bool(flag) for field, flag in fields.items() if field != "_id_"}
+
+    if len(set(_fields.values())) > 1:
+        raise ValueError("Projection cannot both include and exclude fields")
+
+    if _fields and not next(iter(_fields.values())):
+        # Exclusion, copy everything else.
+        _excluded = set(_fields)
+
+        if not _include_id:
+            _excluded.add("_id_")
+
+        return lambda doc: Document({k: v for k, v in doc.items() if k not in _excluded}, False)
+
+    _included = (["_id_"] if _include_id else []) + list(_fields)
+
+    def project(doc: Mapping) -> Document:
+        _projected: dict = {}
+
+        for field in _included:
+            _value = get_path(doc, field)
+
+            if _value is MISSING:
+                continue
+
+            # Rebuild the nesting of dotted fields.
+            *_parents, _last = field.split(".")
+            _target = _projected
+
+            for parent in _parents:
+                _target = _target.setdefault(parent, {})
+
+            _target[_last] = _value
+
+        return Document(_projected, False)
+
+    return project
+
+
+class Cursor:
+    """
+    A lazy result of ``Collection.find``.
+
+    Documents are matched only while the Cursor is iterated, so iteration can stop early.
+    Options are chained, e.g. ``coll.find(query, lazy=True).sort("age").skip(10).limit(5)``.
+    """
+
+    def __init__(self, source: Callable[[], Iterable[Mapping]], query: Mapping | Query | None = None) -> None:
+        """
+        Creates a Cursor.
+
+        :param source: Function returning the candidate Documents, called on iteration.
+        :param query: Condition to search Document.
+        """
+
+        self._source = source
+        self._query = compile_query(query)
+
+        self._skip = 0
+        self._limit: int | None = None
+        self._sort: List[Tuple[str, int]] = []
+        self._projector: Callable[[Mapping], Document] | None = None
+
+    def skip(self, count: int) -> "Cursor":
+        """
+        Skip the first ``count`` matching Documents.
+
+        :param count: Amount of Documents to skip.
+        :return: The Cursor itself.
+        """
+
+        if count < 0:
+            raise ValueError("skip must not be negative.")
+
+        self._skip = count
+
+        return self
+
+    def limit(self, count: int | None) -> "Cursor":
+        """
+        Return at most ``count`` Documents.
+
+        :param count: Amount of Documents to return, None for no limit.
+        :return: The Cursor itself.
+        """
+
+        if count is not None and count < 0:
+            raise ValueError("limit must not be negative.")
+
+        self._limit = count
+
+        return self
+
+    def sort(self, key: str | List[Tuple[str, int]], direction: int = 1) -> "Cursor":
+        """
+        Order the Documents by one or more fields.
+
+        :param key: Field name, or a list of ``(field, direction)``.
+        :param direction: 1 for ascending, -1 for descending order.
+        :return: The Cursor itself.
+        """
+
+        self._sort = _sort_spec(key, direction)
+
+        return self
+
+    def project(self, fields: Mapping | List[str]) -> "Cursor":
+        """
+        Return copies of Documents with only some of the fields.
+
+        :param fields: List of fields to include, or a map of field to 1 (include) or 0 (exclude).
+        :return: The Cursor itself.
+        """
+
+        self._projector = _projector(fields)
+
+        return self
+
+    def batch(self, size: int) -> Iterator[JsonArray]:
+        """
+        Iterate the Documents in batches.
+
+        :param size: Amount of Documents per batch.
+        :return: Iterator of batches.
+        """
+
+        if size < 1:
+            raise ValueError("batch size must be greater than 0.")
+
+        _iterator = iter(self)
+        _batch = list(itertools.islice(_iterator, size))
+
+        while _batch:
+            yield JsonArray(_batch)
+            _batch = list(itertools.islice(_iterator, size))
+
+    def first(self) -> Document | None:
+        """
+        The first Document of Cursor.
+
+        :return: Document or None.
+        """
+
+        return next(iter(self), None)
+
+    def count(self) -> int:
+        """
+        Amount of Documents the Cursor returns.
+
+        :return: Amount of Documents.
+        """
+
+        return sum(1 for _ in self)
+
+    def to_array(self) -> JsonArray:
+        """
+        Fetch all the Documents of Cursor.
+
+        :return: List of Document
+        """
+
+        return JsonArray(list(self))
+
+    def __iter__(self) -> Iterator[Document]:
+        _match = self._query.match
+        _documents: Iterable[Any] = (doc for doc in self._source() if _match(doc))
+
+        if self._sort:
+            _documents = self._sorted(_documents)
+
+        _stop = None if self._limit is None else self._skip + self._limit
+        _documents = itertools.islice(_documents, self._skip, _stop)
+
+        if self._projector is not None:
+            _documents = map(self._projector, _documents)
+
+        return iter(_documents)
+
+    def _sorted(self, documents: Iterable[Mapping]) -> List[Mapping]:
+        """
+        Sort the Documents by every key of ``self._sort``.
+
+        :param documents: Documents to sort.
+        :return: Sorted Documents.
+        """
+
+        _documents = list(documents)
+
+        # Sort by the least significant key first, ``list.sort`` is stable.
+        for field, direction in reversed(self._sort):
+            _documents.sort(key=lambda doc: sort_key(get_path(doc, field)), reverse=direction == -1)
+
+        return _documents
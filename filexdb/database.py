@@ -1,13 +1,25 @@
-from typing import Dict, Type, List
+from __future__ import annotations
+
+import atexit
+import contextlib
+import threading
+from concurrent.futures import Executor
+from typing import Any, Callable, Dict, Type, List
 
 from .collection import Collection
-from .fileio import FileIO, BinaryFileIO, JsonFileIO, Export
+from .fileio import FileIO, BinaryFileIO, JsonFileIO, LogFileIO, Export
+from .paged import PagedFileIO
+from .split import SplitFileIO
+from .loader import Loader, Progress
 from .document import JsonArray, Document
+from .codec import Codec
 
 
 class FileXdb:
 
-    def __init__(self, db_name: str, data_dir=None, mode="binary"):
+    def __init__(self, db_name: str, data_dir=None, mode="binary", sync="always", sync_ops=100, sync_interval=1000,
+                 executor: Executor | None = None, codec: str | Codec | None = None,
+                 compression: str | None = None, id_factory: str | Callable[[], Any] = "uuid"):
         """
         Creates a Databased in ``data_dir`` Directory named ``db_name``.
 
@@ -18,59 +30,187 @@ class FileXdb:
 
         :param db_name: Name of Database without file extension.
         :param data_dir: Where the Database will be stored.
+        :param mode: Storage of Database, ``binary``, ``json``, ``log`` (append-only), ``paged`` (memory-mapped)
+            or ``split`` (a file per Collection).
+        :param sync: When changes are written, ``always``, ``batch``, ``interval`` or ``never``.
+        :param sync_ops: Amount of changes written at once in ``batch`` mode.
+        :param sync_interval: Milliseconds between writes in ``interval`` mode.
+        :param executor: Process pool running ``find(parallel=True)``, a new one per call by default.
+        :param codec: Codec writing the Database-file, e.g. ``json``, ``pickle``, ``marshal``, ``binary``
+            or ``orjson``, see ``filexdb.codec``. Every mode has its own default.
+        :param compression: Compression of the Database-files, ``zlib``, ``lzma`` or ``bz2``, none by default.
+        :param id_factory: Creates ``_id_`` of new Documents, ``uuid``, ``ulid``, ``objectid``, ``int`` or a
+            function, see ``Collection.set_id_factory``.
         """
         self._db_name = db_name
         self._data_dir = data_dir
+        self._executor = executor
+        self._id_factory = id_factory
         self._file_handler: FileIO
 
+        _options = {"sync": sync, "sync_ops": sync_ops, "sync_interval": sync_interval}
+
+        if codec is not None:
+            _options["codec"] = codec
+
+        if compression is not None:
+            _options["compression"] = compression
+
         # Creating an instance of FileIO to Read Write Database-File.
         if mode == "binary":
-            self._file_handler = BinaryFileIO(self._db_name, self._data_dir)
+            self._file_handler = BinaryFileIO(self._db_name, self._data_dir, **_options)
         elif mode == "json":
-            self._file_handler = JsonFileIO(self._db_name, self._data_dir)
+            self._file_handler = JsonFileIO(self._db_name, self._data_dir, **_options)
+        elif mode == "log":
+            self._file_handler = LogFileIO(self._db_name, self._data_dir, **_options)
+        elif mode == "paged":
+            self._file_handler = PagedFileIO(self._db_name, self._data_dir, **_options)
+        elif mode == "split":
+            self._file_handler = SplitFileIO(self._db_name, self._data_dir, **_options)
+        else:
+            raise ValueError(f"`{mode}` is not a valid mode")
+
+        # Waiting changes must not be lost on a normal exit.
+        if sync != "always":
+            atexit.register(self.close)
+
+        # Collections of Database by name, they share the data cached by ``_file_handler``.
+        self._collections: Dict[str, Collection] = {}
+        self._collections_lock = threading.Lock()
 
         # Getting whole database.
-        self._database = self._show()
-
+        self._database: dict = self._show()
 
-    def collection(self, col_name: str) -> Collection:
+    def collection(self, col_name: str, layout: str | None = None,
+                   id_factory: str | Callable[[], Any] | None = None) -> Collection:
         """
         Creates a brand-new Collection if the Collection is not exists.
 
         If Collection is already exists then it interact with it.
 
         :param col_name: Collection name to interact with.
+        :param layout: Change the layout of Collection, ``rows`` or ``columnar``, see ``Collection.set_layout``.
+        :param id_factory: Change the id factory of Collection, see ``Collection.set_id_factory``.
         :return: An instance of Collection Baseclass.
         """
-        # Initiating collection
-        collection = Collection(col_name, self._file_handler)
+        # Initiating collection, once per name, even if many threads ask for it at once.
+        with self._collections_lock:
+            if col_name not in self._collections:
+                self._collections[col_name] = Collection(col_name, self._file_handler, self._executor,
+                                                         self._id_factory)
 
-        return collection
+            _collection = self._collections[col_name]
+
+        if layout is not None:
+            _collection.set_layout(layout)
+
+        if id_factory is not None:
+            _collection.set_id_factory(id_factory)
+
+        return _collection
 
     def show_collections(self) -> JsonArray:
         """
         Shows all collections of database.
         :return: List Collections.
         """
-        self._database = Document(self._file_handler.read(), False)
-
         # Initiating empty result list
-        _result = JsonArray(list(self._database.keys()))
+        _result = JsonArray(self._file_handler.collection_names())
 
         return _result
 
-    def export(self, _file_name, _file_dir=None, _mode="json"):
+    def export(self, _file_name, _file_dir=None, _mode="json", _compression=None):
         """
         Export data in to readable file.
 
+        Documents are streamed from every Collection, see ``Export``.
+
         :param _file_name: File name in which data will be exported.
         :param _file_dir: Parent directory of export file.
-        :param _mode: In which file mode you want to export data.
+        :param _mode: In which file mode you want to export data, ``json``, ``ndjson`` or ``csv``.
+        :param _compression: Compression of export file, ``zlib`` (``.gz``), ``lzma`` (``.xz``) or ``bz2``.
         :return: None.
         """
 
-        e = Export(self._database, _file_name, _file_dir, _mode)
+        # Every Collection is read by a lazy Cursor, not copied as a whole.
+        _data = {col_name: self.collection(col_name).find(lazy=True) for col_name in self.show_collections()}
+
+        e = Export(_data, _file_name, _file_dir, _mode, _compression)
+
+
+    def import_(self, file_path: str, collection: str | None = None, format: str | None = None,
+                batch_size: int = 10000, progress: Callable[[dict], Any] | None = None, parallel: bool = False,
+                workers: int | None = None) -> Dict[str, int]:
+        """
+        Inserts the Documents of a JSON, NDJSON or CSV file, e.g. a file written by ``export``.
+
+        An export of Database in ``json`` mode restores every Collection of it. Other files are
+        loaded into ``collection``, see ``Collection.load``.
+
+        :param file_path: Path of file, compressed if it ends with ``.gz``, ``.xz`` or ``.bz2``.
+        :param collection: Collection to load into, the Collections of a JSON object of arrays if None.
+        :param format: ``json``, ``ndjson`` or ``csv``, detected from the extension of file if None.
+        :param batch_size: Amount of Documents inserted at once.
+        :param progress: Called after every batch, see ``Collection.load``.
+        :param parallel: Parse NDJSON & CSV in worker processes, see ``Loader.batches``.
+        :param workers: Amount of worker processes, the amount of CPUs by default.
+        :return: Amount of Documents inserted, by Collection.
+        """
+
+        if collection is not None:
+            _collection = self.collection(collection)
+
+            return {collection: _collection.load(file_path, format, batch_size, progress, parallel, workers)}
+
+        _counts: Dict[str, int] = {}
+
+        with Loader(file_path, format) as _loader, contextlib.ExitStack() as _stack:
+            _progress = Progress(_loader, progress)
+
+            for col_name, documents in _loader.batches(batch_size, parallel, workers, self._executor):
+                if col_name is None:
+                    raise ValueError(f"`{file_path}` is not an export of Database, pass a `collection` to load into")
+
+                _collection = self.collection(col_name)
+
+                # Indexes of every Collection are built once, when the whole file is loaded.
+                if col_name not in _counts:
+                    _stack.enter_context(_collection._bulk())
+                    _counts[col_name] = 0
+
+                _collection._insert_documents(documents, restore=True)
+                _counts[col_name] += len(documents)
+                _progress.update(len(documents))
+
+        return _counts
+
+    def flush(self) -> None:
+        """
+        Write all waiting changes to the Database-file.
+
+        Only needed if ``sync`` is not ``always``.
+
+        :return: None.
+        """
+
+        self._file_handler.flush()
+
+    def close(self) -> None:
+        """
+        Write all waiting changes & release the Database.
+
+        :return: None.
+        """
+
+        self._file_handler.close()
+
+        atexit.unregister(self.close)
+
+    def __enter__(self) -> "FileXdb":
+        return self
 
+    def __exit__(self, *args) -> None:
+        self.close()
 
     def _show(self) -> Document:
         """
@@ -78,5 +218,5 @@ class FileXdb:
 
         :return: Database
         """
-        self._database = Document(self._file_handler.read(), False)
+        self._database = self._file_handler.load()
         return Document(self._database, False)
@@ -1,7 +1,10 @@
-from typing import Mapping, List, Any
+from __future__ import annotations
+
+from typing import Mapping, Iterable, Callable, Any
 import uuid
 import json
 from .fileio import Export
+from .codec import json_default
 
 __all__ = ("Document", "JsonArray")
 
@@ -12,25 +15,28 @@ def _get_id():
 
 
 class Document(dict):
-    def __init__(self, value: Mapping, gen_id: bool = True) -> None:
-        self.id = None
-
-        _id_obj = {
-            "_id_": _get_id()
-        }
-
-        if "_id_" in value.keys():
-            self._doc = value
-            self.id = value["_id_"]
-        elif "_id_" not in value.keys() and not gen_id:
-            self._doc = value
+    # Contents are stored by ``dict`` only, a Document has no attributes of its own.
+    __slots__ = ()
+
+    def __init__(self, value: Mapping, gen_id: bool = True, id_factory: Callable[[], Any] | None = None) -> None:
+        if "_id_" in value.keys() or not gen_id:
+            super().__init__(value)
         else:
-            self._doc = _id_obj
-            for k, v in value.items():
-                self._doc[k] = v
-            self.id = self._doc["_id_"]
+            # ``_id_`` comes first.
+            super().__init__(_id_=(id_factory or _get_id)())
+            self.update(value)
+
+    @property
+    def id(self) -> Any:
+        """
+        ``_id_`` of Document, None if it has no ``_id_``.
+        """
+
+        return self.get("_id_")
 
-        super().__init__(self._doc)
+    def __setstate__(self, state: Any) -> None:
+        # Documents pickled by older versions carry a copy of their contents as state, ``dict`` restores it.
+        pass
 
     def prettify(self) -> str:
         """
@@ -42,16 +48,23 @@ class Document(dict):
         """
 
         # Dumping JSON Object & adding indentation
-        _doc: str = json.dumps(self._doc, indent=4)
+        # Lazy Collections (e.g. ``PagedCollection``) are dumped as lists.
+        _doc: str = json.dumps(self, indent=4, default=json_default)
 
         return _doc
 
 
 
 class JsonArray(list):
-    def __init__(self, _value: list) -> None:
-        self.value = _value
-        super().__init__(self.value)
+    # Contents are stored by ``list`` only.
+    __slots__ = ()
+
+    def __init__(self, _value: Iterable) -> None:
+        super().__init__(_value)
+
+    def __setstate__(self, state: Any) -> None:
+        # JSON Arrays pickled by older versions carry a copy of their contents as state, ``list`` restores it.
+        pass
 
 
     def prettify(self) -> str:
@@ -64,7 +77,7 @@ class JsonArray(list):
         """
 
         # Dumping JSON Object & adding indentation
-        value: str = json.dumps(self.value, indent=4)
+        value: str = json.dumps(self, indent=4, default=json_default)
 
         return value
 
@@ -74,20 +87,22 @@ class JsonArray(list):
 
         :return: (int) amount of Document found.
         """
-        count = len(self.value)
+        count = len(self)
 
         return count
 
-    def export(self, _file_name, _file_dir=None, _mode="json"):
+    def export(self, _file_name, _file_dir=None, _mode="json", _compression=None):
         """
+        Export the Documents in to readable file, see ``Export``.
 
-        :param _file_name:
-        :param _file_dir:
-        :param _mode:
-        :return:
+        :param _file_name: File name in which data will be exported.
+        :param _file_dir: Parent directory of export file.
+        :param _mode: In which file mode you want to export data, ``json``, ``ndjson`` or ``csv``.
+        :param _compression: Compression of export file, ``zlib`` (``.gz``), ``lzma`` (``.xz``) or ``bz2``.
+        :return: None
         """
 
-        e = Export(self.value, _file_name, _file_dir, _mode)
+        e = Export(self, _file_name, _file_dir, _mode, _compression)
 
 
 
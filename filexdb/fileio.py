@@ -1,13 +1,37 @@
+from __future__ import annotations
+
+import contextlib
+import csv
+import itertools
 import json
 import pickle
 import os
 import io
+import textwrap
+import stat
+import struct
+import tempfile
+import threading
+import zlib
 from abc import ABC, abstractmethod
 # from filexdb.document import Document
 
-__all__ = ("FileIO", "JsonFileIO", "BinaryFileIO", "Export")
+__all__ = ("FileIO", "JsonFileIO", "BinaryFileIO", "LogFileIO", "Export", "apply_changes", "atomic_write",
+           "atomic_open", "flatten", "unflatten", "csv_cell", "parse_cell", "SYNC_MODES", "EXPORT_MODES")
+
+from typing import IO, Iterable, Iterator, List, Mapping, MutableSequence, Tuple
+
+from .codec import Codec, get_codec, dumps, loads, json_default
+from .compression import compress, decompress, container_extension, open_compressed
+from .lock import FileLock
+from .update import apply_delta
 
-from typing import Tuple
+
+# Every record of a Log-file is framed as ``<length><crc32><payload>``.
+_RECORD_HEADER = struct.Struct(">II")
+
+# When the changes are written to the Database-file, see ``FileIO.__init__``.
+SYNC_MODES = ("always", "batch", "interval", "never")
 
 
 def create_file(db_name: str, data_dir: str | None):
@@ -61,6 +85,139 @@ def pre_process(ext: str, db_name: str, data_dir=None):
     return _file_name, _file_full_path
 
 
+def atomic_write(file_path: str, data: bytes) -> None:
+    """
+    Replace the content of a file, so that readers see either the old or the new content.
+
+    ``data`` is written to a temporary file in the same directory, which is
+    then renamed over ``file_path``. A crash never leaves a truncated file behind.
+
+    :param file_path: File to write.
+    :param data: New content of file.
+    """
+
+    _dir = os.path.dirname(os.path.abspath(file_path))
+
+    _fd, _temp_path = tempfile.mkstemp(dir=_dir, prefix=f".{os.path.basename(file_path)}.", suffix=".tmp")
+
+    try:
+        with os.fdopen(_fd, "wb") as file:
+            file.write(data)
+
+            # Ensure the file has been written
+            file.flush()
+            os.fsync(file.fileno())
+
+        # Keep the permissions of replaced file.
+        if os.path.exists(file_path):
+            os.chmod(_temp_path, stat.S_IMODE(os.stat(file_path).st_mode))
+
+        os.replace(_temp_path, file_path)
+
+    except BaseException:
+        if os.path.exists(_temp_path):
+            os.remove(_temp_path)
+        raise
+
+    # Make the rename itself durable, not possible on every platform.
+    try:
+        _dir_fd = os.open(_dir, os.O_RDONLY)
+    except OSError:
+        return
+
+    try:
+        os.fsync(_dir_fd)
+    except OSError:
+        pass
+    finally:
+        os.close(_dir_fd)
+
+
+def apply_changes(database: dict, changes: List[dict]) -> dict:
+    """
+    Replay change records on a Database.
+
+    A change record is a ``dict`` with an ``op`` key, one of ``insert``, ``update``,
+    ``delete``, ``drop`` or ``rename``. An ``update`` carries the updated ``documents``,
+    only their ``ids`` & the key values ``set`` on them, or the ``deltas`` of update
+    operators (``(_id_, delta)`` pairs, see ``filexdb.update``). Replaying is idempotent,
+    so a record which has already been applied to ``database`` changes nothing.
+
+    :param database: Database to modify in place.
+    :param changes: Change records to apply, in order.
+    :return: The modified Database.
+    """
+
+    # ``_id_`` -> position maps of Collections, built only when needed.
+    _positions = {}
+
+    def positions(col_name: str) -> dict:
+        if col_name not in _positions:
+            _positions[col_name] = {doc["_id_"]: i for i, doc in enumerate(database[col_name])}
+        return _positions[col_name]
+
+    for change in changes:
+        _op = change["op"]
+        _col_name = change["collection"]
+
+        if _op == "insert":
+            _collection = database.setdefault(_col_name, [])
+            _index = positions(_col_name)
+
+            for doc in change["documents"]:
+                # Skip Documents which are already there.
+                if doc["_id_"] not in _index:
+                    _index[doc["_id_"]] = len(_collection)
+                    _collection.append(doc)
+
+        elif _op == "update":
+            if _col_name not in database:
+                continue
+
+            _collection = database[_col_name]
+            _index = positions(_col_name)
+
+            if "deltas" in change:
+                # Changes of update operators, see ``Update.delta``.
+                for _id, delta in change["deltas"]:
+                    if _id in _index:
+                        apply_delta(_collection[_index[_id]], delta)
+                continue
+
+            if "documents" not in change:
+                # A delta, the same key values set on every Document.
+                for _id in change["ids"]:
+                    if _id in _index:
+                        _collection[_index[_id]].update(change["set"])
+                continue
+
+            for doc in change["documents"]:
+                if doc["_id_"] in _index:
+                    _collection[_index[doc["_id_"]]] = doc
+
+        elif _op == "delete":
+            if _col_name not in database:
+                continue
+
+            _ids = set(change["ids"])
+            database[_col_name] = [doc for doc in database[_col_name] if doc["_id_"] not in _ids]
+            _positions.pop(_col_name, None)
+
+        elif _op == "drop":
+            database.pop(_col_name, None)
+            _positions.pop(_col_name, None)
+
+        elif _op == "rename":
+            if _col_name in database and change["name"] not in database:
+                database[change["name"]] = database.pop(_col_name)
+                _positions.pop(_col_name, None)
+
+        else:
+            raise ValueError(f"`{_op}` is not a valid change")
+
+    return database
+
+
 class FileIO(ABC):
     """
     The abstract base class for all FileIO Classes.
@@ -72,6 +229,59 @@ class FileIO(ABC):
     # Using ABCMeta as metaclass allows instantiating only storages that have
     # implemented read and write
 
+    # Whether ``_persist`` writes only the changes, rather than the whole database.
+    incremental = False
+
+    def __init__(self, sync: str = "always", sync_ops: int = 100, sync_interval: int = 1000) -> None:
+        """
+        Create a new instance.
+
+        ``sync`` decides when the changes are written to the Database-file:
+
+        - ``always``: on every change.
+        - ``batch``: once ``sync_ops`` changes are waiting.
+        - ``interval``: ``sync_interval`` milliseconds after the first waiting change.
+        - ``never``: only on ``flush``.
+
+        Waiting changes are lost on a crash, but many changes are written at once.
+
+        :param sync: Durability mode.
+        :param sync_ops: Amount of changes written at once in ``batch`` mode.
+        :param sync_interval: Milliseconds between writes in ``interval`` mode.
+        """
+
+        if sync not in SYNC_MODES:
+            raise ValueError(f"`{sync}` is not a valid sync mode, use one of {list(SYNC_MODES)}")
+
+        self.sync = sync
+        self.sync_ops = sync_ops
+        self.sync_interval = sync_interval
+
+        # In-memory copy of database shared by all users of the FileIO, see ``load``.
+        self._cache: dict | None = None
+
+        # State of the Database-file when ``_cache`` was read or written.
+        self._signature: tuple | None = None
+
+        # Increases every time ``_cache`` is (re)read from the Database-file.
+        self.generation = 0
+
+        # Change records not written to the Database-file yet & amount of ``apply`` calls they came from.
+        self._pending: List[dict] = []
+        self._pending_ops = 0
+
+        # Flushes ``interval`` mode in background.
+        self._timer: threading.Timer | None = None
+
+        # Held while the database is changed or written.
+        self.lock = threading.RLock()
+
+        # Coordinates with other processes using the Database-file, see ``file_lock``.
+        self._file_lock: FileLock | None = None
+
+        # Amount of ``deferred`` blocks running.
+        self._deferred = 0
+
     @abstractmethod
     def read(self) -> dict:
         """
@@ -96,6 +306,199 @@ class FileIO(ABC):
 
         raise NotImplementedError('To be overridden!')
 
+    def load(self) -> dict:
+        """
+        The current state of the database, read from the Database-file only if the file
+        has changed since it was last read or written through this FileIO.
+
+        Every call returns the same ``dict`` until the file is changed by someone else,
+        then ``generation`` increases. The file is read under the shared ``file_lock``,
+        so it is never read while another process writes it.
+
+        :return: Database as a python Dictionary.
+        """
+
+        with self.lock:
+            # Checking the signature needs no lock, it only decides whether to read.
+            if self._cache is not None and self._stat() == self._signature:
+                return self._cache
+
+            with self.file_lock.shared():
+                return self._reload()
+
+    def apply(self, data: dict, changes: List[dict]) -> None:
+        """
+        Persist the changes made to the database, now or later depending on ``sync``.
+
+        ``data`` already contains ``changes`` & becomes the cached state of database.
+
+        :param data: The current state of the database.
+        :param changes: Change records, see ``apply_changes``.
+        """
+
+        with self.lock:
+            self._cache = data
+            self._pending += changes
+            self._pending_ops += 1
+
+            if self._deferred:
+                return
+
+            if self.sync == "always" or (self.sync == "batch" and self._pending_ops >= self.sync_ops):
+                self.flush()
+
+            elif self.sync == "interval":
+                if self._timer is None:
+                    self._timer = threading.Timer(self.sync_interval / 1000, self.flush)
+                    self._timer.daemon = True
+                    self._timer.start()
+
+    def flush(self) -> None:
+        """
+        Write the waiting changes to the Database-file.
+
+        The file is written under the exclusive ``file_lock``. If another process has
+        changed the file since it was read, the file is read again & the waiting changes
+        are replayed on top of it before writing, so no change of the other process is lost.
+
+        :return: None.
+        """
+
+        with self.lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+            if not self._pending_ops:
+                return
+
+            with self.file_lock.exclusive():
+                _data = self._cache
+
+                if _data is None or self._stat() != self._signature:
+                    _data = self._reload()
+
+                self._persist(_data, self._pending)
+
+                self._pending = []
+                self._pending_ops = 0
+                self._signature = self._stat()
+
+    @contextlib.contextmanager
+    def deferred(self) -> Iterator[None]:
+        """
+        Keep the changes applied in the ``with`` block waiting & write them at once when it ends.
+
+        Used for bulk changes to FileIOs which write the whole database on every flush.
+
+        :return: None.
+        """
+
+        with self.lock:
+            self._deferred += 1
+
+        try:
+            yield
+
+        finally:
+            with self.lock:
+                self._deferred -= 1
+
+                if not self._deferred and self.sync in ("always", "batch"):
+                    self.flush()
+
+    def close(self) -> None:
+        """
+        Write the waiting changes & stop background flushing.
+
+        :return: None.
+        """
+
+        self.flush()
+
+        with self.lock:
+            if self._file_lock is not None:
+                self._file_lock.close()
+
+    @property
+    def file_lock(self) -> FileLock:
+        """
+        Lock shared with other processes, held on ``<Database-file>.lock``.
+
+        :return: FileLock
+        """
+
+        if self._file_lock is None:
+            self._file_lock = FileLock(f"{self.get_export_path()}.lock")
+
+        return self._file_lock
+
+    def _reload(self) -> dict:
+        """
+        Read the database from the Database-file into ``_cache``.
+
+        Changes which are not written yet are kept on top of the new state, Collections
+        notice the reload by the increased ``generation``.
+
+        :return: Database as a python Dictionary.
+        """
+
+        # Take the signature before reading, a change during the read is noticed next time.
+        _signature = self._stat()
+
+        self._cache = _data = apply_changes(dict(self.read()), self._pending)
+        self._signature = _signature
+        self.generation += 1
+
+        return _data
+
+    def collection_names(self) -> List[str]:
+        """
+        Names of Collections of the database.
+
+        FileIOs which can list Collections without reading the whole database should override this.
+
+        :return: List of Collection name.
+        """
+
+        return list(self.load())
+
+    def new_collection(self) -> MutableSequence:
+        """
+        An empty Collection, to add to the database.
+
+        :return: Empty Collection.
+        """
+
+        return []
+
+    def _persist(self, data: dict, changes: List[dict]) -> None:
+        """
+        Store the changes made to the database.
+
+        By default the whole ``data`` is written, FileIOs which can store only
+        the ``changes`` should override this.
+
+        :param data: The current state of the database.
+        :param changes: Change records, see ``apply_changes``.
+        """
+
+        self.write(data)
+
+    def _stat(self) -> tuple | None:
+        """
+        Signature of the Database-file, it changes whenever the file is written.
+
+        :return: Modification time, size & inode of file.
+        """
+
+        try:
+            _stat = os.stat(self.get_export_path())
+        except FileNotFoundError:
+            return None
+
+        return _stat.st_mtime_ns, _stat.st_size, _stat.st_ino
+
     @abstractmethod
     def get_export_path(self) -> str:
         """
@@ -106,11 +509,39 @@ class FileIO(ABC):
 
         raise NotImplementedError('To be overridden!')
 
+    def read_meta(self) -> dict:
+        """
+        Read the metadata of database, e.g. Index definitions.
+
+        Metadata is stored as JSON in a ``.meta`` file next to the Database-file.
+
+        Return empty dict if there is no metadata.
+        """
+
+        _meta_path = f"{self.get_export_path()}.meta"
+
+        if not os.path.exists(_meta_path):
+            return {}
+
+        with open(_meta_path, "r") as file:
+            return json.load(file)
+
+    def write_meta(self, meta: dict) -> None:
+        """
+        Write the metadata of database.
+
+        :param meta: Metadata to store.
+        :return: None.
+        """
+
+        atomic_write(f"{self.get_export_path()}.meta", json.dumps(meta).encode())
+
 
 
 class BinaryFileIO(FileIO):
 
-    def __init__(self, db_name: str, data_dir=None):
+    def __init__(self, db_name: str, data_dir=None, codec: str | Codec = "pickle", compression: str | None = None,
+                 **options):
         """
         Create a new instance.
 
@@ -120,11 +551,16 @@ class BinaryFileIO(FileIO):
 
         :param db_name: Name of Database
         :param data_dir: Where to store the data
+        :param codec: Codec writing the Database-file, see ``filexdb.codec``.
+        :param compression: Compression of Database-file, ``zlib``, ``lzma`` or ``bz2``.
+        :param options: Durability options, see ``FileIO.__init__``.
         """
 
-        super().__init__()
+        super().__init__(**options)
 
         self._db_name, self._db_file_path = pre_process("fxdb", db_name, data_dir)
+        self.codec = get_codec(codec, compression)
+        self.compression = compression
 
         # Create the Database/File if it doesn't exist
         create_file(self._db_name, data_dir)
@@ -152,8 +588,8 @@ class BinaryFileIO(FileIO):
                 file.seek(0)
 
                 try:
-                    # Load whole Database form Database-file
-                    database = pickle.load(file)
+                    # Load whole Database form Database-file, files without a header are pickled.
+                    database = loads(file.read(), pickle.loads)
 
                 except io.UnsupportedOperation:
                     # Through an Unsupported Operation Error.
@@ -172,37 +608,219 @@ class BinaryFileIO(FileIO):
         :param data: Dictionary object to write on Database.
         :return: None.
         """
-        with open(self._db_file_path, "wb") as file:
+        # Serialize the database state before touching the Database-file.
+        serialized = dumps(data, self.codec)
+
+        # Write the serialized data to the file
+        try:
+            atomic_write(self._db_file_path, serialized)
+        except io.UnsupportedOperation:
+            raise IOError(f"Cannot write to the file.\n\t`{self._db_name}` is not a database")
+
+    def get_export_path(self) -> str:
+        return self._db_file_path
+
+
+class LogFileIO(BinaryFileIO):
+
+    incremental = True
+
+    def __init__(self, db_name: str, data_dir=None, compact_threshold: int = 4 * 1024 * 1024, **options):
+        """
+        Create a new instance.
+
+        Changes are appended to a Log-file (``.fxdb.wal``) next to the Database-file
+        instead of rewriting the whole Database. The Log is compacted into the
+        Database-file once it grows over ``compact_threshold`` bytes.
+
+        [Recommended] Don't add any file extension
+
+        :param db_name: Name of Database
+        :param data_dir: Where to store the data
+        :param compact_threshold: Size of Log-file in bytes that triggers a compaction.
+        :param options: Codec, compression & durability options, see ``BinaryFileIO.__init__``.
+        """
+
+        super().__init__(db_name, data_dir, **options)
+
+        self._log_name, self._log_file_path = pre_process("fxdb.wal", db_name, data_dir)
+        self._compact_threshold = compact_threshold
+
+        # Create the Log-file if it doesn't exist
+        create_file(self._log_name, data_dir)
+
+    def read(self) -> dict:
+        """
+        Reads the last snapshot of Database & replays the Log on it.
+
+        :return: Database as a python Dictionary.
+        """
+
+        database = dict(super().read())
+
+        return apply_changes(database, list(self._read_log()))
+
+    def write(self, data: dict) -> None:
+        """
+        Write a snapshot of entire Database & empty the Log.
+
+        :param data: Dictionary object to write on Database.
+        :return: None.
+        """
+
+        super().write(data)
+
+        # Every change is in the snapshot now.
+        with open(self._log_file_path, "wb") as file:
+            file.flush()
+            os.fsync(file.fileno())
+
+    def _persist(self, data: dict, changes: List[dict]) -> None:
+        """
+        Append ``changes`` to the Log-file.
+
+        :param data: The current state of the database.
+        :param changes: Change records, see ``apply_changes``.
+        :return: None.
+        """
+
+        # Frame every record with its length & checksum.
+        _buffer = bytearray()
 
-            # Move the cursor to the beginning of the file just in case.
-            file.seek(0)
+        for change in changes:
+            payload = pickle.dumps(_plain_change(change))
 
-            # Serialize the database state using the user-provided arguments
-            serialized = pickle.dumps(data)
+            if self.compression is not None:
+                # Compressed records are logged as ``(compression, data)``, only when they are smaller.
+                _compressed = pickle.dumps((self.compression, compress(payload, self.compression)))
 
-            # Write the serialized data to the file
+                if len(_compressed) < len(payload):
+                    payload = _compressed
+
+            _buffer += _RECORD_HEADER.pack(len(payload), zlib.crc32(payload))
+            _buffer += payload
+
+        with open(self._log_file_path, "ab") as file:
             try:
-                file.write(serialized)
+                file.write(_buffer)
             except io.UnsupportedOperation:
-                raise IOError(f"Cannot write to the file.\n\t`{self._db_name}` is not a database")
+                raise IOError(f"Cannot write to the file.\n\t`{self._log_name}` is not a log")
 
-            # Ensure the file has been written
+            # Ensure the records have been written
             file.flush()
             os.fsync(file.fileno())
 
-            # Remove data that is behind the new cursor if the file has gotten shorter.
-            file.truncate()
+            _log_size = file.tell()
 
-    def get_export_path(self) -> str:
-        return self._db_file_path
+        if _log_size >= self._compact_threshold:
+            self.compact()
+
+    def _stat(self) -> tuple | None:
+        """
+        Signature of the Database-file & Log-file.
+
+        :return: Modification time, size & inode of files.
+        """
+
+        _log_stat = os.stat(self._log_file_path)
+
+        return super()._stat(), (_log_stat.st_mtime_ns, _log_stat.st_size, _log_stat.st_ino)
+
+    def compact(self) -> None:
+        """
+        Fold the Log into a new snapshot of Database.
+
+        :return: None.
+        """
+
+        # Build the snapshot from the files, not from a caller's copy of Database.
+        with self.lock, self.file_lock.exclusive():
+            self.write(self.read())
+
+    def _read_log(self) -> Iterator[dict]:
+        """
+        Reads all complete records of Log-file.
+
+        A torn record at the end of Log (e.g. after a crash) is cut off.
+
+        :return: Change records.
+        """
+
+        with open(self._log_file_path, "rb") as file:
+            _log = file.read()
+
+        _offset = 0
+        _header_size = _RECORD_HEADER.size
+
+        while _offset + _header_size <= len(_log):
+            _length, _crc = _RECORD_HEADER.unpack_from(_log, _offset)
+            payload = _log[_offset + _header_size: _offset + _header_size + _length]
+
+            # Stop at the first incomplete or corrupted record.
+            if len(payload) != _length or zlib.crc32(payload) != _crc:
+                break
+
+            _change = pickle.loads(payload)
+
+            if isinstance(_change, tuple):
+                _compression, _data = _change
+                _change = pickle.loads(decompress(_data, _compression))
+
+            yield _change
+            _offset += _header_size + _length
+
+        if _offset != len(_log):
+            with open(self._log_file_path, "r+b") as file:
+                file.truncate(_offset)
+
+
+def _plain_change(change: dict) -> dict:
+    """
+    Strip ``Document`` & ``JsonArray`` types from a change record before it is logged.
+
+    Updates are logged as deltas, without the Documents, if the change record carries them.
+
+    :param change: Change record.
+    :return: Change record of plain python objects.
+    """
+
+    if change["op"] == "update" and "deltas" in change:
+        return {"op": "update", "collection": change["collection"], "deltas": change["deltas"]}
+
+    if change["op"] == "update" and "set" in change:
+        return {"op": "update", "collection": change["collection"],
+                "ids": [doc["_id_"] for doc in change["documents"]], "set": change["set"]}
+
+    if "documents" in change:
+        change = dict(change, documents=[dict(doc) for doc in change["documents"]])
+
+    return change
 
 
 class JsonFileIO(FileIO):
-    def __init__(self, db_name: str, data_dir=None):
+    def __init__(self, db_name: str, data_dir=None, codec: str | Codec = "json", compression: str | None = None,
+                 **options):
+        """
+        Create a new instance.
+
+        Also creates the Database-file, if it doesn't exist.
 
-        super().__init__()
+        :param db_name: Name of Database
+        :param data_dir: Where to store the data
+        :param codec: JSON Codec writing the Database-file, ``json``, ``json-pretty`` or ``orjson``.
+        :param compression: Compression of Database-file, ``zlib``, ``lzma`` or ``bz2``.
+        :param options: Durability options, see ``FileIO.__init__``.
+        """
+
+        super().__init__(**options)
 
         self._db_name, self._db_file_path = pre_process("json", db_name, data_dir)
+        self.codec = get_codec(codec)
+
+        if not self.codec.text:
+            raise ValueError(f"`{self.codec.name}` is not a JSON codec")
+
+        self.codec = get_codec(self.codec, compression)
 
         # Create the Database/File if it doesn't exist
         create_file(self._db_name, data_dir)
@@ -217,7 +835,7 @@ class JsonFileIO(FileIO):
         """
         database = None
 
-        with open(self._db_file_path, "r") as file:
+        with open(self._db_file_path, "rb") as file:
 
             # Get the file size by moving the cursor to the file end and reading its location.
             file.seek(0, os.SEEK_END)
@@ -229,8 +847,8 @@ class JsonFileIO(FileIO):
                 file.seek(0)
 
                 try:
-                    # Load whole Database form Database-file
-                    database = json.load(file)
+                    # Load whole Database form Database-file, files without a header are plain JSON.
+                    database = loads(file.read(), json.loads)
 
                 except io.UnsupportedOperation:
                     # Through an Unsupported Operation Error.
@@ -249,40 +867,164 @@ class JsonFileIO(FileIO):
         :param data: Dictionary object to write on Database.
         :return: None.
         """
-        with open(self._db_file_path, "w") as file:
+        # Serialize the database state before touching the Database-file.
+        # Uncompressed files stay plain JSON without a header, any JSON Codec reads them.
+        serialized = self.codec.encode(data) if self.codec.text else dumps(data, self.codec)
 
-            # Move the cursor to the beginning of the file just in case.
-            file.seek(0)
+        # Write the serialized data to the file
+        try:
+            atomic_write(self._db_file_path, serialized)
+        except io.UnsupportedOperation:
+            raise IOError(f"Cannot write to the file.\n\t`{self._db_name}` is not a database")
 
-            # Serialize the database state using the user-provided arguments
-            serialized = json.dumps(data, indent=4)
+    def get_export_path(self) -> str:
+        return self._db_file_path
 
-            # Write the serialized data to the file
-            try:
-                file.write(serialized)
-            except io.UnsupportedOperation:
-                raise IOError(f"Cannot write to the file.\n\t`{self._db_name}` is not a database")
 
-            # Ensure the file has been written
-            file.flush()
-            os.fsync(file.fileno())
+# Modes of ``Export`` & the file extension of each.
+EXPORT_MODES = ("json", "ndjson", "csv")
 
-            # Remove data that is behind the new cursor if the file has gotten shorter.
-            file.truncate()
 
-    def get_export_path(self) -> str:
-        return self._db_file_path
+@contextlib.contextmanager
+def atomic_open(file_path: str, compression: str | None = None, newline: str | None = None) -> Iterator[IO]:
+    """
+    Open a text file to stream into, like ``atomic_write``.
+
+    The file is written to a temporary file in the same directory, which replaces
+    ``file_path`` only if the ``with`` block finishes without an error.
+
+    :param file_path: File to write.
+    :param compression: Compression of file, in its standard container, see ``open_compressed``.
+    :param newline: ``newline`` of ``open``.
+    :return: Opened file.
+    """
+
+    _dir = os.path.dirname(os.path.abspath(file_path))
+    os.makedirs(_dir, exist_ok=True)
+
+    _fd, _temp_path = tempfile.mkstemp(dir=_dir, prefix=f".{os.path.basename(file_path)}.", suffix=".tmp")
+    os.close(_fd)
+
+    try:
+        _file: IO[str]
+
+        if compression is None:
+            _file = open(_temp_path, "w", encoding="utf-8", newline=newline)
+        else:
+            _file = open_compressed(_temp_path, compression, "wt", newline=newline)
+
+        with _file:
+            yield _file
+
+        os.replace(_temp_path, file_path)
+
+    except BaseException:
+        if os.path.exists(_temp_path):
+            os.remove(_temp_path)
+        raise
+
+
+def flatten(document: Mapping, prefix: str = "") -> dict:
+    """
+    Flatten nested objects of a Document into dotted fields, e.g. ``address.PO``.
+
+    Lists & empty objects are kept as they are.
+
+    :param document: Document to flatten.
+    :param prefix: Prefix of fields.
+    :return: Flat Document.
+    """
+
+    _flat = {}
+
+    for key, value in document.items():
+        if isinstance(value, Mapping) and value:
+            _flat.update(flatten(value, f"{prefix}{key}."))
+        else:
+            _flat[f"{prefix}{key}"] = value
+
+    return _flat
+
+
+def unflatten(document: Mapping) -> dict:
+    """
+    Nest the dotted fields of a flat Document again, the reverse of ``flatten``.
+
+    :param document: Flat Document.
+    :return: Document.
+    """
+
+    _document: dict = {}
+
+    for key, value in document.items():
+        _parent = _document
+        *_path, _last = key.split(".")
+
+        for part in _path:
+            _parent = _parent.setdefault(part, {})
+
+        _parent[_last] = value
+
+    return _document
+
+
+def csv_cell(value) -> str:
+    """
+    Write a value into a cell of CSV, so that ``parse_cell`` reads the same value back.
+
+    Strings are written as they are, unless they would be read as another JSON value.
+    Other values are written as JSON.
+
+    :param value: Value of a field.
+    :return: Cell.
+    """
+
+    if isinstance(value, str):
+        return json.dumps(value, ensure_ascii=False) if parse_cell(value) is not value or not value else value
+
+    return json.dumps(value, ensure_ascii=False, default=json_default)
+
+
+def parse_cell(cell: str):
+    """
+    Read a value written by ``csv_cell``.
+
+    :param cell: Cell of CSV.
+    :return: JSON value, or the cell itself if it is not JSON.
+    """
+
+    try:
+        return json.loads(cell)
+    except ValueError:
+        return cell
 
 
 class Export:
-    def __init__(self, _data, _file_name=None, _file_dir=None, _mode="json") -> None:
+    def __init__(self, _data, _file_name=None, _file_dir=None, _mode="json", _compression=None,
+                 _chunk_size: int = 1000, _fields: List[str] | None = None) -> None:
         """
         Exports data into different readable file.
 
+        ``_data`` is a database (Collection name -> Documents) or Documents of any
+        iterable, e.g. a ``Cursor``. Documents are written ``_chunk_size`` at a time,
+        so the whole data never has to be in memory.
+
+        - ``json``: Same as ``json.dump(_data, indent=4)``.
+        - ``ndjson``: One Document per line.
+        - ``csv``: One Document per row, nested fields are flattened, see ``flatten``.
+
+        A database is exported as a file per Collection (``<_file_name>-<collection>``)
+        in ``ndjson`` & ``csv`` modes. Files are replaced only when the export succeeds.
+        Values of ``csv`` are typed like JSON, see ``csv_cell``, so exports can be loaded
+        by ``Collection.load`` again.
+
         :param _file_name: Where to export.
         :param _file_dir: Parent dir.
         :param _data: Data to export.
-        :param _mode: Export to which mode.
+        :param _mode: Export to which mode, ``json``, ``ndjson`` or ``csv``.
+        :param _compression: Compression of exported file, ``zlib`` (``.gz``), ``lzma`` (``.xz``) or ``bz2``.
+        :param _chunk_size: Amount of Documents written at once.
+        :param _fields: Columns of ``csv``, the fields of first chunk by default.
         """
 
         # Caching arguments
@@ -290,19 +1032,26 @@ class Export:
         self.file_name = _file_name
         self.file_dir = _file_dir
         self.mode = _mode
+        self.compression = _compression
+        self.chunk_size = _chunk_size
+        self.fields = _fields
 
-        self._db_name, self._db_file_path = pre_process(self.mode, self.file_name, self.file_dir)
+        # check mode
+        if self.mode not in EXPORT_MODES:
+            raise TypeError(f"`{self.mode}` is not a appropriate mode to export")
 
-        # Create the Database/File if it doesn't exist
-        create_file(self._db_name, self.file_dir)
+        if self.chunk_size < 1:
+            raise ValueError("chunk size must be greater than 0.")
 
-        # check mode
         if self.mode == "json":
-            self.to_json(self.data, self._db_file_path)
-        else:
-            raise TypeError(f"`{self.mode}` is not a appropriate mode to export")
+            self.to_json(self.data, self._export_path(self.file_name))
 
+        elif isinstance(self.data, Mapping):
+            for col_name, documents in self.data.items():
+                self._export_documents(documents, self._export_path(f"{self.file_name}-{col_name}"))
 
+        else:
+            self._export_documents(self.data, self._export_path(self.file_name))
 
     def to_json(self, _data, _file_path) -> None:
         """
@@ -312,9 +1061,102 @@ class Export:
         :param _file_path: Where to export.
         :return: None
         """
-        try:
-            with open(_file_path, "w") as f:
-                json.dump(_data, fp=f, indent=4)
 
-        except Exception as e:
-            print(e)
+        with atomic_open(_file_path, self.compression) as f:
+            if not isinstance(_data, Mapping):
+                self._write_json_array(f, _data, "")
+                return
+
+            if not _data:
+                f.write("{}")
+                return
+
+            f.write("{")
+
+            for i, (col_name, documents) in enumerate(_data.items()):
+                f.write(("," if i else "") + f"\n    {json.dumps(col_name, ensure_ascii=True)}: ")
+                self._write_json_array(f, documents, "    ")
+
+            f.write("\n}")
+
+    def to_ndjson(self, _data, _file_path) -> None:
+        """
+        Exports Documents into a file of one JSON Object per line.
+
+        :param _data: Documents to export.
+        :param _file_path: Where to export.
+        :return: None
+        """
+
+        with atomic_open(_file_path, self.compression) as f:
+            for chunk in self._chunks(_data):
+                f.write("".join(json.dumps(doc, ensure_ascii=False, default=json_default) + "\n" for doc in chunk))
+
+    def to_csv(self, _data, _file_path) -> None:
+        """
+        Exports Documents into CSV file, nested fields are flattened.
+
+        :param _data: Documents to export.
+        :param _file_path: Where to export.
+        :return: None
+        """
+
+        with atomic_open(_file_path, self.compression, newline="") as f:
+            _writer = None
+
+            for chunk in self._chunks(_data):
+                _rows = [{field: csv_cell(value) for field, value in flatten(doc).items()} for doc in chunk]
+
+                if _writer is None:
+                    _fields = self.fields or list(dict.fromkeys(field for row in _rows for field in row))
+                    _writer = csv.DictWriter(f, _fields)
+                    _writer.writeheader()
+
+                try:
+                    _writer.writerows(_rows)
+                except ValueError:
+                    _extra = [field for row in _rows for field in row if field not in _writer.fieldnames]
+                    raise ValueError(f"Field `{_extra[0]}` is not a column of CSV, pass all the columns as `_fields`")
+
+            if _writer is None and self.fields:
+                csv.DictWriter(f, self.fields).writeheader()
+
+    def _export_documents(self, _data, _file_path) -> None:
+        if self.mode == "ndjson":
+            self.to_ndjson(_data, _file_path)
+        else:
+            self.to_csv(_data, _file_path)
+
+    def _export_path(self, file_name: str) -> str:
+        _ext = self.mode
+
+        if self.compression is not None:
+            _ext = f"{self.mode}.{container_extension(self.compression)}"
+
+        return pre_process(_ext, file_name, self.file_dir)[1]
+
+    def _chunks(self, documents: Iterable[Mapping]) -> Iterator[List[Mapping]]:
+        _iterator = iter(documents)
+        _chunk = list(itertools.islice(_iterator, self.chunk_size))
+
+        while _chunk:
+            yield _chunk
+            _chunk = list(itertools.islice(_iterator, self.chunk_size))
+
+    def _write_json_array(self, f: IO, documents: Iterable[Mapping], indent: str) -> None:
+        """
+        Write Documents as a JSON Array, indented like ``json.dump(indent=4)`` at the depth of ``indent``.
+        """
+
+        _written = False
+
+        for chunk in self._chunks(documents):
+            _items = [
+                textwrap.indent(json.dumps(doc, indent=4, default=json_default), indent + "    ")
+                for doc in chunk
+            ]
+
+            f.write(("," if _written else "[") + "\n" + ",\n".join(_items))
+            _written = True
+
+        f.write(f"\n{indent}]" if _written else "[]")
@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, Iterable
+
+__all__ = ("UuidIds", "UlidIds", "ObjectIds", "IntIds", "ID_FACTORIES", "get_id_factory")
+
+
+# Crockford's base32, in ascending order so encoded ids sort like their values.
+_CROCKFORD = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+
+# Every pair of characters, to encode 10 bits at once.
+_PAIRS = [first + second for first in _CROCKFORD for second in _CROCKFORD]
+
+
+class UuidIds:
+    """
+    ``uuid1`` as 32 hex characters, ids of older versions.
+    """
+
+    def __call__(self) -> str:
+        return uuid.uuid1().hex
+
+
+class UlidIds:
+    """
+    ULIDs: 26 characters of a 48 bits millisecond timestamp & 80 random bits.
+
+    Ids sort by the time they were created. Ids created in the same millisecond
+    count up from the random part, so ids of a factory always increase.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._last_ms = -1
+        self._random = 0
+        self._pid = os.getpid()
+
+    def __call__(self) -> str:
+        with self._lock:
+            _ms = time.time_ns() // 1_000_000
+
+            # A forked process must not continue the sequence of its parent.
+            if os.getpid() != self._pid:
+                self._pid = os.getpid()
+                self._last_ms = -1
+
+            if _ms <= self._last_ms:
+                # Same millisecond, or the clock went back.
+                _ms = self._last_ms
+                self._random += 1
+
+                if self._random >> 80:
+                    _ms += 1
+                    self._random = 0
+            else:
+                self._random = int.from_bytes(os.urandom(10), "big")
+
+            self._last_ms = _ms
+
+            _value = (_ms << 80) | self._random
+
+        return "".join(_PAIRS[(_value >> shift) & 0x3FF] for shift in range(120, -10, -10))
+
+    @staticmethod
+    def lower_bound(timestamp: float) -> str:
+        """
+        The smallest id created at ``timestamp``, for range queries on ``_id_`` by creation time.
+
+        :param timestamp: Seconds since the epoch, like ``time.time()``.
+        :return: Id.
+        """
+
+        _value = int(timestamp * 1000) << 80
+
+        return "".join(_PAIRS[(_value >> shift) & 0x3FF] for shift in range(120, -10, -10))
+
+    @staticmethod
+    def timestamp(doc_id: str) -> float:
+        """
+        Time an id was created at.
+
+        :param doc_id: Id.
+        :return: Seconds since the epoch.
+        """
+
+        _value = 0
+
+        for char in doc_id[:10]:
+            _value = (_value << 5) | _CROCKFORD.index(char)
+
+        return _value / 1000
+
+
+class ObjectIds:
+    """
+    Ids like the ``ObjectId`` of MongoDB: 24 hex characters of a 4 bytes timestamp in seconds,
+    5 random bytes of the process & a 3 bytes counter.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._pid = -1
+
+    def __call__(self) -> str:
+        with self._lock:
+            # Random bytes & counter of a new process differ from the ones of its parent.
+            if os.getpid() != self._pid:
+                self._pid = os.getpid()
+                self._process = os.urandom(5)
+                self._counter = int.from_bytes(os.urandom(3), "big")
+
+            self._counter = (self._counter + 1) & 0xFFFFFF
+            _counter = self._counter
+
+        return (int(time.time()).to_bytes(4, "big") + self._process + _counter.to_bytes(3, "big")).hex()
+
+    @staticmethod
+    def lower_bound(timestamp: float) -> str:
+        """
+        The smallest id created at ``timestamp``, for range queries on ``_id_`` by creation time.
+
+        :param timestamp: Seconds since the epoch, like ``time.time()``.
+        :return: Id.
+        """
+
+        return int(timestamp).to_bytes(4, "big").hex() + "0" * 16
+
+    @staticmethod
+    def timestamp(doc_id: str) -> float:
+        """
+        Time an id was created at, in whole seconds.
+
+        :param doc_id: Id.
+        :return: Seconds since the epoch.
+        """
+
+        return float(int(doc_id[:8], 16))
+
+
+class IntIds:
+    """
+    Integers counting up from the largest integer ``_id_`` of Collection.
+
+    Ids are unique among the processes using a Database only as long as every process
+    inserts after reading the changes of others, which ``Collection`` does before each insert.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._next = 1
+
+    def seed(self, ids: Iterable[Any]) -> None:
+        """
+        Continue after the ids of Collection.
+
+        :param ids: ``_id_`` of every Document of Collection.
+        :return: None
+        """
+
+        with self._lock:
+            self._next = max((_id for _id in ids if type(_id) is int), default=0) + 1
+
+    def __call__(self) -> int:
+        with self._lock:
+            _id = self._next
+            self._next += 1
+
+        return _id
+
+
+# Id factories by name, a new instance is used by every Collection.
+ID_FACTORIES: Dict[str, Callable[[], Callable[[], Any]]] = {
+    "uuid": UuidIds,
+    "ulid": UlidIds,
+    "objectid": ObjectIds,
+    "int": IntIds,
+}
+
+
+def get_id_factory(id_factory: str | Callable[[], Any]) -> Callable[[], Any]:
+    """
+    Create the id factory of a Collection.
+
+    :param id_factory: Name of factory, one of ``ID_FACTORIES``, or a function returning a new id.
+    :return: Function returning a new id.
+    """
+
+    if callable(id_factory):
+        return id_factory
+
+    if id_factory not in ID_FACTORIES:
+        raise ValueError(f"`{id_factory}` is not a valid id factory, use one of {list(ID_FACTORIES)}")
+
+    return ID_FACTORIES[id_factory]()
@@ -0,0 +1,352 @@
+from __future__ import annotations
+
+import bisect
+import operator
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Hashable
+
+from .query import get_path, MISSING
+
+__all__ = ("Index", "HashIndex", "SortedIndex", "INDEX_KINDS", "create_index")
+
+
+def _freeze(value: Any) -> Hashable:
+    """
+    Convert a JSON value into a hashable key.
+
+    Equal values always give equal keys, so a lookup never misses a Document.
+
+    :param value: Value of a field.
+    :return: Hashable key.
+    """
+
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+
+    if isinstance(value, Mapping):
+        return frozenset((key, _freeze(item)) for key, item in value.items())
+
+    return value
+
+
+def _sort_key(value: Any) -> tuple | None:
+    """
+    Convert a value into a key which can be ordered against any other key.
+
+    Values are ordered by type first (``None`` < numbers < strings) & then by value.
+    Other values can't be ordered and give None.
+
+    :param value: Value of a field.
+    :return: Sort key.
+    """
+
+    if value is None:
+        return 0,
+
+    if isinstance(value, (int, float)):
+        # ``NaN`` is not equal to itself, so it can't be looked up either.
+        if value != value:
+            return None
+
+        return 1, value
+
+    if isinstance(value, str):
+        return 2, value
+
+    return None
+
+
+class Index(ABC):
+    """
+    The abstract base class for all Indexes.
+
+    An Index maps values of a single field to ``_id_`` of Documents having that value.
+    Nested fields are separated by dots, e.g. ``address.PO``.
+    Documents without the field are not indexed.
+    """
+
+    kind: str
+
+    def __init__(self, field: str) -> None:
+        self.field = field
+
+    def build(self, documents: Iterable[Mapping]) -> None:
+        """
+        Index all the Documents.
+
+        :param documents: Documents of Collection.
+        :return: None
+        """
+
+        for document in documents:
+            self.add(document)
+
+    @abstractmethod
+    def add(self, document: Mapping) -> None:
+        """
+        Add a Document to the Index.
+
+        :param document: Document to add.
+        :return: None
+        """
+
+        raise NotImplementedError('To be overridden!')
+
+    @abstractmethod
+    def remove(self, document: Mapping) -> None:
+        """
+        Remove a Document from the Index.
+
+        Must be called before the indexed field of Document is changed.
+
+        :param document: Document to remove.
+        :return: None
+        """
+
+        raise NotImplementedError('To be overridden!')
+
+    @abstractmethod
+    def find(self, value: Any) -> List[str] | None:
+        """
+        Finds ``_id_`` of all Documents whose field is equal to ``value``.
+
+        Returns None if the Index can't look up such a value.
+
+        :param value: Value to look up.
+        :return: List of Document ID.
+        """
+
+        raise NotImplementedError('To be overridden!')
+
+
+class HashIndex(Index):
+    """
+    Index for equality lookups.
+    """
+
+    kind = "hash"
+
+    def __init__(self, field: str) -> None:
+        super().__init__(field)
+
+        # key -> {``_id_``: None}, a ``dict`` keeps the IDs in insertion order.
+        self._map: Dict[Hashable, Dict[str, None]] = {}
+
+    def add(self, document: Mapping) -> None:
+        _value = get_path(document, self.field)
+
+        if _value is not MISSING:
+            self._map.setdefault(_freeze(_value), {})[document["_id_"]] = None
+
+    def remove(self, document: Mapping) -> None:
+        _value = get_path(document, self.field)
+
+        if _value is MISSING:
+            return
+
+        _key = _freeze(_value)
+        _bucket = self._map.get(_key)
+
+        if _bucket is not None:
+            _bucket.pop(document["_id_"], None)
+
+            if not _bucket:
+                del self._map[_key]
+
+    def find(self, value: Any) -> List[str] | None:
+        return list(self._map.get(_freeze(value), ()))
+
+
+class SortedIndex(Index):
+    """
+    Index for equality lookups, range lookups & ordered scans.
+
+    Only ``None``, numbers & strings are indexed.
+    """
+
+    kind = "sorted"
+
+    def __init__(self, field: str) -> None:
+        super().__init__(field)
+
+        # Sort keys in order & ``_id_`` of their Documents at the same position.
+        self._keys: List[tuple] = []
+        self._ids: List[str] = []
+
+    def build(self, documents: Iterable[Mapping]) -> None:
+        """
+        Index all the Documents, sorted at once instead of inserted one by one.
+
+        :param documents: Documents of Collection.
+        :return: None
+        """
+
+        _entries = list(zip(self._keys, self._ids))
+
+        for document in documents:
+            _value = get_path(document, self.field)
+
+            if _value is MISSING:
+                continue
+
+            _key = _sort_key(_value)
+
+            if _key is not None:
+                _entries.append((_key, document["_id_"]))
+
+        # A stable sort keeps Documents of equal keys in order, like ``add``.
+        _entries.sort(key=operator.itemgetter(0))
+
+        self._keys = [key for key, _ in _entries]
+        self._ids = [doc_id for _, doc_id in _entries]
+
+    def add(self, document: Mapping) -> None:
+        _value = get_path(document, self.field)
+
+        if _value is MISSING:
+            return
+
+        _key = _sort_key(_value)
+
+        if _key is not None:
+            _position = bisect.bisect_right(self._keys, _key)
+            self._keys.insert(_position, _key)
+            self._ids.insert(_position, document["_id_"])
+
+    def remove(self, document: Mapping) -> None:
+        _value = get_path(document, self.field)
+
+        if _value is MISSING:
+            return
+
+        _key = _sort_key(_value)
+
+        if _key is None:
+            return
+
+        # Search the Document among the entries of same key only.
+        _start = bisect.bisect_left(self._keys, _key)
+        _end = bisect.bisect_right(self._keys, _key)
+
+        for position in range(_start, _end):
+            if self._ids[position] == document["_id_"]:
+                del self._keys[position]
+                del self._ids[position]
+                break
+
+    def find(self, value: Any) -> List[str] | None:
+        _key = _sort_key(value)
+
+        if _key is None:
+            return None
+
+        return self._ids[bisect.bisect_left(self._keys, _key): bisect.bisect_right(self._keys, _key)]
+
+    def range(self, low: Any = None, high: Any = None, include_low: bool = True,
+              include_high: bool = True) -> List[str] | None:
+        """
+        Finds ``_id_`` of all Documents whose field is between ``low`` & ``high``, in order.
+
+        A bound of None is open. Only values of the same type as the bounds are returned,
+        e.g. a numeric range never returns strings.
+
+        Returns None if a bound can't be ordered.
+
+        :param low: Lower bound.
+        :param high: Upper bound.
+        :param include_low: Whether ``low`` itself is in range.
+        :param include_high: Whether ``high`` itself is in range.
+        :return: List of Document ID.
+        """
+
+        _low_key = _sort_key(low) if low is not None else None
+        _high_key = _sort_key(high) if high is not None else None
+
+        if (low is not None and _low_key is None) or (high is not None and _high_key is None):
+            return None
+
+        if _low_key is None and _high_key is None:
+            return list(self._ids)
+
+        # Keep the range within the type of bounds.
+        _rank = (_low_key if _low_key is not None else _high_key or (0,))[0]
+
+        if _low_key is None:
+            _start = bisect.bisect_left(self._keys, (_rank,))
+        elif include_low:
+            _start = bisect.bisect_left(self._keys, _low_key)
+        else:
+            _start = bisect.bisect_right(self._keys, _low_key)
+
+        if _high_key is None:
+            _end = bisect.bisect_left(self._keys, (_rank + 1,))
+        elif include_high:
+            _end = bisect.bisect_right(self._keys, _high_key)
+        else:
+            _end = bisect.bisect_left(self._keys, _high_key)
+
+        return self._ids[_start: _end]
+
+    def __len__(self) -> int:
+        # Amount of indexed Documents.
+        return len(self._ids)
+
+    def groups(self, reverse: bool = False, start: Any = MISSING) -> Iterator[List[str]]:
+        """
+        ``_id_`` of indexed Documents grouped by equal values, ordered by the field.
+
+        :param reverse: Descending order if True.
+        :param start: Skip the values before ``start``, not its own, if it can be indexed.
+        :return: Iterator of Lists of Document ID.
+        """
+
+        _keys = self._keys
+        _start_key = None if start is MISSING else _sort_key(start)
+
+        if not reverse:
+            _position = 0 if _start_key is None else bisect.bisect_left(_keys, _start_key)
+
+            while _position < len(_keys):
+                _end = bisect.bisect_right(_keys, _keys[_position], _position)
+                yield self._ids[_position: _end]
+                _position = _end
+
+        else:
+            _position = len(_keys) if _start_key is None else bisect.bisect_right(_keys, _start_key)
+
+            while _position > 0:
+                _begin = bisect.bisect_left(_keys, _keys[_position - 1], 0, _position)
+                yield self._ids[_begin: _position]
+                _position = _begin
+
+    def scan(self, reverse: bool = False) -> List[str]:
+        """
+        All ``_id_`` of indexed Documents, ordered by the field.
+
+        :param reverse: Descending order if True.
+        :return: List of Document ID.
+        """
+
+        return self._ids[::-1] if reverse else list(self._ids)
+
+
+# Available kinds of Index.
+INDEX_KINDS = {
+    HashIndex.kind: HashIndex,
+    SortedIndex.kind: SortedIndex,
+}
+
+
+def create_index(field: str, kind: str = "hash") -> Index:
+    """
+    Create an empty Index of given ``kind``.
+
+    :param field: Field to index.
+    :param kind: ``hash`` or ``sorted``.
+    :return: Index
+    """
+
+    if kind not in INDEX_KINDS:
+        raise ValueError(f"`{kind}` is not a valid index kind, use one of {list(INDEX_KINDS)}")
+
+    return INDEX_KINDS[kind](field)
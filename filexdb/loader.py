@@ -0,0 +1,360 @@
+from __future__ import annotations
+
+import collections
+import csv
+import io
+import json
+import os
+import re
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import IO, Any, Callable, Iterator, List, Mapping, Tuple
+
+from .compression import COMPRESSIONS, container_extension, open_compressed
+from .fileio import EXPORT_MODES, parse_cell, unflatten
+
+__all__ = ("Loader", "Progress", "detect_format", "parse_batch")
+
+
+# Characters read from a file at once.
+_READ_SIZE = 64 * 1024
+
+# Batches parsed by every worker at the same time, so workers never wait for the reader.
+_BATCHES_PER_WORKER = 2
+
+_NON_WHITESPACE = re.compile(r"\S")
+
+_DECODER = json.JSONDecoder()
+
+
+def detect_format(file_path: str) -> Tuple[str, str | None]:
+    """
+    Format & compression of a file from its extensions, e.g. ``students.ndjson.gz``.
+
+    :param file_path: Path of file.
+    :return: Format, one of ``EXPORT_MODES``, & compression or None.
+    """
+
+    _name = file_path
+    _compression = None
+
+    for compression in COMPRESSIONS:
+        _extension = f".{container_extension(compression)}"
+
+        if _name.endswith(_extension):
+            _name = _name[:-len(_extension)]
+            _compression = compression
+            break
+
+    _format = os.path.splitext(_name)[1].lstrip(".")
+
+    if _format not in EXPORT_MODES:
+        raise ValueError(f"Format of `{file_path}` is unknown, pass one of {list(EXPORT_MODES)}")
+
+    return _format, _compression
+
+
+def parse_batch(_format: str, batch: List[Any], header: List[str] | None = None) -> List[Mapping]:
+    """
+    Parse a batch of records read by ``Loader``, in the reading process or in a worker.
+
+    :param _format: Format of file.
+    :param batch: NDJSON lines, CSV rows or Documents of JSON.
+    :param header: Fields of CSV.
+    :return: List of Document.
+    """
+
+    if _format == "ndjson":
+        return [json.loads(line) for line in batch]
+
+    if _format == "csv":
+        # Empty cells are fields missing in the Document.
+        return [unflatten({field: parse_cell(cell) for field, cell in zip(header or [], row) if cell}) for row in batch]
+
+    return batch
+
+
+class _JsonStream:
+    """
+    Reads the values of a JSON array, or of an object of arrays, one by one.
+    """
+
+    def __init__(self, file: IO[str]) -> None:
+        self._file = file
+        self._buffer = ""
+        self._pos = 0
+
+    def _more(self) -> bool:
+        _chunk = self._file.read(_READ_SIZE)
+
+        if not _chunk:
+            return False
+
+        # Values before the current position are read already.
+        self._buffer = self._buffer[self._pos:] + _chunk
+        self._pos = 0
+
+        return True
+
+    def peek(self) -> str:
+        while True:
+            _char = _NON_WHITESPACE.search(self._buffer, self._pos)
+
+            if _char is not None:
+                self._pos = _char.start()
+                return self._buffer[self._pos]
+
+            self._pos = len(self._buffer)
+
+            if not self._more():
+                return ""
+
+    def expect(self, chars: str) -> str:
+        _char = self.peek()
+
+        if not _char or _char not in chars:
+            raise ValueError(f"Invalid JSON, expected one of `{chars}` but found `{_char or 'end of file'}`")
+
+        self._pos += 1
+
+        return _char
+
+    def value(self) -> Any:
+        self.peek()
+
+        while True:
+            try:
+                _value, _end = _DECODER.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                # The value continues in the next chunk.
+                if not self._more():
+                    raise
+
+                continue
+
+            # A number at the end of buffer may continue in the next chunk too.
+            if _end == len(self._buffer) and self._more():
+                continue
+
+            self._pos = _end
+
+            return _value
+
+    def elements(self) -> Iterator[Any]:
+        self.expect("[")
+
+        if self.peek() == "]":
+            self._pos += 1
+            return
+
+        while True:
+            yield self.value()
+
+            if self.expect(",]") == "]":
+                return
+
+    def documents(self) -> Iterator[Tuple[str | None, Any]]:
+        """
+        Values of an array, or the values of every array of an object, with the key of their array.
+
+        :return: Iterator of (key or None, value).
+        """
+
+        if self.peek() == "[":
+            for _value in self.elements():
+                yield None, _value
+            return
+
+        self.expect("{")
+
+        if self.peek() == "}":
+            return
+
+        while True:
+            _key = self.value()
+            self.expect(":")
+
+            if self.peek() == "[":
+                for _value in self.elements():
+                    yield _key, _value
+            else:
+                self.value()
+
+            if self.expect(",}") == "}":
+                return
+
+
+class Loader:
+    """
+    Streams the Documents of a file written by ``Export`` (or any JSON, NDJSON or CSV file) in batches.
+
+    Only one batch per worker is in memory at once. A JSON object of arrays, like an export of
+    a Database, yields the Documents of every array with the name of its Collection.
+    """
+
+    def __init__(self, file_path: str, _format: str | None = None) -> None:
+        """
+        Open a file.
+
+        :param file_path: Path of file, compressed if it ends with ``.gz``, ``.xz`` or ``.bz2``.
+        :param _format: Format of file, ``json``, ``ndjson`` or ``csv``, detected from ``file_path`` if None.
+        """
+
+        try:
+            _detected, self.compression = detect_format(file_path)
+        except ValueError:
+            if _format is None:
+                raise
+
+            _detected, self.compression = None, None
+
+        _format = _format or _detected
+
+        if _format is None or _format not in EXPORT_MODES:
+            raise TypeError(f"`{_format}` is not a valid format, use one of {list(EXPORT_MODES)}")
+
+        self.format: str = _format
+
+        self.file_path = file_path
+
+        # Progress is measured on the file as stored, compressed or not.
+        self._raw = open(file_path, "rb")
+        self.size = os.fstat(self._raw.fileno()).st_size
+
+        _newline = "" if self.format == "csv" else None
+
+        if self.compression:
+            self._file = open_compressed(self._raw, self.compression, "rt", newline=_newline)
+        else:
+            self._file = io.TextIOWrapper(self._raw, encoding="utf-8", newline=_newline)
+
+    def position(self) -> int:
+        """
+        Bytes of file read so far.
+
+        :return: Position in file.
+        """
+
+        return self._raw.tell()
+
+    def close(self) -> None:
+        self._file.close()
+        self._raw.close()
+
+    def __enter__(self) -> "Loader":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def _raw_batches(self, batch_size: int) -> Iterator[Tuple[str | None, List[str] | None, List[Any]]]:
+        """
+        Unparsed batches of file, see ``parse_batch``.
+
+        :param batch_size: Amount of records of a batch.
+        :return: Iterator of (collection or None, CSV header or None, batch).
+        """
+
+        _header = None
+
+        if self.format == "json":
+            _records = _JsonStream(self._file).documents()
+        elif self.format == "ndjson":
+            _records = ((None, line) for line in self._file if line.strip())
+        else:
+            _reader = csv.reader(self._file)
+            _header = next(_reader, [])
+            _records = ((None, row) for row in _reader if row)
+
+        _key = None
+        _batch: List[Any] = []
+
+        for key, record in _records:
+            if _batch and (key != _key or len(_batch) >= batch_size):
+                yield _key, _header, _batch
+                _batch = []
+
+            _key = key
+            _batch.append(record)
+
+        if _batch:
+            yield _key, _header, _batch
+
+    def batches(self, batch_size: int = 10000, parallel: bool = False, workers: int | None = None,
+                executor: Executor | None = None) -> Iterator[Tuple[str | None, List[Mapping]]]:
+        """
+        Parsed batches of file, in the order of file.
+
+        :param batch_size: Amount of Documents of a batch.
+        :param parallel: Parse NDJSON & CSV in worker processes, the file is still read by this process.
+        :param workers: Amount of worker processes, the amount of CPUs by default.
+        :param executor: Executor running the workers, a new ``ProcessPoolExecutor`` by default.
+        :return: Iterator of (collection or None, List of Document).
+        """
+
+        if batch_size < 1:
+            raise ValueError("batch_size must be greater than 0.")
+
+        # A JSON stream is parsed while it is read.
+        if not parallel or self.format == "json":
+            for key, header, batch in self._raw_batches(batch_size):
+                yield key, parse_batch(self.format, batch, header)
+            return
+
+        if workers is None:
+            workers = os.cpu_count() or 1
+
+        if workers < 1:
+            raise ValueError("workers must be greater than 0.")
+
+        _executor = executor or ProcessPoolExecutor(workers)
+
+        # Batches being parsed, oldest first.
+        _pending: collections.deque = collections.deque()
+
+        try:
+            for key, header, batch in self._raw_batches(batch_size):
+                _pending.append((key, _executor.submit(parse_batch, self.format, batch, header)))
+
+                if len(_pending) >= workers * _BATCHES_PER_WORKER:
+                    _key, _future = _pending.popleft()
+                    yield _key, _future.result()
+
+            while _pending:
+                _key, _future = _pending.popleft()
+                yield _key, _future.result()
+
+        finally:
+            for _, _future in _pending:
+                _future.cancel()
+
+            if executor is None:
+                _executor.shutdown()
+
+
+class Progress:
+    """
+    Calls the ``progress`` callback of a load with its statistics after every batch.
+    """
+
+    def __init__(self, loader: Loader, callback: Callable[[dict], Any] | None) -> None:
+        self._loader = loader
+        self._callback = callback
+        self._start = time.perf_counter()
+        self.documents = 0
+
+    def update(self, documents: int) -> None:
+        self.documents += documents
+
+        if self._callback is None:
+            return
+
+        _seconds = time.perf_counter() - self._start
+
+        self._callback({
+            "documents": self.documents,
+            "bytes": self._loader.position(),
+            "total_bytes": self._loader.size,
+            "seconds": _seconds,
+            "documents_per_second": self.documents / _seconds if _seconds else 0.0,
+        })
@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import contextlib
+import os
+import threading
+from typing import Iterator
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - e.g. Windows
+    fcntl = None  # type: ignore[assignment]
+
+__all__ = ("FileLock", "ReadWriteLock")
+
+
+class FileLock:
+    """
+    A lock shared between processes, held on a lock-file next to the Database-file.
+
+    Any number of processes can hold the ``shared`` lock at once, the ``exclusive``
+    lock is held by a single process. Locks are reentrant within a process, a process
+    holding the ``exclusive`` lock also holds the ``shared`` one.
+
+    Locking needs ``fcntl``, without it (e.g. on Windows) locks do nothing.
+
+    A FileLock is not thread-safe, callers hold the lock of their FileIO.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Create a new instance, the lock-file is created on first use.
+
+        :param path: Path of lock-file.
+        """
+
+        self.path = path
+
+        self._fd: int | None = None
+
+        # Amount of nested ``shared`` & ``exclusive`` sections.
+        self._shared = 0
+        self._exclusive = 0
+
+    @contextlib.contextmanager
+    def shared(self) -> Iterator[None]:
+        """
+        Hold the lock shared with other readers.
+        """
+
+        if self._shared or self._exclusive:
+            self._shared += 1
+            try:
+                yield
+            finally:
+                self._shared -= 1
+            return
+
+        self._lock(fcntl.LOCK_SH if fcntl else 0)
+        self._shared += 1
+
+        try:
+            yield
+        finally:
+            self._shared -= 1
+            self._unlock()
+
+    @contextlib.contextmanager
+    def exclusive(self) -> Iterator[None]:
+        """
+        Hold the lock alone.
+        """
+
+        if self._exclusive:
+            self._exclusive += 1
+            try:
+                yield
+            finally:
+                self._exclusive -= 1
+            return
+
+        if self._shared:
+            raise RuntimeError("Cannot take an exclusive lock while holding a shared lock")
+
+        self._lock(fcntl.LOCK_EX if fcntl else 0)
+        self._exclusive += 1
+
+        try:
+            yield
+        finally:
+            self._exclusive -= 1
+            self._unlock()
+
+    def _lock(self, operation: int) -> None:
+        if fcntl is None:
+            return
+
+        if self._fd is None:
+            self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+
+        fcntl.flock(self._fd, operation)
+
+    def _unlock(self) -> None:
+        if self._fd is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def close(self) -> None:
+        """
+        Close the lock-file, releasing any lock.
+
+        :return: None
+        """
+
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+class ReadWriteLock:
+    """
+    A lock shared between threads, held by any number of readers or by a single writer.
+
+    Waiting writers go first, so a steady stream of readers never starves them.
+    Both sides are reentrant & the writer may also read, but a reader can't become a writer.
+    """
+
+    def __init__(self) -> None:
+        self._condition = threading.Condition(threading.Lock())
+
+        # Amount of reading threads, the writing thread & its depth, amount of waiting writers.
+        self._readers = 0
+        self._writer: int | None = None
+        self._writer_depth = 0
+        self._waiting_writers = 0
+
+        # Read depth of the current thread.
+        self._local = threading.local()
+
+    @contextlib.contextmanager
+    def read(self) -> Iterator[None]:
+        """
+        Hold the lock as a reader.
+        """
+
+        _depth = getattr(self._local, "depth", 0)
+
+        # Nested reads & reads of the writer need no waiting.
+        if _depth or self._writer == threading.get_ident():
+            self._local.depth = _depth + 1
+            try:
+                yield
+            finally:
+                self._local.depth = _depth
+            return
+
+        with self._condition:
+            while self._writer is not None or self._waiting_writers:
+                self._condition.wait()
+
+            self._readers += 1
+
+        self._local.depth = 1
+
+        try:
+            yield
+        finally:
+            self._local.depth = 0
+
+            with self._condition:
+                self._readers -= 1
+
+                if not self._readers:
+                    self._condition.notify_all()
+
+    @contextlib.contextmanager
+    def write(self) -> Iterator[None]:
+        """
+        Hold the lock as the only writer.
+        """
+
+        _me = threading.get_ident()
+
+        with self._condition:
+            if self._writer == _me:
+                self._writer_depth += 1
+            else:
+                if getattr(self._local, "depth", 0):
+                    raise RuntimeError("Cannot write while reading")
+
+                self._waiting_writers += 1
+
+                try:
+                    while self._writer is not None or self._readers:
+                        self._condition.wait()
+                finally:
+                    self._waiting_writers -= 1
+
+                self._writer = _me
+                self._writer_depth = 1
+
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._writer_depth -= 1
+
+                if not self._writer_depth:
+                    self._writer = None
+                    self._condition.notify_all()
@@ -0,0 +1,702 @@
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import pickle
+import struct
+from collections.abc import MutableSequence
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Sequence, Tuple
+
+from .codec import Codec, get_codec
+from .fileio import FileIO, pre_process, create_file, atomic_write
+
+__all__ = ("PagedFileIO", "PagedCollection", "decode_record")
+
+
+# Every data-file starts with ``<magic><version><page size>``.
+_FILE_HEADER = struct.Struct(">4sHI")
+_MAGIC = b"FXPG"
+_VERSION = 1
+
+# Every record is framed as ``<length><payload>``.
+_RECORD_HEADER = struct.Struct(">I")
+
+
+def decode_record(buffer, offset: int, codec: Codec) -> Mapping:
+    """
+    Decode the record at ``offset`` of a data-file.
+
+    :param buffer: Content of data-file, e.g. a ``mmap``.
+    :param offset: Offset of record.
+    :param codec: Codec of records.
+    :return: Document
+    """
+
+    _length, = _RECORD_HEADER.unpack_from(buffer, offset)
+    _start = offset + _RECORD_HEADER.size
+
+    return codec.decode(buffer[_start: _start + _length])
+
+
+class PagedCollection(MutableSequence):
+    """
+    A Collection stored by ``PagedFileIO``.
+
+    Only the ``_id_`` & file offset of every Document are kept in memory, Documents
+    are read from the data-file when they are accessed. Changed Documents are kept
+    in memory until they are written.
+    """
+
+    def __init__(self, file_handler: "PagedFileIO", table: int | None = None) -> None:
+        """
+        Create a new instance.
+
+        :param file_handler: FileIO storing the Collection.
+        :param table: Number of offset-table of Collection, None for a new Collection.
+        """
+
+        self._file_handler = file_handler
+        self.table = table
+
+        # ``_id_`` of Documents in order & ``_id_`` -> (offset, size) of record. Loaded on first access.
+        self._ids: List[str] | None = None
+        self._records: Dict[str, Tuple[int, int] | None] | None = None
+
+        # Documents waiting to be written, ``_id_`` -> Document.
+        self._staged: Dict[str, Mapping] = {}
+
+        # Whether the offset-table has to be written.
+        self.dirty = table is None
+
+    @classmethod
+    def from_documents(cls, file_handler: "PagedFileIO", documents: Iterable[Mapping]) -> "PagedCollection":
+        """
+        Create a new Collection of Documents which are not written yet.
+
+        :param file_handler: FileIO storing the Collection.
+        :param documents: Documents of Collection.
+        :return: PagedCollection
+        """
+
+        _collection = cls(file_handler)
+        _collection.extend(documents)
+
+        return _collection
+
+    def _load(self) -> Tuple[List[str], Dict[str, Tuple[int, int] | None]]:
+        """
+        Read the offset-table of Collection, once.
+
+        :return: ``_id_`` of Documents & ``_id_`` -> (offset, size) of record.
+        """
+
+        if self._ids is None or self._records is None:
+            if self.table is None:
+                _ids, _records = [], []
+            else:
+                _ids, _records = self._file_handler.read_table(self.table)
+
+            self._ids, self._records = _ids, dict(zip(_ids, _records))
+
+        return self._ids, self._records
+
+    def get_document(self, doc_id: str) -> Mapping | None:
+        """
+        Fetch a single Document by its ``_id_``, reading at most one record.
+
+        :param doc_id: ID of Document.
+        :return: Document or None.
+        """
+
+        _, _records = self._load()
+
+        if doc_id in self._staged:
+            return self._staged[doc_id]
+
+        _record = _records.get(doc_id)
+
+        if _record is None:
+            return None
+
+        return self._file_handler.read_record(_record[0])
+
+    def stage(self, document: Mapping) -> None:
+        """
+        Keep a changed Document in memory until it is written.
+
+        :param document: Changed Document.
+        :return: None
+        """
+
+        _, _records = self._load()
+
+        if document["_id_"] in _records:
+            self._staged[document["_id_"]] = document
+            self.dirty = True
+
+    def remove_ids(self, doc_id: Iterable[str]) -> None:
+        """
+        Remove Documents from Collection in a single pass.
+
+        :param doc_id: IDs of Documents to remove.
+        :return: None
+        """
+
+        _ids, _records = self._load()
+
+        _doc_id = {_id for _id in doc_id if _id in _records}
+
+        if not _doc_id:
+            return
+
+        self._ids = [_id for _id in _ids if _id not in _doc_id]
+
+        for _id in _doc_id:
+            self._forget(_id)
+
+    def id_index(self) -> "_PagedIdIndex":
+        """
+        ``_id_`` -> Document view of Collection, see ``Collection._build_index``.
+
+        :return: View of Collection.
+        """
+
+        return _PagedIdIndex(self)
+
+    def staged_documents(self) -> List[Mapping]:
+        return list(self._staged.values())
+
+    def written(self, records: Dict[str, Tuple[int, int]]) -> None:
+        """
+        Record the place of written Documents.
+
+        :param records: ``_id_`` -> (offset, size) of written records.
+        :return: None
+        """
+
+        _, _records = self._load()
+
+        for _id, _record in records.items():
+            if _id in _records:
+                self._file_handler.discard_record(_records[_id])
+                _records[_id] = _record
+
+        self._staged.clear()
+
+    def ids(self) -> List[str]:
+        return self._load()[0]
+
+    def records(self) -> List[Tuple[int, int] | None]:
+        _ids, _records = self._load()
+        return [_records[_id] for _id in _ids]
+
+    def scan_items(self) -> Tuple[str, str, List[int | Mapping]]:
+        """
+        Everything needed to read the Documents in another process, see ``filexdb.parallel``.
+
+        :return: Path of data-file, name of the Codec of records & for every Document either
+            the offset of its record or the Document itself.
+        """
+
+        _ids, _records = self._load()
+
+        _items: List[int | Mapping] = []
+
+        for _id in _ids:
+            _record = _records[_id]
+
+            if _id in self._staged or _record is None:
+                _items.append(dict(self._staged[_id]))
+            else:
+                _items.append(_record[0])
+
+        return self._file_handler.data_path, self._file_handler.record_codec.name, _items
+
+    def _forget(self, doc_id: str) -> None:
+        self._file_handler.discard_record(self._load()[1].pop(doc_id))
+        self._staged.pop(doc_id, None)
+        self.dirty = True
+
+    def __len__(self) -> int:
+        return len(self._load()[0])
+
+    def __iter__(self) -> Iterator[Mapping]:
+        # Iterate a snapshot of IDs, Documents removed meanwhile are skipped.
+        for _id in list(self._load()[0]):
+            _document = self.get_document(_id)
+
+            if _document is not None:
+                yield _document
+
+    def __getitem__(self, index: int | slice) -> Any:
+        _ids, _ = self._load()
+
+        if isinstance(index, slice):
+            return [self.get_document(_id) for _id in _ids[index]]
+
+        return self.get_document(_ids[index])
+
+    def __setitem__(self, index: Any, document: Any) -> None:
+        _ids, _records = self._load()
+
+        if isinstance(index, slice):
+            raise TypeError("PagedCollection does not support slice assignment")
+
+        _old_id = _ids[index]
+
+        if _old_id != document["_id_"]:
+            self._forget(_old_id)
+            _ids[index] = document["_id_"]
+            _records[document["_id_"]] = None
+
+        self._staged[document["_id_"]] = document
+        self.dirty = True
+
+    def __delitem__(self, index: int | slice) -> None:
+        _ids, _ = self._load()
+
+        _removed = _ids[index] if isinstance(index, slice) else [_ids[index]]
+        del _ids[index]
+
+        for _id in _removed:
+            self._forget(_id)
+
+    def insert(self, index: int, document: Mapping) -> None:
+        _ids, _records = self._load()
+
+        if document["_id_"] in _records:
+            raise ValueError(f"Document id `{document['_id_']}` is already exists")
+
+        _ids.insert(index, document["_id_"])
+        _records[document["_id_"]] = None
+        self._staged[document["_id_"]] = document
+        self.dirty = True
+
+    def clear(self) -> None:
+        for _id in self._load()[0]:
+            self._forget(_id)
+
+        self._ids = []
+
+    def __reduce__(self):
+        # Pickled as a plain list of Documents.
+        return list, (list(self),)
+
+    def __repr__(self) -> str:
+        return f"PagedCollection(table={self.table}, size={len(self)})"
+
+
+class _PagedIdIndex:
+    """
+    ``_id_`` -> Document view of a ``PagedCollection``.
+
+    It only reads from the Collection, ``PagedCollection`` keeps track of the IDs itself.
+    """
+
+    def __init__(self, collection: PagedCollection) -> None:
+        self._collection = collection
+
+    def get(self, doc_id: str, default: Any = None) -> Any:
+        _document = self._collection.get_document(doc_id)
+        return default if _document is None else _document
+
+    def __getitem__(self, doc_id: str) -> Mapping:
+        _document = self._collection.get_document(doc_id)
+
+        if _document is None:
+            raise KeyError(doc_id)
+
+        return _document
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._collection._load()[1]
+
+    def __setitem__(self, doc_id: str, document: Mapping) -> None:
+        pass
+
+    def pop(self, doc_id: str, default: Any = None) -> Any:
+        return self.get(doc_id, default)
+
+    def clear(self) -> None:
+        pass
+
+    def __len__(self) -> int:
+        return len(self._collection)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._collection.ids()))
+
+
+class PagedFileIO(FileIO):
+    """
+    Stores every Document as a length-prefixed record in fixed-size pages.
+
+    Files of a Database are:
+
+    - ``{db_name}.fxpg``: catalog, the names of data-file & offset-tables.
+    - ``{db_name}.fxpg.data{n}``: records, a record smaller than a page never crosses a page boundary.
+    - ``{db_name}.fxpg.table{n}``: ``_id_`` & record offset of every Document of a Collection.
+
+    Opening a Database reads only the catalog, offset-tables are read when a Collection
+    is accessed & records are read through ``mmap`` when a Document is accessed.
+    """
+
+    incremental = True
+
+    def __init__(self, db_name: str, data_dir=None, page_size: int = 4096,
+                 compact_threshold: int = 4 * 1024 * 1024, codec: str | Codec = "pickle",
+                 compression: str | None = None, **options):
+        """
+        Create a new instance.
+
+        Also creates the Database-files, if they don't exist.
+
+        [Recommended] Don't add any file extension
+
+        :param db_name: Name of Database
+        :param data_dir: Where to store the data
+        :param page_size: Size of a page in bytes, for a new Database.
+        :param compact_threshold: Bytes of outdated records that trigger a compaction.
+        :param codec: Codec of records of a new data-file, see ``filexdb.codec``.
+        :param compression: Compression of every record of a new data-file, ``zlib``, ``lzma`` or ``bz2``.
+        :param options: Durability options, see ``FileIO.__init__``.
+        """
+
+        super().__init__(**options)
+
+        self._db_name, self._db_file_path = pre_process("fxpg", db_name, data_dir)
+        self._compact_threshold = compact_threshold
+        self.codec = get_codec(codec, compression)
+
+        # Create the catalog if it doesn't exist
+        create_file(self._db_name, data_dir)
+
+        self._catalog = self._read_catalog()
+
+        if not self._catalog:
+            self._catalog = {
+                "data": 0, "page_size": page_size, "codec": self.codec.name,
+                "garbage": 0, "next_table": 0, "commit": 0, "collections": {},
+            }
+            self._create_data_file(self._data_path(0), page_size)
+            self._write_catalog()
+
+        # Read-only map of data-file & (number, inode) of the mapped data-file.
+        self._map: mmap.mmap | None = None
+        self._map_file: Tuple[int, int] | None = None
+
+    def read(self) -> dict:
+        """
+        Reads the catalog of Database.
+
+        Collections are ``PagedCollection``, nothing of them is read yet.
+
+        :return: Database as a python Dictionary.
+        """
+
+        self._catalog = self._read_catalog()
+
+        # Another instance may have switched to a new data-file, e.g. by a compaction.
+        if self._map_file is not None and self._map_file != self._data_file():
+            self._close_map()
+
+        return {name: PagedCollection(self, table) for name, table in self._catalog["collections"].items()}
+
+    def write(self, data: dict) -> None:
+        """
+        Write entire Database into a new data-file, dropping all outdated records.
+
+        :param data: Dictionary object to write on Database.
+        :return: None.
+        """
+
+        _data_number = self._catalog["data"] + 1
+        _data_path = self._data_path(_data_number)
+        _page_size = self._catalog["page_size"]
+
+        self._create_data_file(_data_path, _page_size)
+
+        _tables: Dict[str, int] = {}
+        _layouts = []
+
+        with open(_data_path, "r+b") as file:
+            file.seek(0, os.SEEK_END)
+
+            for name, collection in data.items():
+                _documents = list(collection)
+                _records = self._write_records(file, _documents, self.codec)
+
+                _tables[name] = self._catalog["next_table"]
+                self._catalog["next_table"] += 1
+
+                _ids = [document["_id_"] for document in _documents]
+                self._write_table(_tables[name], _ids, _records)
+                _layouts.append((name, _ids, _records))
+
+            file.flush()
+            os.fsync(file.fileno())
+
+        _old_data = self._catalog["data"]
+        _old_tables = set(self._catalog["collections"].values())
+
+        # Switch to the new files, a new data-file has the Codec of this FileIO.
+        self._catalog.update(data=_data_number, codec=self.codec.name, garbage=0, collections=_tables)
+        self._write_catalog()
+        self._close_map()
+
+        for name, _ids, _records in _layouts:
+            # Collections in memory now point to the new files.
+            if not isinstance(data[name], PagedCollection):
+                data[name] = PagedCollection(self)
+
+            _collection = data[name]
+            _collection.table = _tables[name]
+            _collection._ids = _ids
+            _collection._records = dict(zip(_ids, _records))
+            _collection._staged.clear()
+            _collection.dirty = False
+
+        self._remove_files([self._data_path(_old_data)] + [self._table_path(table) for table in _old_tables])
+
+    def apply(self, data: dict, changes: List[dict]) -> None:
+        # Keep updated Documents in memory until they are written.
+        for change in changes:
+            if change["op"] == "update" and isinstance(data.get(change["collection"]), PagedCollection):
+                for document in change["documents"]:
+                    data[change["collection"]].stage(document)
+
+        super().apply(data, changes)
+
+    def new_collection(self) -> PagedCollection:
+        return PagedCollection(self)
+
+    def compact(self) -> None:
+        """
+        Rewrite the data-file without outdated records.
+
+        :return: None.
+        """
+
+        with self.lock:
+            self.flush()
+
+            with self.file_lock.exclusive():
+                self.write(self.load())
+
+    def read_record(self, offset: int) -> Mapping:
+        """
+        Read a single record of data-file.
+
+        :param offset: Offset of record.
+        :return: Document
+        """
+
+        with self.lock:
+            _map = self._map
+
+            if _map is None or offset + _RECORD_HEADER.size > len(_map):
+                _map = self._open_map()
+
+            _length, = _RECORD_HEADER.unpack_from(_map, offset)
+
+            if offset + _RECORD_HEADER.size + _length > len(_map):
+                _map = self._open_map()
+
+            return decode_record(_map, offset, self.record_codec)
+
+    def discard_record(self, record: Tuple[int, int] | None) -> None:
+        """
+        Account an outdated record, for compaction.
+
+        :param record: Offset & size of record, None if it is not written.
+        :return: None
+        """
+
+        if record is not None:
+            self._catalog["garbage"] += record[1]
+
+    def read_table(self, table: int) -> tuple:
+        """
+        Read an offset-table.
+
+        :param table: Number of offset-table.
+        :return: List of ``_id_`` & List of (offset, size) of records.
+        """
+
+        with open(self._table_path(table), "rb") as file:
+            return pickle.load(file)
+
+    @property
+    def record_codec(self) -> Codec:
+        """
+        Codec of records of the current data-file.
+        """
+
+        return get_codec(self._catalog.get("codec", "pickle"))
+
+    @property
+    def data_path(self) -> str:
+        """
+        Path of the current data-file.
+        """
+
+        return self._data_path(self._catalog["data"])
+
+    def get_export_path(self) -> str:
+        return self._db_file_path
+
+    def _persist(self, data: dict, changes: List[dict]) -> None:
+        """
+        Append changed Documents to the data-file & rewrite the offset-tables of changed Collections.
+
+        :param data: The current state of the database.
+        :param changes: Change records, see ``apply_changes``.
+        :return: None.
+        """
+
+        _collections: Dict[str, PagedCollection] = {}
+
+        for name, collection in data.items():
+            if not isinstance(collection, PagedCollection):
+                collection = data[name] = PagedCollection.from_documents(self, collection)
+
+            _collections[name] = collection
+
+        _dirty = [collection for collection in _collections.values() if collection.dirty]
+
+        # Append all the changed Documents at once.
+        _documents = [document for collection in _dirty for document in collection.staged_documents()]
+
+        with open(self._data_path(self._catalog["data"]), "r+b") as file:
+            file.seek(0, os.SEEK_END)
+            _records = iter(self._write_records(file, _documents, self.record_codec))
+
+            file.flush()
+            os.fsync(file.fileno())
+
+        for collection in _dirty:
+            collection.written({document["_id_"]: next(_records) for document in collection.staged_documents()})
+
+            if collection.table is None:
+                collection.table = self._catalog["next_table"]
+                self._catalog["next_table"] += 1
+
+            self._write_table(collection.table, collection.ids(), collection.records())
+            collection.dirty = False
+
+        _old_tables = set(self._catalog["collections"].values())
+
+        self._catalog["collections"] = {name: collection.table for name, collection in _collections.items()}
+        self._write_catalog()
+
+        # Offset-tables of dropped Collections.
+        self._remove_files([self._table_path(table) for table in _old_tables - set(self._catalog["collections"].values())])
+
+        if self._catalog["garbage"] > self._compact_threshold:
+            self.write(data)
+
+    def _write_records(self, file, documents: List[Mapping], codec: Codec) -> List[Tuple[int, int]]:
+        """
+        Append Documents as records at the end of ``file``.
+
+        :param file: Data-file, positioned at its end.
+        :param documents: Documents to write.
+        :param codec: Codec of records.
+        :return: Offset & size of records.
+        """
+
+        _page_size = self._catalog["page_size"]
+        _position = file.tell()
+
+        _buffer = bytearray()
+        _records: List[Tuple[int, int]] = []
+
+        for document in documents:
+            payload = codec.encode(dict(document))
+            _size = _RECORD_HEADER.size + len(payload)
+            _in_page = _position % _page_size
+
+            # Start a new page if the record doesn't fit into the current one,
+            # records bigger than a page start at a page boundary.
+            if _in_page and (_in_page + _size > _page_size):
+                _padding = _page_size - _in_page
+                _buffer += bytes(_padding)
+                _position += _padding
+
+            _records.append((_position, _size))
+            _buffer += _RECORD_HEADER.pack(len(payload))
+            _buffer += payload
+            _position += _size
+
+        file.write(_buffer)
+
+        return _records
+
+    def _write_table(self, table: int, ids: List[str], records: Sequence[Tuple[int, int] | None]) -> None:
+        atomic_write(self._table_path(table), pickle.dumps((list(ids), list(records))))
+
+    def _read_catalog(self) -> dict:
+        with open(self._db_file_path, "r") as file:
+            _content = file.read()
+
+        return json.loads(_content) if _content else {}
+
+    def _write_catalog(self) -> None:
+        # Every commit changes the catalog, so other processes notice the change.
+        self._catalog["commit"] += 1
+
+        atomic_write(self._db_file_path, json.dumps(self._catalog).encode())
+
+    def _open_map(self) -> mmap.mmap:
+        """
+        Map the current data-file into memory, again if it has grown.
+
+        :return: Map of data-file.
+        """
+
+        self._close_map()
+
+        with open(self._data_path(self._catalog["data"]), "rb") as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._map_file = (self._catalog["data"], os.fstat(file.fileno()).st_ino)
+
+        return self._map
+
+    def _close_map(self) -> None:
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+            self._map_file = None
+
+    def _data_file(self) -> Tuple[int, int] | None:
+        """
+        Number & inode of the current data-file, None if it doesn't exist.
+        """
+
+        try:
+            return self._catalog["data"], os.stat(self._data_path(self._catalog["data"])).st_ino
+        except FileNotFoundError:
+            return None
+
+    def _create_data_file(self, data_path: str, page_size: int) -> None:
+        with open(data_path, "wb") as file:
+            file.write(_FILE_HEADER.pack(_MAGIC, _VERSION, page_size))
+
+            # Records start on the second page.
+            file.write(bytes(page_size - _FILE_HEADER.size))
+
+            file.flush()
+            os.fsync(file.fileno())
+
+    def _data_path(self, number: int) -> str:
+        return f"{self._db_file_path}.data{number}"
+
+    def _table_path(self, number: int) -> str:
+        return f"{self._db_file_path}.table{number}"
+
+    @staticmethod
+    def _remove_files(paths: List[str]) -> None:
+        for path in paths:
+            if os.path.exists(path):
+                os.remove(path)
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import contextlib
+import mmap
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import List, Mapping, Sequence, TypeVar
+
+from .codec import get_codec
+from .query import Query, compile_query
+
+__all__ = ("parallel_filter",)
+
+
+_Document = TypeVar("_Document", bound=Mapping)
+
+# Chunks per worker, so faster workers take over the rest of work.
+_CHUNKS_PER_WORKER = 4
+
+
+def _match_chunk(query: Mapping, data_path: str | None, codec: str | None, items: List[int | Mapping]) -> List[int]:
+    """
+    Match a chunk of Documents in a worker process.
+
+    :param query: Condition to search Document.
+    :param data_path: Data-file of ``PagedFileIO`` for items which are record offsets.
+    :param codec: Name of the Codec of records in ``data_path``.
+    :param items: Documents, or offsets of records in ``data_path``.
+    :return: Positions of matching Documents in ``items``.
+    """
+
+    from .paged import decode_record
+
+    _match = compile_query(query).match
+    _positions: List[int] = []
+
+    _map: mmap.mmap | None = None
+
+    with contextlib.ExitStack() as stack:
+        for position, item in enumerate(items):
+            if isinstance(item, int):
+                if data_path is None or codec is None:
+                    raise ValueError("Offsets of records need the data-file & Codec of records")
+
+                # Read the records through the page cache, nothing is sent to the worker.
+                if _map is None:
+                    _file = stack.enter_context(open(data_path, "rb"))
+                    _map = stack.enter_context(mmap.mmap(_file.fileno(), 0, access=mmap.ACCESS_READ))
+
+                item = decode_record(_map, item, get_codec(codec))
+
+            if _match(item):
+                _positions.append(position)
+
+    return _positions
+
+
+def parallel_filter(query: Query, documents: Sequence[_Document], workers: int | None = None,
+                    executor: Executor | None = None) -> List[_Document]:
+    """
+    Finds the Documents matching ``query`` by matching chunks of ``documents`` in worker processes.
+
+    Workers return positions only, so the result holds the Documents of ``documents``
+    themselves, in their order. Documents of a ``PagedCollection`` are read by the workers
+    from the data-file, other Documents are sent to them.
+
+    :param query: Compiled query.
+    :param documents: Documents to match.
+    :param workers: Amount of worker processes, the amount of CPUs by default.
+    :param executor: Executor running the workers, a new ``ProcessPoolExecutor`` by default.
+    :return: List of Document
+    """
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    if workers < 1:
+        raise ValueError("workers must be greater than 0.")
+
+    _scan_items = getattr(documents, "scan_items", None)
+
+    if _scan_items is not None:
+        _data_path, _codec, _items = _scan_items()
+    else:
+        # Plain ``dict`` pickles smaller than ``Document`` or a columnar ``Row``.
+        _data_path, _codec, _items = None, None, [dict(doc) for doc in documents]
+
+    if not _items:
+        return []
+
+    _chunk_size = -(-len(_items) // (workers * _CHUNKS_PER_WORKER))
+    _starts = range(0, len(_items), _chunk_size)
+
+    _executor = executor or ProcessPoolExecutor(workers)
+
+    try:
+        _futures = [
+            _executor.submit(_match_chunk, query.query, _data_path, _codec, _items[start: start + _chunk_size])
+            for start in _starts
+        ]
+
+        # Merge in the order of chunks.
+        _positions = [start + position for start, future in zip(_starts, _futures) for position in future.result()]
+
+    finally:
+        if executor is None:
+            _executor.shutdown()
+
+    return [documents[position] for position in _positions]
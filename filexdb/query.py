@@ -0,0 +1,416 @@
+from __future__ import annotations
+
+import re
+from typing import Any, Callable, Dict, List, Mapping, Tuple
+
+__all__ = ("Query", "compile_query", "get_path", "MISSING")
+
+
+class _Missing:
+    """
+    Value of a field which doesn't exist in a Document.
+    """
+
+    def __repr__(self) -> str:
+        return "MISSING"
+
+    def __reduce__(self) -> str:
+        # Unpickled as the same object.
+        return "MISSING"
+
+
+MISSING = _Missing()
+
+# Operators which can be answered by an Index, see ``Query.plan``.
+_RANGE_OPERATORS = ("$gt", "$gte", "$lt", "$lte")
+
+
+def get_path(document: Mapping, path: str, default: Any = MISSING) -> Any:
+    """
+    Get the value of a field of Document, nested fields are separated by dots (e.g. ``address.PO``).
+
+    Numeric parts of ``path`` index into lists, e.g. ``skills.0``.
+
+    :param document: Document to look into.
+    :param path: Name of field.
+    :param default: Value to return if the field doesn't exist.
+    :return: Value of the field.
+    """
+
+    if "." not in path:
+        return document.get(path, default)
+
+    _value = document
+
+    for key in path.split("."):
+        if isinstance(_value, Mapping):
+            if key not in _value:
+                return default
+            _value = _value[key]
+
+        elif isinstance(_value, list) and key.isdigit() and int(key) < len(_value):
+            _value = _value[int(key)]
+
+        else:
+            return default
+
+    return _value
+
+
+def _getter(path: str) -> Callable[[Mapping], Any]:
+    """
+    Create a function reading the value of ``path`` from a Document.
+
+    :param path: Name of field.
+    :return: Getter function.
+    """
+
+    if "." not in path:
+        return lambda doc: doc.get(path, MISSING)
+
+    return lambda doc: get_path(doc, path)
+
+
+def _compare(operator: Callable[[Any, Any], bool], operand: Any) -> Callable[[Any], bool]:
+    """
+    Create a test for ordering operators; missing fields & values of other types never match.
+    """
+
+    def test(value: Any) -> bool:
+        if value is MISSING:
+            return False
+
+        try:
+            return operator(value, operand)
+        except TypeError:
+            return False
+
+    return test
+
+
+def _compile_operator(operator: str, operand: Any, expression: Mapping) -> Callable[[Any], bool]:
+    """
+    Create a test for a value of field, for a single operator.
+
+    :param operator: Operator, e.g. ``$gt``.
+    :param operand: Operand of operator.
+    :param expression: Whole operator expression of field, for ``$options``.
+    :return: Test function.
+    """
+
+    if operator == "$eq":
+        return lambda value: value is not MISSING and value == operand
+
+    if operator == "$ne":
+        return lambda value: value is MISSING or value != operand
+
+    if operator == "$gt":
+        return _compare(lambda value, other: value > other, operand)
+
+    if operator == "$gte":
+        return _compare(lambda value, other: value >= other, operand)
+
+    if operator == "$lt":
+        return _compare(lambda value, other: value < other, operand)
+
+    if operator == "$lte":
+        return _compare(lambda value, other: value <= other, operand)
+
+    if operator in ("$in", "$nin"):
+        if not isinstance(operand, (list, tuple, set, frozenset)):
+            raise ValueError(f"`{operator}` needs a list of values")
+
+        # Use a set when all values are hashable.
+        _values: frozenset | list
+
+        try:
+            _values = frozenset(operand)
+        except TypeError:
+            _values = list(operand)
+
+        def contains(value: Any) -> bool:
+            try:
+                return value in _values
+            except TypeError:
+                return value in list(_values)
+
+        if operator == "$in":
+            return lambda value: value is not MISSING and contains(value)
+
+        return lambda value: value is MISSING or not contains(value)
+
+    if operator == "$exists":
+        if operand:
+            return lambda value: value is not MISSING
+
+        return lambda value: value is MISSING
+
+    if operator == "$regex":
+        _flags = 0
+
+        for option in expression.get("$options", ""):
+            _flags |= {"i": re.IGNORECASE, "m": re.MULTILINE, "s": re.DOTALL, "x": re.VERBOSE}[option]
+
+        _pattern = operand if isinstance(operand, re.Pattern) else re.compile(operand, _flags)
+        _search = _pattern.search
+
+        return lambda value: isinstance(value, str) and _search(value) is not None
+
+    if operator == "$options":
+        # Used by ``$regex``.
+        return lambda value: True
+
+    if operator == "$not":
+        _test = _compile_expression(operand)
+        return lambda value: not _test(value)
+
+    raise ValueError(f"`{operator}` is not a valid query operator")
+
+
+def _is_expression(value: Any) -> bool:
+    """
+    Check a value of query is an operator expression (e.g. ``{"$gt": 5}``) or a literal value.
+    """
+
+    if not isinstance(value, Mapping) or not value:
+        return False
+
+    _operators = [key.startswith("$") for key in value.keys()]
+
+    if any(_operators) and not all(_operators):
+        raise ValueError(f"Cannot mix operators and fields in `{value}`")
+
+    return all(_operators)
+
+
+def _compile_expression(expression: Any) -> Callable[[Any], bool]:
+    """
+    Create a test for a value of field, for a literal value or an operator expression.
+
+    :param expression: Literal value or operator expression.
+    :return: Test function.
+    """
+
+    if not _is_expression(expression):
+        return _compile_operator("$eq", expression, {})
+
+    _tests = [_compile_operator(operator, operand, expression) for operator, operand in expression.items()]
+
+    return _all(_tests)
+
+
+def _all(tests: List[Callable[[Any], bool]]) -> Callable[[Any], bool]:
+    """
+    Combine tests, the result passes if every test passes.
+    """
+
+    if len(tests) == 1:
+        return tests[0]
+
+    if len(tests) == 2:
+        _first, _second = tests
+        return lambda value: _first(value) and _second(value)
+
+    def test(value: Any) -> bool:
+        for _test in tests:
+            if not _test(value):
+                return False
+        return True
+
+    return test
+
+
+def _compile_field(path: str, expression: Any) -> Callable[[Mapping], bool]:
+    """
+    Create a predicate of Document for a single field of query.
+    """
+
+    _get = _getter(path)
+    _test = _compile_expression(expression)
+
+    return lambda doc: _test(_get(doc))
+
+
+def _compile_logical(operator: str, queries: Any) -> Callable[[Mapping], bool]:
+    """
+    Create a predicate of Document for ``$and``, ``$or`` & ``$nor``.
+    """
+
+    if not isinstance(queries, (list, tuple)) or not queries:
+        raise ValueError(f"`{operator}` needs a non-empty list of queries")
+
+    _predicates = [_compile_document(query) for query in queries]
+
+    if operator == "$and":
+        return _all(_predicates)
+
+    if operator == "$or":
+        return lambda doc: any(predicate(doc) for predicate in _predicates)
+
+    if operator == "$nor":
+        return lambda doc: not any(predicate(doc) for predicate in _predicates)
+
+    raise ValueError(f"`{operator}` is not a valid query operator")
+
+
+def _compile_document(query: Mapping) -> Callable[[Mapping], bool]:
+    """
+    Create a predicate of Document for a whole query.
+    """
+
+    if not isinstance(query, Mapping):
+        raise ValueError('Query is not a Dictionary')
+
+    _predicates = []
+
+    for key, value in query.items():
+        if key.startswith("$"):
+            _predicates.append(_compile_logical(key, value))
+        else:
+            _predicates.append(_compile_field(key, value))
+
+    if not _predicates:
+        return lambda doc: True
+
+    return _all(_predicates)
+
+
+def _tighter(expression: Mapping, exclusive: str, inclusive: str, direction: int) -> Tuple[Any, bool]:
+    """
+    The tighter bound of a side of a range, e.g. of ``$gt`` & ``$gte``.
+
+    :param expression: Operator expression.
+    :param exclusive: Exclusive operator of the side.
+    :param inclusive: Inclusive operator of the side.
+    :param direction: 1 if a greater bound is tighter, -1 if a smaller one is.
+    :return: Bound, None if there is none, & whether the bound itself is in range.
+    """
+
+    if exclusive not in expression:
+        return expression.get(inclusive), True
+
+    if inclusive not in expression:
+        return expression[exclusive], False
+
+    _exclusive, _inclusive = expression[exclusive], expression[inclusive]
+
+    # An equal exclusive bound is the tighter one.
+    if (_inclusive > _exclusive) if direction == 1 else (_inclusive < _exclusive):
+        return _inclusive, True
+
+    return _exclusive, False
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and value == value
+
+
+def _is_scalar(value: Any) -> bool:
+    return value is None or isinstance(value, (str, bool)) or _is_number(value)
+
+
+class Query:
+    """
+    A query compiled into a predicate of Document.
+
+    Call it with a Document to check the Document matches the query.
+    """
+
+    def __init__(self, query: Mapping) -> None:
+        self.query = query
+
+        # The predicate itself, ``Query()`` is just a shortcut for it.
+        self.match: Callable[[Mapping], bool] = _compile_document(query)
+
+        # Conditions of top-level fields an Index can answer.
+        self.plan: Dict[str, Tuple[str, Any]] = self._plan()
+
+        # Tests of the values of fields, for Collections storing every field separately.
+        self.tests: Dict[str, Callable[[Any], bool]] = {
+            key: _compile_expression(value) for key, value in query.items() if not key.startswith("$")
+        }
+
+        # Whether ``plan`` is the whole query, so Documents found by an Index match it without testing them.
+        self.exact: bool = self._exact()
+
+    def __call__(self, document: Mapping) -> bool:
+        return self.match(document)
+
+    def _exact(self) -> bool:
+        """
+        Check the query is a single condition of ``plan`` on ``None``, numbers or strings.
+        """
+
+        if len(self.query) != 1 or len(self.plan) != 1:
+            return False
+
+        (_key, _value), = self.query.items()
+        _operator, _operand = self.plan[_key]
+
+        if _operator == "$eq":
+            return (not _is_expression(_value) or len(_value) == 1) and _is_scalar(_operand)
+
+        if _operator == "$in":
+            return len(_value) == 1 and all(_is_scalar(value) for value in _operand)
+
+        # Ranges are kept within the type of their bounds, see ``SortedIndex.range``.
+        _bounds = list(_value.values())
+
+        return (all(operator in _RANGE_OPERATORS for operator in _value)
+                and (all(_is_number(bound) for bound in _bounds) or all(isinstance(bound, str) for bound in _bounds)))
+
+    def _plan(self) -> Dict[str, Tuple[str, Any]]:
+        """
+        Collect the conditions of fields which must be true for every matching Document.
+
+        Every condition is one of ``("$eq", value)``, ``("$in", values)`` or
+        ``("range", (low, high, include_low, include_high))``.
+
+        :return: field -> condition map.
+        """
+
+        _plan: Dict[str, Tuple[str, Any]] = {}
+
+        for key, value in self.query.items():
+            if key.startswith("$"):
+                continue
+
+            if not _is_expression(value):
+                _plan[key] = ("$eq", value)
+
+            elif "$eq" in value:
+                _plan[key] = ("$eq", value["$eq"])
+
+            elif "$in" in value:
+                _plan[key] = ("$in", list(value["$in"]))
+
+            elif any(operator in value for operator in _RANGE_OPERATORS):
+                try:
+                    _low, _include_low = _tighter(value, "$gt", "$gte", 1)
+                    _high, _include_high = _tighter(value, "$lt", "$lte", -1)
+                except TypeError:
+                    # Bounds which can't be compared are left to ``match``.
+                    continue
+
+                _plan[key] = ("range", (_low, _high, _include_low, _include_high))
+
+        return _plan
+
+
+def compile_query(query: Mapping | Query | None) -> Query:
+    """
+    Compile a query once, to match it against any number of Documents.
+
+    Besides exact values, fields of ``query`` accept operator expressions
+    (``$eq``, ``$ne``, ``$gt``, ``$gte``, ``$lt``, ``$lte``, ``$in``, ``$nin``,
+    ``$regex``, ``$exists``, ``$not``) and ``query`` accepts ``$and``, ``$or`` & ``$nor``.
+    Nested fields are separated by dots, e.g. ``{"address.PO": "Bongaon"}``.
+
+    :param query: Condition to search Document.
+    :return: Compiled Query.
+    """
+
+    if isinstance(query, Query):
+        return query
+
+    return Query(query or {})
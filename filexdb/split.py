@@ -0,0 +1,278 @@
+from __future__ import annotations
+
+import json
+import os
+import pickle
+import re
+from typing import Dict, List
+
+from .codec import Codec, get_codec, dumps, loads
+from .fileio import FileIO, BinaryFileIO, JsonFileIO, LogFileIO, pre_process, atomic_write
+
+__all__ = ("SplitFileIO",)
+
+
+# Version of the manifest format.
+_FORMAT = 1
+
+# Characters of Collection names kept in the names of their files.
+_UNSAFE = re.compile(r"[^A-Za-z0-9_-]+")
+
+
+class SplitFileIO(FileIO):
+    """
+    Stores every Collection in a file of its own, in a directory per Database:
+
+    - ``{db_name}.fxdb.d/manifest.json``: the file of every Collection.
+    - ``{db_name}.fxdb.d/{collection}-{n}.fxdb``: Documents of a Collection, written by the codec.
+
+    A change rewrites only the files of the Collections it touches. Files are never
+    changed in place, a new file is written & the manifest is replaced to point at it,
+    so the manifest always describes a complete Database. ``rename`` & ``drop`` change
+    the manifest only.
+    """
+
+    def __init__(self, db_name: str, data_dir=None, codec: str | Codec = "pickle", compression: str | None = None,
+                 **options):
+        """
+        Create a new instance.
+
+        Also creates the Database-directory, if it doesn't exist. A Database stored in a single
+        Database-file of ``binary``, ``log`` or ``json`` mode is migrated into it, the single
+        Database-file is kept as it is.
+
+        [Recommended] Don't add any file extension
+
+        :param db_name: Name of Database
+        :param data_dir: Where to store the data
+        :param codec: Codec writing the files of Collections, see ``filexdb.codec``.
+        :param compression: Compression of the files of Collections, ``zlib``, ``lzma`` or ``bz2``.
+        :param options: Durability options, see ``FileIO.__init__``.
+        """
+
+        super().__init__(**options)
+
+        self._db_name, self._dir_path = pre_process("fxdb.d", db_name, data_dir)
+        self._manifest_path = os.path.join(self._dir_path, "manifest.json")
+        self.codec = get_codec(codec, compression)
+        self.compression = compression
+
+        # Manifest as last read or written, see ``_read_manifest``.
+        self._manifest: dict = {"format": _FORMAT, "next": 0, "collections": {}}
+
+        # File -> Collection read from or written to it, Collections of unchanged files are not read again.
+        self._loaded: Dict[str, list] = {}
+
+        os.makedirs(self._dir_path, exist_ok=True)
+
+        if not os.path.exists(self._manifest_path):
+            self._migrate_single_file(db_name, data_dir)
+
+    def read(self) -> dict:
+        """
+        Reads the manifest & the files of Collections.
+
+        Only files written since the last read are read, Collections of other files are kept.
+
+        :return: Database as a python Dictionary.
+        """
+
+        _manifest = self._read_manifest()
+        _loaded: Dict[str, list] = {}
+
+        database = {}
+
+        for name, file in _manifest["collections"].items():
+            if file not in self._loaded:
+                self._loaded[file] = self._read_collection(file)
+
+            database[name] = _loaded[file] = self._loaded[file]
+
+        self._manifest = _manifest
+        self._loaded = _loaded
+
+        return database
+
+    def write(self, data: dict) -> None:
+        """
+        Write every Collection of Database into a new file.
+
+        :param data: Dictionary object to write on Database.
+        :return: None.
+        """
+
+        _manifest = dict(self._read_manifest(), collections={})
+
+        self._commit(data, _manifest, set(data))
+
+    def collection_names(self) -> List[str]:
+        """
+        Names of Collections, read from the manifest only, unless the Database is in memory already.
+
+        :return: List of Collection name.
+        """
+
+        with self.lock:
+            if self._cache is not None and (self._pending or self._stat() == self._signature):
+                return list(self.load())
+
+            with self.file_lock.shared():
+                return list(self._read_manifest()["collections"])
+
+    def migrate(self, source: FileIO) -> None:
+        """
+        Copy the Database & metadata of another FileIO, e.g. of a single Database-file, into this one.
+
+        :param source: FileIO to copy.
+        :return: None.
+        """
+
+        with self.lock, self.file_lock.exclusive():
+            with source.file_lock.shared():
+                _database = dict(source.read())
+                _meta = source.read_meta()
+
+            self.write(_database)
+
+            if _meta:
+                self.write_meta(_meta)
+
+            # Read the migrated Database on next ``load``.
+            self._cache = None
+
+        source.close()
+
+    def _persist(self, data: dict, changes: List[dict]) -> None:
+        """
+        Write the files of Collections touched by ``changes`` & the manifest.
+
+        :param data: The current state of the database.
+        :param changes: Change records, see ``apply_changes``.
+        :return: None.
+        """
+
+        _collections = dict(self._manifest["collections"])
+
+        # Collections with changed Documents.
+        _dirty = set()
+
+        for change in changes:
+            _col_name = change["collection"]
+
+            if change["op"] == "rename":
+                _new_name = change["name"]
+
+                # The file keeps its name & content, only the manifest is changed.
+                if _col_name in _collections and _new_name not in _collections:
+                    _collections[_new_name] = _collections.pop(_col_name)
+
+                if _col_name in _dirty:
+                    _dirty.discard(_col_name)
+                    _dirty.add(_new_name)
+
+            elif change["op"] == "drop":
+                _collections.pop(_col_name, None)
+                _dirty.discard(_col_name)
+
+            else:
+                _dirty.add(_col_name)
+
+        self._commit(data, dict(self._manifest, collections=_collections), _dirty)
+
+    def _commit(self, data: dict, manifest: dict, dirty: set) -> None:
+        """
+        Write the ``dirty`` Collections into new files, then the manifest, then remove unused files.
+
+        :param data: The current state of the database.
+        :param manifest: Manifest of the new state, without the new files yet.
+        :param dirty: Names of Collections to write.
+        :return: None.
+        """
+
+        _next = manifest["next"]
+
+        for name in sorted(dirty):
+            if name not in data:
+                manifest["collections"].pop(name, None)
+                continue
+
+            _file = f"{_UNSAFE.sub('_', name)[:40]}-{_next}.fxdb"
+            _next += 1
+
+            atomic_write(os.path.join(self._dir_path, _file), dumps({name: data[name]}, self.codec))
+
+            manifest["collections"][name] = _file
+            self._loaded[_file] = data[name]
+
+        manifest["next"] = _next
+
+        atomic_write(self._manifest_path, json.dumps(manifest, indent=4).encode())
+
+        self._manifest = manifest
+
+        # Remove the files nobody points at, including files of a write which crashed before its manifest.
+        _files = set(manifest["collections"].values())
+        self._loaded = {file: self._loaded[file] for file in _files if file in self._loaded}
+
+        for file in os.listdir(self._dir_path):
+            if file.endswith(".fxdb") and file not in _files:
+                os.remove(os.path.join(self._dir_path, file))
+
+    def _read_manifest(self) -> dict:
+        """
+        Read the manifest of Database.
+
+        :return: Manifest, empty if there is no manifest yet.
+        """
+
+        if not os.path.exists(self._manifest_path):
+            return {"format": _FORMAT, "next": 0, "collections": {}}
+
+        with open(self._manifest_path, "r") as file:
+            _manifest = json.load(file)
+
+        if _manifest.get("format") != _FORMAT:
+            raise IOError(f"Cannot read file.\n\t`{self._manifest_path}` is not a manifest of a split database")
+
+        return _manifest
+
+    def _read_collection(self, file: str) -> list:
+        """
+        Read the file of a Collection.
+
+        The file holds ``{name: Collection}`` with the name it was written under, which is
+        not the current name after a ``rename``.
+
+        :param file: Name of file, in the Database-directory.
+        :return: Collection
+        """
+
+        with open(os.path.join(self._dir_path, file), "rb") as f:
+            _collection, = loads(f.read(), pickle.loads).values()
+
+        return _collection
+
+    def _migrate_single_file(self, db_name: str, data_dir=None) -> None:
+        """
+        Migrate the single Database-file of ``binary``, ``log`` or ``json`` mode, if there is one.
+
+        :param db_name: Name of Database
+        :param data_dir: Where the data is stored
+        :return: None.
+        """
+
+        _, _binary_path = pre_process("fxdb", db_name, data_dir)
+        _, _log_path = pre_process("fxdb.wal", db_name, data_dir)
+        _, _json_path = pre_process("json", db_name, data_dir)
+
+        if os.path.exists(_log_path) and os.path.getsize(_log_path):
+            self.migrate(LogFileIO(db_name, data_dir))
+
+        elif os.path.exists(_binary_path) and os.path.getsize(_binary_path):
+            self.migrate(BinaryFileIO(db_name, data_dir))
+
+        elif os.path.exists(_json_path) and os.path.getsize(_json_path):
+            self.migrate(JsonFileIO(db_name, data_dir))
+
+    def get_export_path(self) -> str:
+        return self._manifest_path
@@ -0,0 +1,255 @@
+from __future__ import annotations
+
+import copy
+from typing import Any, List, Mapping, MutableMapping, Set, Tuple
+
+from .query import MISSING, compile_query, get_path, _compile_expression, _is_expression
+
+__all__ = ("Update", "compile_update", "is_operator_update", "apply_delta", "UPDATE_OPERATORS")
+
+
+# Operators of ``Collection.update``.
+UPDATE_OPERATORS = ("$set", "$unset", "$inc", "$push", "$pull")
+
+
+def is_operator_update(update: Mapping) -> bool:
+    """
+    Check an update uses operators (e.g. ``{"$inc": {"visits": 1}}``) or replaces key values.
+
+    :param update: Update of ``Collection.update``.
+    :return: True for an operator update.
+    """
+
+    _operators = [key.startswith("$") for key in update.keys()]
+
+    if any(_operators) and not all(_operators):
+        raise ValueError(f"Cannot mix operators and fields in `{update}`")
+
+    return bool(_operators) and all(_operators)
+
+
+def _parent(document: Any, path: str, create: bool) -> Tuple[Any, str]:
+    """
+    The object holding the last field of ``path``, nested fields are separated by dots.
+
+    :param document: Document to look into.
+    :param path: Name of field.
+    :param create: Create missing objects on the way, else return None for them.
+    :return: (Object or None, name of last field)
+    """
+
+    *_path, _last = path.split(".")
+
+    _value: Any = document
+
+    for key in _path:
+        if not isinstance(_value, MutableMapping):
+            raise TypeError(f"Cannot update `{path}`, `{key}` is not inside an object")
+
+        if key not in _value:
+            if not create:
+                return None, _last
+
+            _value[key] = {}
+
+        _value = _value[key]
+
+    if not isinstance(_value, MutableMapping):
+        raise TypeError(f"Cannot update `{path}`, its parent is not an object")
+
+    return _value, _last
+
+
+def _check_path(document: Mapping, path: str) -> None:
+    """
+    Make sure the objects on the way to ``path`` are objects or missing, before anything is changed.
+    """
+
+    _value = document
+
+    for key in path.split(".")[:-1]:
+        _value = _value.get(key, MISSING)
+
+        if _value is MISSING:
+            return
+
+        if not isinstance(_value, Mapping):
+            raise TypeError(f"Cannot update `{path}`, `{key}` is not an object")
+
+
+def apply_delta(document: Mapping, delta: List[tuple]) -> None:
+    """
+    Apply the changes computed by ``Update.delta`` to a Document, in place.
+
+    Applying a delta again changes nothing, so Logs may replay it more than once.
+
+    :param document: Document to change.
+    :param delta: ``("set", path, value)``, ``("unset", path)`` or ``("push", path, length, values)`` changes.
+    :return: None
+    """
+
+    for change in delta:
+        _op, _path = change[0], change[1]
+
+        if _op == "set":
+            _parent_doc, _key = _parent(document, _path, True)
+            _parent_doc[_key] = copy.deepcopy(change[2])
+
+        elif _op == "unset":
+            _parent_doc, _key = _parent(document, _path, False)
+
+            if _parent_doc is not None:
+                _parent_doc.pop(_key, None)
+
+        elif _op == "push":
+            _length, _values = change[2], change[3]
+            _parent_doc, _key = _parent(document, _path, True)
+            _list = _parent_doc.get(_key, MISSING)
+
+            # Only a list of the length before the push is pushed to.
+            if _list is MISSING and not _length:
+                _parent_doc[_key] = copy.deepcopy(_values)
+
+            elif isinstance(_list, list) and len(_list) == _length:
+                _list.extend(copy.deepcopy(_values))
+
+        else:
+            raise ValueError(f"`{_op}` is not a valid delta")
+
+
+class Update:
+    """
+    An update of ``Collection.update`` with operators, compiled once for all matching Documents.
+
+    Supported operators:
+
+    - ``$set``: ``{"$set": {"address.PO": "Bongaon"}}`` sets fields.
+    - ``$unset``: ``{"$unset": {"mobile": ""}}`` removes fields.
+    - ``$inc``: ``{"$inc": {"visits": 1}}`` adds to numbers, missing fields start at 0.
+    - ``$push``: ``{"$push": {"skills": "Go"}}`` appends to lists, ``{"$each": [...]}`` appends many.
+    - ``$pull``: ``{"$pull": {"skills": "Go"}}`` removes the values of lists equal to a value or matching
+      an operator expression (``{"$gte": 5}``) or a query (``{"name": "Sam"}``).
+    """
+
+    def __init__(self, update: Mapping) -> None:
+        self.update = update
+
+        # (operator, path, operand) of every field, in order.
+        self._changes: List[Tuple[str, str, Any]] = []
+
+        _paths: Set[str] = set()
+
+        for operator, fields in update.items():
+            if operator not in UPDATE_OPERATORS:
+                raise ValueError(f"`{operator}` is not a valid update operator, use one of {list(UPDATE_OPERATORS)}")
+
+            if not isinstance(fields, Mapping):
+                raise ValueError(f"`{operator}` needs a Dictionary of fields")
+
+            for path, operand in fields.items():
+                if path.split(".")[0] == "_id_":
+                    raise KeyError("You are not allowed to modify key `_id_`")
+
+                # A field & the fields inside it can't change at once either.
+                if any(path == other or path.startswith(f"{other}.") or other.startswith(f"{path}.")
+                       for other in _paths):
+                    raise ValueError(f"`{path}` is updated by more than one operator")
+
+                _paths.add(path)
+                self._changes.append((operator, path, self._compile_operand(operator, operand)))
+
+    @staticmethod
+    def _compile_operand(operator: str, operand: Any) -> Any:
+        if operator == "$inc":
+            if isinstance(operand, bool) or not isinstance(operand, (int, float)):
+                raise TypeError(f"`$inc` needs a number, `{operand!r}` is given")
+
+            return operand
+
+        if operator == "$push":
+            if isinstance(operand, Mapping) and "$each" in operand:
+                return list(operand["$each"])
+
+            return [operand]
+
+        if operator == "$pull":
+            if _is_expression(operand):
+                return _compile_expression(operand)
+
+            if isinstance(operand, Mapping):
+                _match = compile_query(operand).match
+                return lambda value: isinstance(value, Mapping) and _match(value)
+
+            return _compile_expression(operand)
+
+        return operand
+
+    def delta(self, document: Mapping) -> List[tuple]:
+        """
+        Compute the changes of Document, without changing it, see ``apply_delta``.
+
+        Invalid updates (e.g. ``$inc`` of a string) raise here, so nothing is changed by a failed update.
+
+        :param document: Document to update.
+        :return: Delta of Document.
+        """
+
+        _delta: List[tuple] = []
+
+        for operator, path, operand in self._changes:
+            _check_path(document, path)
+
+            _value = get_path(document, path)
+
+            if operator == "$set":
+                _delta.append(("set", path, operand))
+
+            elif operator == "$unset":
+                if _value is not MISSING:
+                    _delta.append(("unset", path))
+
+            elif operator == "$inc":
+                if _value is MISSING:
+                    _value = 0
+
+                elif isinstance(_value, bool) or not isinstance(_value, (int, float)):
+                    raise TypeError(f"Cannot `$inc` `{path}`, `{_value!r}` is not a number")
+
+                _delta.append(("set", path, _value + operand))
+
+            elif operator == "$push":
+                if _value is not MISSING and not isinstance(_value, list):
+                    raise TypeError(f"Cannot `$push` to `{path}`, `{_value!r}` is not a list")
+
+                _delta.append(("push", path, len(_value) if isinstance(_value, list) else 0, operand))
+
+            elif operator == "$pull":
+                if _value is MISSING:
+                    continue
+
+                if not isinstance(_value, list):
+                    raise TypeError(f"Cannot `$pull` from `{path}`, `{_value!r}` is not a list")
+
+                _kept = [item for item in _value if not operand(item)]
+
+                if len(_kept) != len(_value):
+                    _delta.append(("set", path, _kept))
+
+        return _delta
+
+
+def compile_update(update: Mapping | Update) -> Update:
+    """
+    Compile an update with operators once, to apply it to any number of Documents.
+
+    :param update: Update, e.g. ``{"$inc": {"visits": 1}, "$push": {"log": "visit"}}``.
+    :return: Compiled Update.
+    """
+
+    if isinstance(update, Update):
+        return update
+
+    if not isinstance(update, Mapping):
+        raise ValueError('Document is not a Dictionary')
+
+    return Update(update)
@@ -0,0 +1,57 @@
+import asyncio
+
+from filexdb import FileXdb, AsyncFileXdb
+
+
+def test_async_collection():
+    async def main():
+        async with AsyncFileXdb("AsyncDb", "test_data/db") as db:
+            student_info = db.collection("student_info")
+            await student_info.drop()
+
+            _id = await student_info.insert({"name": "Sam", "cgpa": 9.1})
+            await student_info.insert_all([{"name": "Bob", "cgpa": 7.5}, {"name": "Rana", "cgpa": 8.2}])
+
+            assert (await student_info.get(_id))["name"] == "Sam"
+            assert [doc["name"] async for doc in student_info.find({"cgpa": {"$gt": 8}})] == ["Sam", "Rana"]
+            assert (await student_info.find().sort("cgpa").first())["name"] == "Bob"
+            assert len(await student_info.find(limit=(1, 3))) == 2
+
+            assert await student_info.update({"cgpa": 8.0}, {"name": "Bob"})
+            assert await student_info.delete_by_id(_id) == [_id]
+            assert await student_info.find({"cgpa": {"$gte": 8}}).count() == 2
+
+    asyncio.run(main())
+
+    # Every change has been written.
+    _stored = FileXdb("AsyncDb", "test_data/db").collection("student_info").find()
+    assert sorted(doc["name"] for doc in _stored) == ["Bob", "Rana"]
+
+
+def test_async_coalesced_flush():
+    async def main():
+        db = AsyncFileXdb("AsyncDb", "test_data/db")
+        player_info = db.collection("player_info")
+        await player_info.drop()
+
+        # Count the writes of Database-file.
+        _file_handler = db._open()._file_handler
+        _persist = _file_handler._persist
+        _writes = []
+
+        def persist(data, changes):
+            _writes.append(len(changes))
+            _persist(data, changes)
+
+        _file_handler._persist = persist
+
+        await asyncio.gather(*(player_info.insert({"n": i}) for i in range(50)))
+        await db.close()
+
+        return _writes
+
+    _writes = asyncio.run(main())
+
+    assert sum(_writes) == 50
+    assert len(_writes) < 50
+    assert len(FileXdb("AsyncDb", "test_data/db").collection("player_info").find()) == 50
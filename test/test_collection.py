@@ -1,4 +1,17 @@
+import csv
+import gzip
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+import pytest
+
 from filexdb import FileXdb
+from filexdb.cursor import Cursor
+from filexdb.fileio import BinaryFileIO, Export
+from filexdb.ids import UlidIds, ObjectIds
+from filexdb.index import SortedIndex
 
 
 # Create an instance of Database
@@ -29,6 +42,27 @@ def test_insert_all():
     ])
 
 
+def test_insert_many():
+    student_3 = db.collection("student_3")
+    student_3.drop()
+
+    _doc_id = student_3.insert_many(({"name": f"Sam {i}", "roll": i} for i in range(25)), batch_size=10)
+
+    assert _doc_id.count_item() == 25
+    assert db.collection("student_3").find().count_item() == 25
+
+
+def test_insert_all_invalid():
+    student_4 = db.collection("student_4")
+    student_4.drop()
+
+    # Nothing is inserted if any Document is invalid.
+    with pytest.raises(KeyError):
+        student_4.insert_all([{"name": "Sam"}, {"_id_": "1", "name": "Bob"}])
+
+    assert not db.collection("student_4").find()
+
+
 def test_find():
     _query_1 = {"name": "Sam"}
 
@@ -64,6 +98,110 @@ def test_export():
     student_info.find(limit=(1, 10)).export("test-db-Sam-4", "test_data/export")
 
 
+def test_export_stream():
+    _query = {"dept": "CSE"}
+
+    student_info.export("test-db-CSE", "test_data/export", "ndjson", query=_query)
+
+    with open("test_data/export/test-db-CSE.ndjson") as file:
+        assert [json.loads(line) for line in file] == student_info.find(_query)
+
+    # Nested fields are flattened into columns.
+    _coll = FileXdb("ExportDb", "test_data/db").collection("export")
+    _coll.drop()
+    _coll.insert_all([{"name": "Rocky", "address": {"PO": "Bongaon"}, "skills": ["Game Dev"]}, {"name": "Sam"}])
+
+    _coll.export("test-db-export", "test_data/export", "csv", _compression="zlib")
+
+    with gzip.open("test_data/export/test-db-export.csv.gz", "rt", newline="") as file:
+        _rows = list(csv.DictReader(file))
+
+    assert (_rows[0]["address.PO"], _rows[0]["skills"], _rows[1]["address.PO"]) == ("Bongaon", '["Game Dev"]', "")
+
+    # Errors are raised & the previous file is kept.
+    with pytest.raises(ValueError):
+        _coll.export("test-db-export", "test_data/export", "csv", _compression="zlib", _fields=["name"])
+
+    assert os.path.exists("test_data/export/test-db-export.csv.gz")
+
+    with pytest.raises(TypeError):
+        _coll.export("test-db-export", "test_data/export", "xml")
+
+    # Documents of any iterable are written in chunks.
+    Export(({"n": i} for i in range(2500)), "test-db-chunks", "test_data/export", _chunk_size=1000)
+
+    with open("test_data/export/test-db-chunks.json") as file:
+        assert json.load(file) == [{"n": i} for i in range(2500)]
+
+
+def test_load():
+    _source = FileXdb("LoadDb", "test_data/db").collection("source")
+    _source.drop()
+    _source.insert_all([
+        {"name": "Rocky", "roll": "123", "cgpa": 9.5, "passed": True, "address": {"PO": "Bongaon"}, "skills": ["Go"]},
+        {"name": "Sam", "mobile": None, "note": ""},
+    ])
+
+    _target = FileXdb("LoadDb", "test_data/db").collection("target")
+    _target.create_index("name")
+
+    # Every export mode is loaded back with ``_id_`` & types of values.
+    for _mode, _compression, _file in [("json", None, "load.json"), ("ndjson", "zlib", "load.ndjson.gz"),
+                                       ("csv", None, "load.csv")]:
+        _source.export("load", "test_data/export", _mode, _compression=_compression)
+        _target.drop()
+
+        _progress = []
+
+        assert _target.load(f"test_data/export/{_file}", batch_size=1, progress=_progress.append) == 2
+        assert sorted(_target.find(), key=str) == sorted(_source.find(), key=str)
+        assert [_stats["documents"] for _stats in _progress] == [1, 2]
+        assert len(_target.find({"name": "Sam"})) == 1
+
+    # An export of Database restores every Collection.
+    FileXdb("LoadDb", "test_data/db").export("load-db", "test_data/export")
+
+    _restored = FileXdb("RestoredDb", "test_data/db")
+
+    for _col_name in ["source", "target"]:
+        _restored.collection(_col_name).drop()
+
+    assert _restored.import_("test_data/export/load-db.json") == {"source": 2, "target": 2}
+
+    # Ids must be new.
+    with pytest.raises(ValueError):
+        _restored.import_("test_data/export/load.csv", "source")
+
+    _target.drop()
+
+    with pytest.raises(ValueError):
+        _target.load("test_data/export/load.csv", parallel=True, workers=0)
+
+
+def test_load_sorted_index():
+    _path = "test_data/export/load-sorted.ndjson"
+    os.makedirs("test_data/export", exist_ok=True)
+
+    # Every score twice, ties are ordered by ``_id_``.
+    _rows = [{"_id_": f"id-{i:04}", "score": (i * 7) % 1000} for i in range(2000)]
+
+    with open(_path, "w") as file:
+        file.writelines(json.dumps(row) + "\n" for row in _rows)
+
+    _coll = FileXdb("LoadSortedDb", "test_data/db").collection("sorted")
+    _coll.drop()
+    _coll.create_index("score", kind="sorted")
+
+    # The sorted Index is built once at the end, with a single sort.
+    assert _coll.load(_path, batch_size=300) == 2000
+
+    _expected = [row["_id_"] for row in sorted(_rows, key=lambda row: (row["score"], row["_id_"]))]
+
+    assert _coll._indexes["score"].scan() == _expected
+    assert [doc["score"] for doc in _coll.find({"score": {"$gte": 998}})] == [998, 998, 999, 999]
+    assert _coll.count({"score": {"$lt": 100}}) == 200
+
+
 def test_delete():
     assert student_info.delete({"name": "Addy"})
     assert student_info.delete({"name": "Sam", "roll": "CSE/17/19"})
@@ -84,3 +222,453 @@ def test_drop():
     student_info.drop()
 
 
+def test_by_id():
+    student_5 = db.collection("student_5")
+    student_5.drop()
+
+    _doc_id = student_5.insert_all([{"name": "Sam", "roll": 1}, {"name": "Bob", "roll": 2}, {"name": "Rana"}])
+
+    assert student_5.get(_doc_id[1])["name"] == "Bob"
+    assert student_5.get("not-an-id") is None
+
+    assert student_5.update_by_id(_doc_id[1], {"roll": 20}) == [_doc_id[1]]
+    assert student_5.get(_doc_id[1])["roll"] == 20
+
+    assert student_5.delete_by_id(_doc_id[0]) == [_doc_id[0]]
+    assert student_5.delete_by_id(_doc_id[0]) == []
+    assert student_5.get(_doc_id[0]) is None
+
+    # Changes are persisted
+    _student_5 = db.collection("student_5")
+
+    assert [doc["_id_"] for doc in _student_5.find()] == _doc_id[1:]
+    assert _student_5.get(_doc_id[1])["roll"] == 20
+
+
+def test_update_delete_one():
+    student_9 = db.collection("student_9")
+    student_9.drop()
+
+    _doc_id = student_9.insert_all([{"name": "Sam", "dept": "CSE"} for _ in range(3)])
+
+    assert student_9.update_one({"passed": True}, {"dept": "CSE"}) == _doc_id[:1]
+    assert student_9.find({"passed": True}) == [student_9.get(_doc_id[0])]
+
+    assert student_9.delete_one({"dept": "CSE"}) == _doc_id[:1]
+    assert student_9.delete_one({"dept": "ME"}) == []
+    assert student_9.update_one({"passed": True}, {"dept": "ME"}) == []
+
+    # All matching Documents are written at once.
+    _changes = []
+    _apply = db._file_handler.apply
+    db._file_handler.apply = lambda data, changes: _changes.append(changes) or _apply(data, changes)
+
+    try:
+        assert student_9.update({"dept": "EE"}, {"dept": "CSE"}) == _doc_id[1:]
+        assert student_9.delete({"dept": "EE"}) == _doc_id[1:]
+    finally:
+        del db._file_handler.apply
+
+    assert [[change["op"] for change in changes] for changes in _changes] == [["update"], ["delete"]]
+    assert db.collection("student_9").find() == []
+
+
+def test_update_operators():
+    student_10 = db.collection("student_10")
+    student_10.drop()
+
+    _doc_id = student_10.insert_all([
+        {"name": "Sam", "visits": 1, "skills": ["C", "Go"], "address": {"PO": "Bongaon"}},
+        {"name": "Bob", "results": [{"score": 5}, {"score": 8}]},
+    ])
+
+    student_10.update({"$inc": {"visits": 2}, "$push": {"skills": {"$each": ["Rust", "C"]}},
+                       "$set": {"address.PIN": 743235}, "$unset": {"name": ""}}, {"_id_": _doc_id[0]})
+    student_10.update({"$pull": {"results": {"score": {"$gte": 8}}}, "$inc": {"visits": 1}}, {"name": "Bob"})
+    student_10.update_one({"$pull": {"skills": "C"}}, {"visits": 3})
+
+    _expected = [
+        {"_id_": _doc_id[0], "visits": 3, "skills": ["Go", "Rust"], "address": {"PO": "Bongaon", "PIN": 743235}},
+        {"_id_": _doc_id[1], "name": "Bob", "results": [{"score": 5}], "visits": 1},
+    ]
+
+    assert student_10.find() == _expected
+    assert db.collection("student_10").find() == _expected
+
+    # An invalid update changes no Document.
+    with pytest.raises(TypeError):
+        student_10.update({"$inc": {"visits": 1, "name": 1}})
+
+    assert student_10.find() == _expected
+
+    with pytest.raises(ValueError):
+        student_10.update({"$set": {"a": 1}, "b": 2})
+
+    with pytest.raises(KeyError):
+        student_10.update({"$set": {"_id_": 1}})
+
+
+def test_index():
+    student_6 = db.collection("student_6")
+    student_6.drop()
+
+    student_6.insert_all([
+        {"name": "Sam", "dept": "CSE", "cgpa": 9.1},
+        {"name": "Bob", "dept": "EE", "cgpa": 7.5},
+        {"name": "Rana", "dept": "CSE", "cgpa": 8.2},
+        {"name": "Sam", "dept": "ME"},
+    ])
+
+    assert student_6.create_index("dept") == 1
+    assert student_6.create_index("dept") == 0
+    assert student_6.create_index("cgpa", kind="sorted") == 1
+
+    with pytest.raises(ValueError):
+        student_6.create_index("dept", kind="sorted")
+
+    assert student_6.list_indexes() == [{"field": "dept", "kind": "hash"}, {"field": "cgpa", "kind": "sorted"}]
+
+    assert [doc["name"] for doc in student_6.find({"dept": "CSE"})] == ["Sam", "Rana"]
+    assert [doc["name"] for doc in student_6.find({"dept": "CSE", "name": "Rana"})] == ["Rana"]
+    assert [doc["name"] for doc in student_6.find({"cgpa": 7.5})] == ["Bob"]
+
+    # Indexes follow the changes of Collection.
+    student_6.insert({"name": "Addy", "dept": "CSE"})
+    student_6.update({"dept": "ECE"}, {"name": "Sam"})
+    student_6.delete({"name": "Rana"})
+
+    assert [doc["name"] for doc in student_6.find({"dept": "CSE"})] == ["Addy"]
+    assert [doc["name"] for doc in student_6.find({"dept": "ECE"})] == ["Sam", "Sam"]
+    assert student_6._indexes["cgpa"].range(8, None) == [student_6.find({"name": "Sam", "dept": "ECE"})[0]["_id_"]]
+
+    # Building a sorted Index at once orders it like adding the Documents one by one.
+    _added = SortedIndex("dept")
+
+    for doc in student_6.find():
+        _added.add(doc)
+
+    _built = SortedIndex("dept")
+    _built.build(student_6.find())
+
+    assert _built.scan() == _added.scan()
+
+    # Indexes are stored with the Database.
+    assert db.collection("student_6").list_indexes() == student_6.list_indexes()
+
+    assert student_6.drop_index("dept") == 1
+    assert student_6.drop_index("dept") == 0
+    assert [doc["name"] for doc in db.collection("student_6").find({"dept": "ECE"})] == ["Sam", "Sam"]
+
+
+def test_find_operators():
+    student_7 = db.collection("student_7")
+    student_7.drop()
+
+    student_7.insert_all([
+        {"name": "Sam", "cgpa": 9.1, "address": {"PO": "Bongaon"}},
+        {"name": "Bob", "cgpa": 7.5, "address": {"PO": "Habra"}},
+        {"name": "Rana", "cgpa": 8.2},
+        {"name": "Addy", "cgpa": "N/A"},
+    ])
+
+    assert [doc["name"] for doc in student_7.find({"cgpa": {"$gte": 8}})] == ["Sam", "Rana"]
+    assert [doc["name"] for doc in student_7.find({"address.PO": {"$in": ["Habra", "Barasat"]}})] == ["Bob"]
+    assert [doc["name"] for doc in student_7.find({"address": {"$exists": False}})] == ["Rana", "Addy"]
+
+    # Same results with Indexes.
+    student_7.create_index("cgpa", kind="sorted")
+    student_7.create_index("address.PO")
+
+    assert [doc["name"] for doc in student_7.find({"cgpa": {"$gte": 8}})] == ["Rana", "Sam"]
+    assert [doc["name"] for doc in student_7.find({"cgpa": {"$gt": 7.5, "$lt": 9.1}})] == ["Rana"]
+    assert [doc["name"] for doc in student_7.find({"cgpa": {"$gt": 7, "$gte": 8, "$lte": 10, "$lt": 9.1}})] == ["Rana"]
+    assert [doc["name"] for doc in student_7.find({"address.PO": {"$in": ["Habra", "Barasat"]}})] == ["Bob"]
+
+    _bob_id = student_7.find({"name": "Bob"})[0]["_id_"]
+
+    assert student_7.delete({"cgpa": {"$lt": 8}}) == [_bob_id]
+    assert student_7.update({"passed": True}, {"cgpa": {"$gte": 9}}).count_item() == 1
+
+
+def test_find_lazy():
+    student_8 = db.collection("student_8")
+    student_8.drop()
+
+    student_8.insert_all([
+        {"name": "Sam", "cgpa": 9.1, "address": {"PO": "Bongaon", "PS": "Kolkata"}},
+        {"name": "Bob", "cgpa": 7.5},
+        {"name": "Rana", "cgpa": 8.2},
+        {"name": "Addy"},
+    ])
+
+    _cursor = student_8.find(lazy=True)
+
+    assert [doc["name"] for doc in _cursor.skip(1).limit(2)] == ["Bob", "Rana"]
+    assert [doc["name"] for doc in student_8.find(limit=(1, 3), lazy=True)] == ["Bob", "Rana"]
+    assert [doc["name"] for doc in student_8.find(lazy=True).sort("cgpa", -1)] == ["Sam", "Rana", "Bob", "Addy"]
+    assert [doc["name"] for doc in student_8.find(lazy=True).sort([("cgpa", 1)]).limit(2)] == ["Addy", "Bob"]
+
+    assert student_8.find({"name": "Sam"}, lazy=True).project(["address.PO"]).first() == {
+        "_id_": student_8.find({"name": "Sam"})[0]["_id_"], "address": {"PO": "Bongaon"}
+    }
+    assert student_8.find({"name": "Bob"}, lazy=True).project({"_id_": 0, "name": 0}).first() == {"cgpa": 7.5}
+
+    assert [batch.count_item() for batch in student_8.find(lazy=True).batch(3)] == [3, 1]
+    assert student_8.find({"cgpa": {"$gt": 8}}, lazy=True).count() == 2
+    assert student_8.find({"cgpa": {"$gt": 8}}, lazy=True).to_array() == student_8.find({"cgpa": {"$gt": 8}})
+
+    # Iteration stops at the first match.
+    _scanned = []
+
+    def source():
+        for doc in student_8.find():
+            _scanned.append(doc)
+            yield doc
+
+    assert Cursor(source, {"cgpa": {"$exists": True}}).first()["name"] == "Sam"
+    assert len(_scanned) == 1
+
+
+def test_threads():
+    student_9 = db.collection("student_9")
+    student_9.drop()
+    student_9.create_index("group")
+
+    student_9.insert_all([{"group": i % 4, "n": i} for i in range(200)])
+
+    def write(worker: int) -> None:
+        for i in range(50):
+            _id = student_9.insert({"group": worker, "n": 1000 + i})
+            student_9.update_by_id(_id, {"n": -1})
+            student_9.delete_by_id(_id)
+
+    def read(worker: int) -> None:
+        for _ in range(50):
+            # Every Document of the group is whole, never in the middle of a change.
+            assert all(doc["group"] == worker for doc in student_9.find({"group": worker}))
+            assert sum(1 for doc in student_9.find(lazy=True) if doc["n"] < 200) == 200
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        _futures = [executor.submit(write, worker) for worker in range(4)]
+        _futures += [executor.submit(read, worker) for worker in range(4)]
+
+        for future in _futures:
+            future.result()
+
+    assert student_9.find().count_item() == 200
+    assert len(student_9.find({"group": 1})) == 50
+
+
+def test_find_parallel():
+    student_10 = db.collection("student_10")
+    student_10.drop()
+
+    student_10.insert_all([{"n": i, "name": f"student-{i}", "tags": ["odd" if i % 2 else "even"]} for i in range(300)])
+
+    _query = {"$or": [{"n": {"$lt": 20}}, {"name": {"$regex": "9$"}}], "tags": {"$in": [["odd"]]}}
+
+    # Same Documents in the same order, the Documents of Collection themselves.
+    _result = student_10.find(_query, parallel=True, workers=2)
+
+    assert _result == student_10.find(_query)
+    assert all(doc is student_10.get(doc["_id_"]) for doc in _result)
+
+    assert student_10.find(_query, limit=(2, 5), parallel=True, workers=2) == student_10.find(_query, limit=(2, 5))
+    assert student_10.find(_query, lazy=True, parallel=True, workers=2).sort("n", -1).first()["n"] == 299
+
+    with pytest.raises(ValueError):
+        student_10.find(_query, parallel=True, workers=0)
+
+    with ProcessPoolExecutor(2) as executor:
+        _db = FileXdb("test_DB", "test_data/db", executor=executor)
+        assert len(_db.collection("student_10").find({"n": {"$gte": 100}}, parallel=True)) == 200
+
+
+def test_columnar():
+    _db = FileXdb("ColumnarDb", "test_data/db")
+    _coll = _db.collection("columnar", layout="rows")
+    _coll.drop()
+
+    _coll = _db.collection("columnar", layout="columnar")
+    _ids = _coll.insert_all([{"name": f"S{i}", "cgpa": i / 10, "roll": i, "ok": i % 2 == 0} for i in range(100)])
+    _coll.insert({"name": "Sam", "dept": "CSE"})
+
+    # Numbers of a single type are stored in arrays, ``bool`` is kept as it is.
+    _columns = _coll._collection._columns
+    assert (_columns["cgpa"].typecode, _columns["roll"].typecode) == ("d", "q")
+    assert _coll.get(_ids[2])["ok"] is True
+
+    assert [doc["roll"] for doc in _coll.find({"roll": {"$gte": 97}})] == [97, 98, 99]
+    assert _coll.find({"dept": "CSE"})[0]["name"] == "Sam"
+    assert len(_coll.find({"dept": {"$exists": False}})) == 100
+
+    _coll.update({"cgpa": "N/A"}, {"roll": 5})
+    _coll.delete({"roll": {"$lt": 5}})
+    _coll.create_index("name")
+
+    assert _coll.find({"name": "S5"})[0]["cgpa"] == "N/A"
+    assert _coll.find(limit=(0, 1))[0]["roll"] == 5
+
+    # A new instance reads the Documents into columns again.
+    _coll = FileXdb("ColumnarDb", "test_data/db").collection("columnar")
+
+    assert _coll.find({"roll": 99})[0]["cgpa"] == 9.9
+    assert len(_coll.find()) == 96
+
+    # Database-file holds plain Documents, like of ``rows`` layout.
+    _stored = BinaryFileIO("ColumnarDb", "test_data/db").read()["columnar"]
+    assert type(_stored) is list and type(_stored[0]) is dict
+
+    _coll.set_layout("rows")
+    assert _coll.find({"name": "S5"})[0] == {"_id_": _ids[5], "name": "S5", "cgpa": "N/A", "roll": 5, "ok": False}
+
+    with pytest.raises(ValueError):
+        FileXdb("PagedDb", "test_data/db", mode="paged").collection("paged_info", layout="columnar")
+
+
+def test_id_factory():
+    _db = FileXdb("IdDb", "test_data/db", id_factory="ulid")
+    _coll = _db.collection("ulid")
+    _coll.drop()
+
+    # Time-ordered ids sort like the Documents were inserted.
+    _ids = _coll.insert_all([{"n": i} for i in range(1000)])
+
+    assert len(_ids[0]) == 26
+    assert list(_ids) == sorted(_ids) and len(set(_ids)) == 1000
+
+    _coll.create_index("_id_", kind="sorted")
+    assert len(_coll.find({"_id_": {"$gte": UlidIds.lower_bound(time.time() - 60)}})) == 1000
+    assert abs(UlidIds.timestamp(_ids[0]) - time.time()) < 60
+
+    _coll = _db.collection("objectid", id_factory="objectid")
+    _coll.drop()
+    _ids = _coll.insert_all([{"n": i} for i in range(10)])
+
+    assert len(_ids[0]) == 24 and _ids[0] >= ObjectIds.lower_bound(time.time() - 60)
+
+    # Integers continue after the ids of Collection, also in a new instance.
+    _coll = _db.collection("int", id_factory="int")
+    _coll.drop()
+
+    assert list(_coll.insert_all([{"n": 1}, {"n": 2}])) == [1, 2]
+
+    _coll = FileXdb("IdDb", "test_data/db", id_factory="int").collection("int")
+
+    assert _coll.insert({"n": 3}) == 3
+    assert _coll.get(3)["n"] == 3
+
+    _coll = _db.collection("custom", id_factory=lambda: f"id-{time.time_ns()}")
+    _coll.drop()
+
+    assert _coll.insert({"n": 1}).startswith("id-")
+
+    with pytest.raises(ValueError):
+        _db.collection("custom", id_factory="unknown")
+
+
+def test_aggregate():
+    _db = FileXdb("AggregateDb", "test_data/db")
+    _sales = [{"dept": ["CSE", "EE", "ME"][i % 3], "amount": i, "price": i / 2} for i in range(30)]
+    _sales.append({"dept": "CSE", "note": "no amount"})
+
+    _pipeline = [
+        {"$match": {"amount": {"$gte": 3}}},
+        {"$group": {"_id_": "$dept", "total": {"$sum": "$amount"}, "avg": {"$avg": "$price"},
+                    "low": {"$min": "$amount"}, "high": {"$max": "$amount"}, "n": {"$count": {}}}},
+        {"$sort": {"total": -1}},
+        {"$limit": 2},
+        {"$project": ["total", "n", "low", "high", "avg"]},
+    ]
+
+    _results = []
+
+    for layout in ("rows", "columnar"):
+        _coll = _db.collection(layout, layout="rows")
+        _coll.drop()
+        _coll = _db.collection(layout, layout=layout)
+        _coll.insert_all(_sales)
+
+        _results.append(_coll.aggregate(_pipeline))
+
+        assert _coll.aggregate([{"$group": {"_id_": None, "total": {"$sum": "$amount"}}}]) == [
+            {"_id_": None, "total": 435}
+        ]
+        assert _coll.aggregate([{"$match": {"dept": "EE"}}, {"$count": "n"}]) == [{"n": 10}]
+
+        _coll.create_index("dept")
+        _coll.create_index("amount", kind="sorted")
+
+        assert _coll.count() == 31
+        assert _coll.count({"dept": "CSE"}) == 11
+        assert _coll.count({"amount": {"$lt": 10}}) == 10
+        assert _coll.count({"dept": "CSE", "amount": {"$lt": 10}}) == 4
+        assert _coll.count({"$or": [{"dept": "EE"}, {"note": {"$exists": True}}]}) == 11
+
+        # Counts by an Index match the results of ``find``.
+        for query in ({"amount": {"$gt": 7, "$gte": 1}}, {"amount": {"$lt": 3, "$lte": 7}},
+                      {"amount": {"$gt": 3, "$gte": 5, "$lte": 9}}, {"amount": {"$in": [1, 2, 40]}}):
+            assert _coll.count(query) == len(_coll.find(query))
+
+    # Columns are reduced to the same result as Documents.
+    assert _results[0] == _results[1] == [
+        {"_id_": "ME", "total": 153, "n": 9, "low": 5, "high": 29, "avg": 8.5},
+        {"_id_": "EE", "total": 144, "n": 9, "low": 4, "high": 28, "avg": 8.0},
+    ]
+
+    with pytest.raises(ValueError):
+        _coll.aggregate([{"$unwind": "$dept"}])
+
+    with pytest.raises(ValueError):
+        _coll.aggregate([{"$group": {"total": {"$sum": "$amount"}}}])
+
+
+def test_find_sort():
+    _coll = FileXdb("SortDb", "test_data/db").collection("scores")
+    _coll.drop()
+
+    _coll.insert_all([{"name": f"S{i}", "score": (i * 7) % 10, "dept": ["CSE", "EE"][i % 2]} for i in range(40)])
+    _coll.insert_all([{"name": "No score"}, {"name": "List", "score": [1]}])
+
+    # Lists come after numbers, equal scores are ordered by ``_id_``.
+    _expected = ["List"] + [doc["name"] for doc in sorted(_coll.find({"score": 9}), key=lambda doc: doc["_id_"])]
+
+    for indexed in (False, True):
+        if indexed:
+            _coll.create_index("score", kind="sorted")
+
+        # Top-k of a heap & the order of a sorted Index are the same.
+        _top = _coll.find(sort=[("score", -1)], limit=5)
+        assert [doc["name"] for doc in _top] == _expected
+
+        assert _coll.find({"dept": "EE"}, sort="score", limit=1)[0]["score"] == 1
+        assert _coll.find(sort=[("score", 1)])[0]["name"] == "No score"
+        assert _coll.find(sort=[("score", -1)])[0]["name"] == "List"
+
+        # Pages continue after the last Document of the previous page.
+        _pages, _last = [], None
+
+        while True:
+            _page = _coll.find({"score": {"$exists": True}}, sort=[("score", -1), ("name", 1)], limit=7, after=_last)
+
+            if not _page:
+                break
+
+            _pages += _page
+            _last = _page[-1]
+
+        assert len(_pages) == 41
+        assert [doc["score"] for doc in _pages[1:]] == sorted((doc["score"] for doc in _pages[1:]), reverse=True)
+
+        assert [doc["name"] for doc in _coll.find(sort="score", limit=(2, 4), lazy=True)] == ["S10", "S20"]
+
+    # Without ``sort``, pages are ordered by ``_id_``.
+    _ids = sorted(doc["_id_"] for doc in _coll.find())
+    assert [doc["_id_"] for doc in _coll.find(limit=3, after={"_id_": _ids[10]})] == _ids[11:14]
+    assert len(_coll.find(limit=3)) == 3
+
+    with pytest.raises(ValueError):
+        _coll.find(sort=[("score", 0)])
+
+    with pytest.raises(ValueError):
+        _coll.find(sort="score", after={"score": 1})
@@ -1,4 +1,10 @@
+import multiprocessing
+import time
+
+import pytest
+
 from filexdb import FileXdb
+from filexdb.lock import fcntl
 
 
 # Create an instance of Database
@@ -36,3 +42,103 @@ def test_export():
     db_2.export("test-db-2-exp", "test_data/export")
 
 
+def test_shared_database():
+    db_3 = FileXdb("SharedDb", "test_data/db")
+
+    shared = db_3.collection("shared")
+    shared.drop()
+
+    assert db_3.collection("shared") is shared
+
+    # Database-file is not read again while nobody else changes it.
+    _generation = db_3._file_handler.generation
+
+    shared.insert({"name": "Sam"})
+    db_3.collection("other").find()
+    db_3.show_collections()
+
+    assert db_3._file_handler.generation == _generation
+
+    # Changes of another instance are noticed.
+    FileXdb("SharedDb", "test_data/db").collection("shared").insert({"name": "Bob"})
+
+    assert [doc["name"] for doc in shared.find()] == ["Sam", "Bob"]
+    assert db_3._file_handler.generation == _generation + 1
+    assert "other" not in db_3.show_collections()
+
+
+def test_sync_modes():
+    with FileXdb("SyncDb", "test_data/db", sync="never") as db_4:
+        deferred = db_4.collection("deferred")
+        deferred.drop()
+        db_4.flush()
+
+        deferred.insert({"name": "Sam"})
+        deferred.insert_all([{"name": "Bob"}, {"name": "Rana"}])
+
+        # Nothing is written before flush.
+        assert FileXdb("SyncDb", "test_data/db").collection("deferred").find().count_item() == 0
+
+        db_4.flush()
+        assert FileXdb("SyncDb", "test_data/db").collection("deferred").find().count_item() == 3
+
+        deferred.delete({"name": "Bob"})
+
+    # Waiting changes are written on close.
+    assert FileXdb("SyncDb", "test_data/db").collection("deferred").find().count_item() == 2
+
+
+def test_sync_batch():
+    db_5 = FileXdb("SyncLogDb", "test_data/db", mode="log", sync="batch", sync_ops=2)
+    batched = db_5.collection("batched")
+    batched.drop()
+    db_5.flush()
+
+    batched.insert({"name": "Sam"})
+    assert FileXdb("SyncLogDb", "test_data/db", mode="log").collection("batched").find().count_item() == 0
+
+    batched.insert({"name": "Bob"})
+    assert FileXdb("SyncLogDb", "test_data/db", mode="log").collection("batched").find().count_item() == 2
+
+    db_5.close()
+
+
+def test_sync_interval():
+    db_6 = FileXdb("SyncDb", "test_data/db", sync="interval", sync_interval=50)
+    timed = db_6.collection("timed")
+    timed.drop()
+    db_6.flush()
+
+    timed.insert({"name": "Sam"})
+    time.sleep(0.3)
+
+    assert FileXdb("SyncDb", "test_data/db").collection("timed").find().count_item() == 1
+
+    db_6.close()
+
+
+def _insert_from_process(mode: str, worker: int) -> None:
+    _workers = FileXdb(f"Lock{mode}Db", "test_data/db", mode=mode).collection("workers")
+
+    for i in range(20):
+        _workers.insert({"worker": worker, "n": i})
+
+
+@pytest.mark.skipif(fcntl is None, reason="needs fcntl")
+@pytest.mark.parametrize("mode", ["binary", "log", "paged", "split"])
+def test_multi_process(mode):
+    FileXdb(f"Lock{mode}Db", "test_data/db", mode=mode).collection("workers").drop()
+
+    _processes = [multiprocessing.Process(target=_insert_from_process, args=(mode, worker)) for worker in range(4)]
+
+    for process in _processes:
+        process.start()
+
+    for process in _processes:
+        process.join()
+
+    # No process lost the changes of another one.
+    _workers = FileXdb(f"Lock{mode}Db", "test_data/db", mode=mode).collection("workers")
+
+    assert len(_workers.find()) == 80
+    assert all(len(_workers.find({"worker": worker})) == 20 for worker in range(4))
@@ -0,0 +1,403 @@
+import gzip
+import json
+import os
+import pickle
+import shutil
+
+import pytest
+
+from filexdb import FileXdb
+from filexdb.fileio import LogFileIO, BinaryFileIO, JsonFileIO, Export, apply_changes
+from filexdb.paged import PagedFileIO, PagedCollection
+from filexdb.split import SplitFileIO
+from filexdb.codec import CODECS, get_codec
+from filexdb.document import Document
+from filexdb.compression import COMPRESSIONS, compress, decompress, iter_blocks
+
+
+# Create an instance of Database, stored as a Log
+db = FileXdb("LogDb", "test_data/db", mode="log")
+
+# Create a Collection
+log_info = db.collection("log_info")
+
+
+def test_log_insert():
+    log_info.drop()
+
+    _id = log_info.insert({"name": "Sam", "dept": "CSE"})
+    log_info.insert_all([{"name": "Bob", "dept": "EE"}, {"name": "Rana", "dept": "CSE"}])
+
+    # Changes are replayed from the Log by a new instance.
+    _database = LogFileIO("LogDb", "test_data/db").read()
+
+    assert len(_database["log_info"]) == 3
+    assert _database["log_info"][0]["_id_"] == _id
+
+
+def test_log_update_delete():
+    log_info.update({"dept": "ECE"}, {"name": "Bob"})
+    log_info.delete({"name": "Rana"})
+
+    _database = LogFileIO("LogDb", "test_data/db").read()
+
+    assert [doc["dept"] for doc in _database["log_info"]] == ["CSE", "ECE"]
+
+
+def test_log_compact():
+    _file_handler = LogFileIO("LogDb", "test_data/db", compact_threshold=1)
+    _file_handler.apply({}, [{"op": "rename", "collection": "log_info", "name": "log_info_2"}])
+
+    # Log is folded into the Database-file.
+    with open(_file_handler._log_file_path, "rb") as file:
+        assert file.read() == b""
+
+    assert "log_info_2" in _file_handler.read()
+    assert "log_info" not in _file_handler.read()
+
+    _file_handler.apply({}, [{"op": "drop", "collection": "log_info_2"}])
+    assert "log_info_2" not in _file_handler.read()
+
+
+def test_log_torn_record():
+    _file_handler = LogFileIO("LogDb", "test_data/db")
+    _file_handler.apply({}, [{"op": "insert", "collection": "torn", "documents": [{"_id_": "1"}]}])
+
+    # Simulate a crash in the middle of appending a record.
+    with open(_file_handler._log_file_path, "ab") as file:
+        file.write(b"\x00\x00\x01")
+
+    assert _file_handler.read()["torn"] == [{"_id_": "1"}]
+
+    _file_handler.apply({}, [{"op": "drop", "collection": "torn"}])
+    assert "torn" not in _file_handler.read()
+
+
+def test_log_update_delta():
+    log_info.drop()
+    log_info.insert_all([{"name": "Sam", "bio": "x" * 1000} for _ in range(10)])
+
+    _size = os.path.getsize(db._file_handler._log_file_path)
+
+    log_info.update({"dept": "CSE"}, {"name": "Sam"})
+
+    # Only ids & the new key values are logged.
+    assert os.path.getsize(db._file_handler._log_file_path) - _size < 1000
+    assert all(doc["dept"] == "CSE" for doc in LogFileIO("LogDb", "test_data/db").read()["log_info"])
+
+
+def test_log_operator_delta():
+    log_info.drop()
+    log_info.insert({"name": "Sam", "visits": 1, "skills": ["C"]})
+
+    log_info.update({"$inc": {"visits": 1}, "$push": {"skills": "Go"}})
+
+    # Replaying the Log again changes nothing.
+    _file_handler = LogFileIO("LogDb", "test_data/db")
+    _database = _file_handler.read()
+    apply_changes(_database, list(_file_handler._read_log()))
+
+    assert _database["log_info"][0]["visits"] == 2
+    assert _database["log_info"][0]["skills"] == ["C", "Go"]
+
+
+def test_atomic_write():
+    _file_handler = BinaryFileIO("AtomicDb", "test_data/db")
+    _file_handler.write({"atomic": [{"_id_": "1"}]})
+
+    # Database-file is untouched when serialization fails.
+    with pytest.raises(Exception):
+        _file_handler.write({"atomic": [{"_id_": "2", "func": lambda: None}]})
+
+    assert _file_handler.read() == {"atomic": [{"_id_": "1"}]}
+
+    _json_handler = JsonFileIO("AtomicDb", "test_data/db")
+    _json_handler.write({"atomic": [{"_id_": "1"}]})
+
+    with pytest.raises(TypeError):
+        _json_handler.write({"atomic": [{"_id_": "2", "tags": {"a", "b"}}]})
+
+    assert _json_handler.read() == {"atomic": [{"_id_": "1"}]}
+
+    # No temporary file is left behind.
+    assert not [name for name in os.listdir("test_data/db") if name.endswith(".tmp")]
+
+
+# Create an instance of Database, stored in pages
+paged_db = FileXdb("PagedDb", "test_data/db", mode="paged")
+
+# Create a Collection
+paged_info = paged_db.collection("paged_info")
+
+
+def test_paged_insert_get():
+    paged_info.drop()
+
+    _ids = paged_info.insert_all([{"name": "Sam", "dept": "CSE"}, {"name": "Bob", "dept": "EE", "bio": "x" * 10000}])
+
+    # Opening reads only the catalog, Documents are read on access.
+    _database = PagedFileIO("PagedDb", "test_data/db").read()
+    _collection = _database["paged_info"]
+
+    assert isinstance(_collection, PagedCollection)
+    assert _collection._ids is None
+
+    assert _collection.get_document(_ids[0])["name"] == "Sam"
+    assert len(_collection.get_document(_ids[1])["bio"]) == 10000
+    assert [doc["name"] for doc in _collection] == ["Sam", "Bob"]
+
+
+def test_paged_update_delete():
+    paged_info.update({"dept": "ECE"}, {"name": "Bob"})
+    paged_info.insert({"name": "Rana", "dept": "CSE"})
+    paged_info.delete({"name": "Sam"})
+
+    _db = FileXdb("PagedDb", "test_data/db", mode="paged")
+    _collection = _db.collection("paged_info")
+
+    assert [(doc["name"], doc["dept"]) for doc in _collection.find()] == [("Bob", "ECE"), ("Rana", "CSE")]
+
+    _rana = _collection.find({"name": "Rana"})[0]
+    assert _collection.delete_by_id(_rana["_id_"]) == [_rana["_id_"]]
+    assert _collection.get(_rana["_id_"]) is None
+
+
+def test_paged_records_in_pages():
+    _file_handler = paged_db._file_handler
+    _page_size = _file_handler._catalog["page_size"]
+
+    paged_info.insert_all([{"n": i, "text": "y" * 1000} for i in range(20)])
+
+    # Records smaller than a page never cross a page boundary.
+    _collection = _file_handler.load()["paged_info"]
+
+    for offset, _size in _collection.records():
+        if _size <= _page_size:
+            assert offset // _page_size == (offset + _size - 1) // _page_size
+
+
+def test_paged_compact():
+    _file_handler = paged_db._file_handler
+    _data_path = _file_handler._data_path(_file_handler._catalog["data"])
+
+    paged_info.update({"text": "z" * 1000}, {"n": {"$lt": 10}})
+    assert _file_handler._catalog["garbage"] > 0
+
+    _file_handler.compact()
+
+    assert _file_handler._catalog["garbage"] == 0
+    assert not os.path.exists(_data_path)
+    assert paged_info.find({"n": 3})[0]["text"] == "z" * 1000
+    assert len(FileXdb("PagedDb", "test_data/db", mode="paged").collection("paged_info").find({"n": {"$gte": 0}})) == 20
+
+
+def test_paged_compact_other_instance():
+    _first = FileXdb("PagedTwoDb", "test_data/db", mode="paged").collection("two")
+    _first.drop()
+    _ids = _first.insert_all([{"n": i} for i in range(50)])
+
+    # The other instance maps the data-file before the compaction.
+    _second = FileXdb("PagedTwoDb", "test_data/db", mode="paged").collection("two")
+    assert _second.get(_ids[30])["n"] == 30
+
+    _first.delete({"n": {"$lt": 25}})
+    _first._file_handler.compact()
+
+    assert _second.get(_ids[30]) == {"_id_": _ids[30], "n": 30}
+    assert _second.get(_ids[5]) is None
+    assert [doc["n"] for doc in _second.find()] == list(range(25, 50))
+
+
+def test_paged_find_parallel():
+    paged_info.insert({"n": 100})
+
+    # Workers read the written records from the data-file, the waiting Document is sent to them.
+    _db = FileXdb("PagedDb", "test_data/db", mode="paged", sync="never")
+    _collection = _db.collection("paged_info")
+    _collection.insert({"n": 101})
+
+    assert _collection.find({"n": {"$gte": 5}}, parallel=True, workers=2) == _collection.find({"n": {"$gte": 5}})
+    assert [doc["n"] for doc in _collection.find({"n": {"$gte": 100}}, parallel=True, workers=2)] == [100, 101]
+
+    _db.close()
+
+
+@pytest.mark.parametrize("codec", sorted(CODECS))
+def test_codecs(codec):
+    _database = {"coll": [{"_id_": "1", "name": "Sam", "cgpa": 9.5, "n": -(2 ** 40), "ok": True, "tags": ["a", None]}]}
+
+    _codec = get_codec(codec)
+    assert _codec.decode(_codec.encode(_database)) == _database
+
+    # Documents, also nested inside a value.
+    _documents = {"coll": [Document({"_id_": "1", "sub": Document({"_id_": "2", "n": 1})})]}
+    assert _codec.decode(_codec.encode(_documents)) == {"coll": [{"_id_": "1", "sub": {"_id_": "2", "n": 1}}]}
+
+    # Files name their Codec, a FileIO with another Codec still reads them.
+    _file_handler = BinaryFileIO("CodecDb", "test_data/db", codec=codec)
+    _file_handler.write(_database)
+
+    with open(_file_handler.get_export_path(), "rb") as file:
+        assert file.readline() == f"FXDB1 {codec}\n".encode()
+
+    assert BinaryFileIO("CodecDb", "test_data/db").read() == _database
+
+
+def test_codec_database():
+    _db = FileXdb("CodecJsonDb", "test_data/db", mode="json", codec="json")
+    _coll = _db.collection("coll")
+    _coll.drop()
+    _coll.insert({"name": "Sam", "skills": ["Python"]})
+
+    # Plain compact JSON, without a header.
+    with open(_db._file_handler.get_export_path(), "rb") as file:
+        assert file.read().startswith(b'{"coll":[{"_id_":')
+
+    with open(_db._file_handler.get_export_path()) as file:
+        assert json.load(file)["coll"][0]["name"] == "Sam"
+
+    assert FileXdb("CodecJsonDb", "test_data/db", mode="json").collection("coll").find()[0]["name"] == "Sam"
+
+    with pytest.raises(ValueError):
+        JsonFileIO("CodecJsonDb", "test_data/db", codec="pickle")
+
+    with pytest.raises(ValueError):
+        FileXdb("CodecDb", "test_data/db", codec="unknown")
+
+    # Records of paged Databases use the Codec too.
+    _paged = FileXdb("CodecPagedDb", "test_data/db", mode="paged", codec="binary")
+    _paged.collection("coll").drop()
+    _paged.collection("coll").insert({"name": "Sam"})
+
+    assert FileXdb("CodecPagedDb", "test_data/db", mode="paged").collection("coll").find({"name": "Sam"})
+
+
+def test_codec_legacy_files():
+    # Files written before Codecs have no header.
+    with open("test_data/db/LegacyDb.fxdb", "wb") as file:
+        file.write(pickle.dumps({"coll": [{"_id_": "1"}]}))
+
+    with open("test_data/db/LegacyDb.json", "w") as file:
+        json.dump({"coll": [{"_id_": "1"}]}, file, indent=4)
+
+    assert BinaryFileIO("LegacyDb", "test_data/db").read() == {"coll": [{"_id_": "1"}]}
+    assert JsonFileIO("LegacyDb", "test_data/db").read() == {"coll": [{"_id_": "1"}]}
+
+
+@pytest.mark.parametrize("compression", sorted(COMPRESSIONS))
+def test_compression(compression):
+    _data = b"".join(b'{"_id_": "%d", "name": "Sam"}' % i for i in range(5000))
+
+    # Blocks are compressed on their own.
+    _compressed = compress(_data, compression, block_size=10000)
+
+    assert len(_compressed) < len(_data)
+    assert len(list(iter_blocks(_compressed, compression))) == -(-len(_data) // 10000)
+    assert decompress(_compressed, compression) == _data
+
+    _database = {"coll": [{"_id_": str(i), "name": "Sam", "dept": "CSE"} for i in range(1000)]}
+
+    _file_handler = BinaryFileIO("CompressedDb", "test_data/db", compression=compression)
+    _file_handler.write(_database)
+
+    with open(_file_handler.get_export_path(), "rb") as file:
+        assert file.readline() == f"FXDB1 pickle+{compression}\n".encode()
+
+    assert BinaryFileIO("CompressedDb", "test_data/db").read() == _database
+
+    _json_handler = JsonFileIO("CompressedDb", "test_data/db", compression=compression)
+    _json_handler.write(_database)
+
+    assert JsonFileIO("CompressedDb", "test_data/db").read() == _database
+
+
+def test_compression_database():
+    # Log records are compressed too.
+    _db = FileXdb("CompressedLogDb", "test_data/db", mode="log", compression="zlib")
+    _coll = _db.collection("coll")
+    _coll.drop()
+    _coll.insert_all([{"name": "Sam", "dept": "CSE"} for _ in range(100)])
+
+    assert len(LogFileIO("CompressedLogDb", "test_data/db").read()["coll"]) == 100
+
+    _paged = FileXdb("CompressedPagedDb", "test_data/db", mode="paged", compression="lzma")
+    _paged.collection("coll").drop()
+    _paged.collection("coll").insert({"name": "Sam", "bio": "x" * 10000})
+
+    assert _paged._file_handler.record_codec.name == "pickle+lzma"
+    assert FileXdb("CompressedPagedDb", "test_data/db", mode="paged").collection("coll").find({"name": "Sam"})
+
+    with pytest.raises(ValueError):
+        BinaryFileIO("CompressedDb", "test_data/db", compression="zip")
+
+    # Exports use the usual containers.
+    Export({"coll": [{"name": "Sam"}]}, "CompressedExport", "test_data/export", _compression="zlib")
+
+    with gzip.open("test_data/export/CompressedExport.json.gz", "rt") as file:
+        assert json.load(file) == {"coll": [{"name": "Sam"}]}
+
+
+def _split_files(file_handler: SplitFileIO) -> list:
+    return sorted(file for file in os.listdir(file_handler._dir_path) if file.endswith(".fxdb"))
+
+
+def test_split():
+    _db = FileXdb("SplitDb", "test_data/db", mode="split")
+
+    for _col_name in _db.show_collections():
+        _db.collection(_col_name).drop()
+
+    _db.collection("big").insert_all([{"n": i} for i in range(100)])
+    _db.collection("small").insert({"name": "Sam"})
+
+    _file_handler = _db._file_handler
+    _big_file = _file_handler._manifest["collections"]["big"]
+
+    # Only the file of changed Collection is rewritten.
+    _db.collection("small").insert({"name": "Bob"})
+
+    assert _file_handler._manifest["collections"]["big"] == _big_file
+    assert len(_split_files(_file_handler)) == 2
+
+    # Rename & drop change the manifest only.
+    _db.collection("small").rename("tiny")
+
+    assert "tiny" in _file_handler._manifest["collections"]
+    assert len(_split_files(_file_handler)) == 2
+
+    # A renamed Collection is read from its old file.
+    _reopened = FileXdb("SplitDb", "test_data/db", mode="split")
+
+    assert sorted(_reopened.show_collections()) == ["big", "tiny"]
+    assert [doc["name"] for doc in _reopened.collection("tiny").find()] == ["Sam", "Bob"]
+    _reopened.close()
+
+    _db.collection("tiny").drop()
+
+    assert _split_files(_file_handler) == [_big_file]
+
+    # Another instance reads only the files changed since.
+    _other = SplitFileIO("SplitDb", "test_data/db")
+    _big = _other.load()["big"]
+
+    _db.collection("small").insert({"name": "Rana"})
+
+    assert _other.collection_names() == ["big", "small"]
+    assert _other.load()["big"] is _big
+    assert _other.load()["small"][0]["name"] == "Rana"
+
+
+def test_split_migrate():
+    shutil.rmtree("test_data/db/MigratedDb.fxdb.d", ignore_errors=True)
+
+    _single = FileXdb("MigratedDb", "test_data/db", mode="log")
+    _coll = _single.collection("coll")
+    _coll.drop()
+    _coll.insert_all([{"name": "Sam"}, {"name": "Bob"}])
+    _coll.create_index("name")
+
+    # Documents & metadata are copied from the single Database-file & its Log.
+    _split = FileXdb("MigratedDb", "test_data/db", mode="split").collection("coll")
+
+    assert _split.find() == _coll.find()
+    assert _split.list_indexes() == [{"field": "name", "kind": "hash"}]
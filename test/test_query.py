@@ -0,0 +1,72 @@
+import re
+
+import pytest
+
+from filexdb.query import compile_query, get_path
+
+
+doc = {
+    "name": "Rocky",
+    "age": 27,
+    "address": {"PO": "Bongaon", "PS": "Kolkata"},
+    "skills": ["Game Dev", "C++"],
+}
+
+
+def test_get_path():
+    assert get_path(doc, "name") == "Rocky"
+    assert get_path(doc, "address.PO") == "Bongaon"
+    assert get_path(doc, "skills.1") == "C++"
+    assert get_path(doc, "address.PIN", None) is None
+    assert get_path(doc, "skills.5", None) is None
+
+
+def test_equality():
+    assert compile_query({"name": "Rocky"})(doc)
+    assert compile_query({"name": "Rocky", "address.PS": "Kolkata"})(doc)
+    assert compile_query({"skills": ["Game Dev", "C++"]})(doc)
+    assert not compile_query({"name": "Rocky", "age": 28})(doc)
+    assert not compile_query({"dept": None})(doc)
+    assert compile_query({})(doc)
+
+
+def test_operators():
+    assert compile_query({"age": {"$gt": 20, "$lte": 27}})(doc)
+    assert not compile_query({"age": {"$lt": 27}})(doc)
+    assert not compile_query({"name": {"$gt": 5}})(doc)
+    assert compile_query({"age": {"$in": [1, 27]}})(doc)
+    assert compile_query({"age": {"$nin": [1, 2]}, "dept": {"$nin": ["CSE"]}})(doc)
+    assert compile_query({"dept": {"$ne": "CSE"}, "age": {"$ne": 28}})(doc)
+    assert compile_query({"address.PIN": {"$exists": False}, "address.PO": {"$exists": True}})(doc)
+    assert compile_query({"name": {"$regex": "^roc", "$options": "i"}})(doc)
+    assert compile_query({"name": {"$regex": re.compile("ky$")}})(doc)
+    assert compile_query({"age": {"$not": {"$gt": 30}}})(doc)
+
+
+def test_logical():
+    assert compile_query({"$or": [{"age": 1}, {"name": "Rocky"}]})(doc)
+    assert not compile_query({"$and": [{"age": 27}, {"name": "Sam"}]})(doc)
+    assert compile_query({"$nor": [{"age": 1}, {"name": "Sam"}]})(doc)
+
+
+def test_plan():
+    _query = compile_query({"name": "Rocky", "age": {"$gt": 20}, "dept": {"$in": ["CSE"]}, "$or": [{}]})
+
+    assert _query.plan == {
+        "name": ("$eq", "Rocky"),
+        "age": ("range", (20, None, False, True)),
+        "dept": ("$in", ["CSE"]),
+    }
+
+    # The tighter bound of both operators of a side is used.
+    assert compile_query({"x": {"$gt": 3, "$gte": 5, "$lt": 9, "$lte": 9}}).plan == {"x": ("range", (5, 9, True, False))}
+    assert compile_query({"x": {"$gt": 5, "$gte": 5}}).plan == {"x": ("range", (5, None, False, True))}
+    assert compile_query({"x": {"$gt": 5, "$gte": "a"}}).plan == {}
+
+
+def test_invalid():
+    with pytest.raises(ValueError):
+        compile_query({"age": {"$between": [1, 2]}})
+
+    with pytest.raises(ValueError):
+        compile_query({"age": {"$gt": 1, "name": "Sam"}})